@@ -0,0 +1,295 @@
+"""
+Bancos de dados suportados pelo `DatabaseConnection`.
+
+O padrão é o SQL Server de produção (via pyodbc, importado apenas quando usado).
+Com `DB_BACKEND=sqlite`, usa um arquivo SQLite local (`DB_SQLITE_PATH`) com as
+mesmas tabelas, preenchido por `python -m dados_sinteticos`, para testes e
+medições sem acesso ao servidor.
+"""
+import os
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+
+class Dialeto:
+    """Diferenças de SQL entre bancos; esta classe usa a sintaxe do SQL Server."""
+
+    def top(self, n: int) -> str:
+        """Prefixo da lista de colunas que limita o resultado a `n` linhas."""
+        return f"TOP({n}) "
+
+    def limite(self, n: int) -> str:
+        """Sufixo da consulta que limita o resultado a `n` linhas."""
+        return ""
+
+    def como_data(self, expressao: str, nome: str) -> str:
+        """Coluna do SELECT com a expressão convertida em data (sem hora)."""
+        return f"CAST({expressao} AS DATE) AS {nome}"
+
+    def como_decimal(self, expressao: str, nome: str) -> str:
+        """Coluna do SELECT com um valor monetário, lido como Decimal."""
+        return f"{expressao} AS {nome}"
+
+    # Tabela de carga das linhas digitáveis gravadas (temporária, da conexão)
+    tabela_carga_linhas = "#linhas_digitaveis_carga"
+
+    def criar_tabela_linhas(self, tabela: str) -> str:
+        """DDL da tabela de linhas digitáveis gravadas (`gravar_linhas`), se não existir."""
+        return f"""
+        IF OBJECT_ID(N'{tabela}', N'U') IS NULL
+        CREATE TABLE {tabela} (
+            titulo_id INT NOT NULL,
+            empresa VARCHAR(4) NOT NULL,
+            linha_digitavel CHAR(54) NOT NULL,
+            codigo_barras CHAR(44) NOT NULL,
+            gerado_em DATETIME2(0) NOT NULL,
+            CONSTRAINT PK_{tabela.replace('.', '_')} PRIMARY KEY (empresa, titulo_id)
+        )
+        """
+
+    def criar_carga_linhas(self) -> str:
+        """DDL da tabela de carga, se ainda não existir na conexão."""
+        return f"""
+        IF OBJECT_ID(N'tempdb..{self.tabela_carga_linhas}') IS NULL
+        CREATE TABLE {self.tabela_carga_linhas} (
+            titulo_id INT NOT NULL,
+            empresa VARCHAR(4) NOT NULL,
+            linha_digitavel CHAR(54) NOT NULL,
+            codigo_barras CHAR(44) NOT NULL,
+            gerado_em DATETIME2(0) NOT NULL
+        )
+        """
+
+    def limpar_carga_linhas(self) -> str:
+        return f"TRUNCATE TABLE {self.tabela_carga_linhas}"
+
+    def mesclar_linhas(self, tabela: str) -> str:
+        """Instrução que leva as linhas da carga para a tabela (inserindo ou atualizando)."""
+        return f"""
+        MERGE {tabela} WITH (HOLDLOCK) AS destino
+        USING {self.tabela_carga_linhas} AS carga
+        ON destino.empresa = carga.empresa AND destino.titulo_id = carga.titulo_id
+        WHEN MATCHED AND destino.linha_digitavel <> carga.linha_digitavel THEN
+            UPDATE SET linha_digitavel = carga.linha_digitavel,
+                       codigo_barras = carga.codigo_barras,
+                       gerado_em = carga.gerado_em
+        WHEN NOT MATCHED THEN
+            INSERT (titulo_id, empresa, linha_digitavel, codigo_barras, gerado_em)
+            VALUES (carga.titulo_id, carga.empresa, carga.linha_digitavel, carga.codigo_barras, carga.gerado_em);
+        """
+
+class DialetoSqlite(Dialeto):
+    """
+    Sintaxe do SQLite.
+
+    Datas e valores são gravados como texto; os tipos declarados no nome da
+    coluna ("nome [date]") fazem o módulo sqlite3 convertê-los em date e Decimal.
+    """
+
+    def top(self, n: int) -> str:
+        return ""
+
+    def limite(self, n: int) -> str:
+        return f" LIMIT {n}"
+
+    def como_data(self, expressao: str, nome: str) -> str:
+        return f'date({expressao}) AS "{nome} [date]"'
+
+    def como_decimal(self, expressao: str, nome: str) -> str:
+        return f'{expressao} AS "{nome} [decimal]"'
+
+    tabela_carga_linhas = "temp.linhas_digitaveis_carga"
+
+    def criar_tabela_linhas(self, tabela: str) -> str:
+        return f"""
+        CREATE TABLE IF NOT EXISTS {tabela} (
+            titulo_id INTEGER NOT NULL,
+            empresa TEXT NOT NULL,
+            linha_digitavel TEXT NOT NULL,
+            codigo_barras TEXT NOT NULL,
+            gerado_em TEXT NOT NULL,
+            PRIMARY KEY (empresa, titulo_id)
+        )
+        """
+
+    def criar_carga_linhas(self) -> str:
+        return f"""
+        CREATE TABLE IF NOT EXISTS {self.tabela_carga_linhas} (
+            titulo_id INTEGER NOT NULL,
+            empresa TEXT NOT NULL,
+            linha_digitavel TEXT NOT NULL,
+            codigo_barras TEXT NOT NULL,
+            gerado_em TEXT NOT NULL
+        )
+        """
+
+    def limpar_carga_linhas(self) -> str:
+        return f"DELETE FROM {self.tabela_carga_linhas}"
+
+    def mesclar_linhas(self, tabela: str) -> str:
+        # "WHERE true": sem ele o SQLite poderia ler o ON CONFLICT como parte do SELECT
+        return f"""
+        INSERT INTO {tabela} (titulo_id, empresa, linha_digitavel, codigo_barras, gerado_em)
+        SELECT titulo_id, empresa, linha_digitavel, codigo_barras, gerado_em
+        FROM {self.tabela_carga_linhas} WHERE true
+        ON CONFLICT (empresa, titulo_id) DO UPDATE SET
+            linha_digitavel = excluded.linha_digitavel,
+            codigo_barras = excluded.codigo_barras,
+            gerado_em = excluded.gerado_em
+        WHERE {tabela}.linha_digitavel <> excluded.linha_digitavel
+        """
+
+# Datas são gravadas e comparadas no SQLite como texto ISO (yyyy-mm-dd)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda momento: momento.isoformat(sep=' '))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter('date', lambda valor: date.fromisoformat(valor.decode()))
+sqlite3.register_converter('decimal', lambda valor: Decimal(valor.decode()))
+
+class Backend:
+    """Banco de dados: abre conexões DB-API e informa o dialeto de SQL."""
+    nome = ''
+    dialeto = Dialeto()
+
+    def conectar(self):
+        """Abre uma nova conexão."""
+        raise NotImplementedError
+
+    def cancelar(self, connection, cursor) -> None:
+        """Interrompe a instrução em execução no cursor (chamado de outra thread)."""
+        cursor.cancel()
+
+    def preparar_carga(self, cursor) -> None:
+        """Ajusta o cursor para inserções em massa com `executemany`."""
+
+class SqlServerBackend(Backend):
+    """SQL Server acessado pelo driver ODBC."""
+    nome = 'sqlserver'
+
+    def __init__(self, server: str, database: str, username: str, password: str,
+                 driver: str = 'ODBC Driver 17 for SQL Server'):
+        self.server = server
+        self.database = database
+        self.username = username
+        self.password = password
+        self.driver = driver
+
+    def conectar(self):
+        import pyodbc
+
+        connection_string = (
+            f'DRIVER={{{self.driver}}};'
+            f'SERVER={self.server};'
+            f'DATABASE={self.database};'
+            f'UID={self.username};'
+            f'PWD={self.password}'
+        )
+        return pyodbc.connect(connection_string)
+
+    def preparar_carga(self, cursor) -> None:
+        # Envia os parâmetros de todas as linhas num único pacote, e não uma
+        # ida ao servidor por linha
+        cursor.fast_executemany = True
+
+class SqliteBackend(Backend):
+    """Arquivo SQLite com as tabelas do sistema (ver `criar_tabelas`)."""
+    nome = 'sqlite'
+    dialeto = DialetoSqlite()
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+
+    def conectar(self):
+        # As conexões do pool são usadas por várias threads, uma de cada vez
+        connection = sqlite3.connect(self.caminho, check_same_thread=False,
+                                     detect_types=sqlite3.PARSE_COLNAMES)
+        connection.execute("PRAGMA foreign_keys = OFF")
+        # Permite gravar linhas digitáveis enquanto outra conexão lê os títulos
+        connection.execute("PRAGMA journal_mode = WAL")
+        return connection
+
+    def cancelar(self, connection, cursor) -> None:
+        # O sqlite3 não tem cancelamento por cursor; interrompe a conexão
+        connection.interrupt()
+
+    def criar_tabelas(self, connection) -> None:
+        """Cria as tabelas usadas pelo sistema, se ainda não existirem."""
+        connection.executescript(ESQUEMA_SQLITE)
+
+    def criar_indices(self, connection) -> None:
+        """Cria os índices usados pelas consultas (depois da carga, para ela ser rápida)."""
+        connection.executescript(INDICES_SQLITE)
+
+# Tabelas do sistema, apenas com as colunas usadas pelas consultas
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS sigcad (
+    id INTEGER PRIMARY KEY,
+    codigo INTEGER NOT NULL,
+    nome TEXT NOT NULL,
+    cgc TEXT,
+    tipo TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sigfls (
+    id INTEGER PRIMARY KEY,
+    ctrl_id INTEGER NOT NULL,
+    clifor INTEGER,
+    sacado INTEGER,
+    bordero INTEGER,
+    dtbordero TEXT,
+    dcto TEXT,
+    codigo TEXT,
+    tipodcto TEXT
+);
+CREATE TABLE IF NOT EXISTS sigfidc (
+    id INTEGER PRIMARY KEY,
+    sigfls INTEGER NOT NULL,
+    numero_port TEXT,
+    banco TEXT,
+    [data] TEXT,
+    valor TEXT
+);
+CREATE TABLE IF NOT EXISTS sigflu (
+    id INTEGER PRIMARY KEY,
+    sigfls INTEGER NOT NULL,
+    numero_port TEXT,
+    banco TEXT,
+    vcto_ TEXT,
+    valor TEXT
+);
+CREATE TABLE IF NOT EXISTS sigfcs (
+    id INTEGER PRIMARY KEY,
+    sigfls INTEGER NOT NULL
+);
+"""
+
+INDICES_SQLITE = """
+CREATE INDEX IF NOT EXISTS ix_sigcad_tipo_codigo ON sigcad (tipo, codigo);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_sigfls_ctrl_id ON sigfls (ctrl_id);
+CREATE INDEX IF NOT EXISTS ix_sigfls_clifor ON sigfls (clifor);
+CREATE INDEX IF NOT EXISTS ix_sigfls_sacado ON sigfls (sacado);
+CREATE INDEX IF NOT EXISTS ix_sigfls_dtbordero ON sigfls (dtbordero);
+CREATE INDEX IF NOT EXISTS ix_sigfidc_sigfls ON sigfidc (sigfls);
+CREATE INDEX IF NOT EXISTS ix_sigfidc_data ON sigfidc ([data]);
+CREATE INDEX IF NOT EXISTS ix_sigflu_sigfls ON sigflu (sigfls);
+CREATE INDEX IF NOT EXISTS ix_sigflu_vcto ON sigflu (vcto_);
+CREATE INDEX IF NOT EXISTS ix_sigfcs_sigfls ON sigfcs (sigfls);
+"""
+
+def backend_do_ambiente() -> Backend:
+    """
+    Backend configurado no ambiente (.env).
+
+    DB_BACKEND=sqlserver (padrão) usa DB_SERVER, DB_DATABASE, DB_USERNAME e
+    DB_PASSWORD; DB_BACKEND=sqlite usa o arquivo DB_SQLITE_PATH.
+    """
+    nome = os.getenv('DB_BACKEND', 'sqlserver').strip().lower()
+    if nome == 'sqlite':
+        return SqliteBackend(os.getenv('DB_SQLITE_PATH', 'linha_digitavel.db'))
+    if nome == 'sqlserver':
+        return SqlServerBackend(
+            server=os.getenv('DB_SERVER'),
+            database=os.getenv('DB_DATABASE'),
+            username=os.getenv('DB_USERNAME'),
+            password=os.getenv('DB_PASSWORD')
+        )
+    raise ValueError(f"DB_BACKEND inválido: {nome} (use sqlserver ou sqlite)")
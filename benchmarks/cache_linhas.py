@@ -0,0 +1,52 @@
+"""
+Geração das linhas digitáveis com e sem o cache em disco (`cache_linhas`).
+
+Mede a geração em lote sem cache, a primeira execução com o cache vazio
+(calcula e grava) e a segunda (todas as linhas lidas do cache).
+
+Uso:
+    python -m benchmarks.cache_linhas [--titulos N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cache_linhas
+from benchmarks.memoria_titulos import lotes_registros
+from models import TituloBatch
+
+def carregar(quantidade):
+    batch = TituloBatch()
+    for lote in lotes_registros(quantidade):
+        batch.adicionar(lote)
+    return batch
+
+def medir(nome, quantidade):
+    batch = carregar(quantidade)
+    inicio = time.perf_counter()
+    batch.gerar_linhas()
+    tempo = time.perf_counter() - inicio
+    print(f"  {nome:<20} {tempo:8.2f} s  {quantidade / tempo:>12,.0f} títulos/s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titulos', type=int, default=300_000)
+    args = parser.parse_args()
+
+    print(f"{args.titulos} títulos")
+    os.environ.pop('CACHE_LINHAS', None)
+    cache_linhas.cache_do_ambiente.cache_clear()
+    medir("sem cache", args.titulos)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.environ['CACHE_LINHAS'] = os.path.join(diretorio, 'cache_linhas.db')
+        os.environ['CACHE_LINHAS_TAMANHO'] = str(args.titulos)
+        cache_linhas.cache_do_ambiente.cache_clear()
+        medir("cache vazio", args.titulos)
+        medir("cache com as linhas", args.titulos)
+        print(f"  {cache_linhas.cache_do_ambiente().estatisticas()}")
+        cache_linhas.cache_do_ambiente().fechar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Teste de carga do serviço HTTP (`servico`): várias conexões keep-alive, cada
+uma enviando requisições POST /linhas em pipeline.
+
+Sem --porta, inicia o serviço num subprocesso numa porta livre de 127.0.0.1 e
+o encerra no fim. Mostra a vazão, a latência (da escrita da requisição até a
+resposta completa) e, pelas métricas do serviço, o tamanho médio dos lotes
+formados com as requisições simultâneas.
+
+Uso:
+    python -m benchmarks.carga_servico [--conexoes N] [--requisicoes N] [--pipeline N]
+                                       [--titulos N] [--host H --porta P]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import date
+
+def corpo_requisicao(quantidade, rnd):
+    inicio = date(2025, 1, 1).toordinal()
+    titulos = [{
+        'empresa': rnd.choice(('FIDC', 'SEC')),
+        'seu_numero': f"{rnd.randint(0, 10**8 - 1):08d}{rnd.randint(0, 9)}",
+        'vencimento': date.fromordinal(inicio + rnd.randint(0, 365)).isoformat(),
+        'valor': f"{rnd.randint(1_000, 5_000_000) / 100:.2f}",
+    } for _ in range(quantidade)]
+    return json.dumps(titulos).encode('utf-8')
+
+def requisicao_http(metodo, caminho, host, corpo=b''):
+    return (f"{metodo} {caminho} HTTP/1.1\r\nHost: {host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(corpo)}\r\n\r\n").encode('latin-1') + corpo
+
+async def ler_resposta(reader):
+    """(status, corpo) da próxima resposta da conexão."""
+    cabecalho = await reader.readuntil(b'\r\n\r\n')
+    linhas = cabecalho.decode('latin-1').split('\r\n')
+    status = int(linhas[0].split(' ')[1])
+    tamanho = next(int(linha.split(':', 1)[1]) for linha in linhas if linha.lower().startswith('content-length:'))
+    return status, await reader.readexactly(tamanho)
+
+async def conexao(host, porta, requisicoes, pipeline, corpos, latencias, erros):
+    reader, writer = await asyncio.open_connection(host, porta)
+    enviadas = 0
+    while enviadas < requisicoes:
+        rodada = min(pipeline, requisicoes - enviadas)
+        inicio = time.perf_counter()
+        # As requisições da rodada vão juntas, antes de ler qualquer resposta
+        writer.write(b''.join(requisicao_http('POST', '/linhas', host, corpos[(enviadas + i) % len(corpos)])
+                              for i in range(rodada)))
+        await writer.drain()
+        for _ in range(rodada):
+            status, corpo = await ler_resposta(reader)
+            latencias.append(time.perf_counter() - inicio)
+            if status != 200 or None in json.loads(corpo):
+                erros.append(status)
+        enviadas += rodada
+    writer.close()
+
+async def metricas(host, porta):
+    reader, writer = await asyncio.open_connection(host, porta)
+    writer.write(requisicao_http('GET', '/metrics', host))
+    await writer.drain()
+    _, corpo = await ler_resposta(reader)
+    writer.close()
+    valores = {}
+    for linha in corpo.decode('utf-8').splitlines():
+        if linha and not linha.startswith('#'):
+            nome, _, valor = linha.rpartition(' ')
+            valores[nome] = float(valor)
+    return valores
+
+async def executar(args):
+    rnd = random.Random(42)
+    corpos = [corpo_requisicao(args.titulos, rnd) for _ in range(64)]
+    antes = await metricas(args.host, args.porta)
+    latencias, erros = [], []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(conexao(args.host, args.porta, args.requisicoes, args.pipeline, corpos, latencias, erros)
+                           for _ in range(args.conexoes)))
+    tempo = time.perf_counter() - inicio
+    depois = await metricas(args.host, args.porta)
+
+    total = args.conexoes * args.requisicoes
+    latencias.sort()
+    lotes = depois['linhas_lotes_total'] - antes.get('linhas_lotes_total', 0)
+    titulos_lotes = depois['linhas_lote_titulos_total'] - antes.get('linhas_lote_titulos_total', 0)
+    print(f"{args.conexoes} conexão(ões) x {args.requisicoes} requisição(ões), pipeline {args.pipeline}, "
+          f"{args.titulos} título(s) por requisição")
+    print(f"  {tempo:.2f} s  {total / tempo:,.0f} requisições/s  {total * args.titulos / tempo:,.0f} títulos/s")
+    print(f"  latência p50 {latencias[len(latencias) // 2] * 1000:.1f} ms  "
+          f"p95 {latencias[int(len(latencias) * 0.95)] * 1000:.1f} ms  "
+          f"p99 {latencias[int(len(latencias) * 0.99)] * 1000:.1f} ms")
+    if lotes:
+        print(f"  {lotes:.0f} lote(s), {titulos_lotes / lotes:,.0f} título(s) e "
+              f"{total / lotes:.1f} requisição(ões) por lote")
+    if erros:
+        print(f"  {len(erros)} resposta(s) com erro")
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--conexoes', type=int, default=16)
+    parser.add_argument('--requisicoes', type=int, default=200, help="Requisições por conexão")
+    parser.add_argument('--pipeline', type=int, default=4, help="Requisições enviadas juntas em cada conexão")
+    parser.add_argument('--titulos', type=int, default=50, help="Títulos por requisição")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, help="Serviço já em execução (padrão: inicia um)")
+    args = parser.parse_args()
+
+    processo = None
+    if args.porta is None:
+        args.porta = porta_livre()
+        processo = subprocess.Popen([sys.executable, '-m', 'servico', '--host', args.host, '--porta', str(args.porta)],
+                                    cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        for _ in range(100):
+            try:
+                socket.create_connection((args.host, args.porta), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+    try:
+        asyncio.run(executar(args))
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+if __name__ == "__main__":
+    main()
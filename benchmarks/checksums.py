@@ -0,0 +1,101 @@
+"""
+Microbenchmark dos dígitos verificadores: implementação original (int()/str()
+por dígito e 43 posições somadas a cada título) contra as tabelas pré-calculadas
+com as parcelas constantes da configuração em cache.
+
+Uso:
+    python -m benchmarks.checksums [--titulos N]
+"""
+import argparse
+import random
+import timeit
+
+from linha_digitavel import (
+    _dac_modulo_10, _dac_modulo_11, _soma_modulo_10, _soma_modulo_11,
+    modulo_10, modulo_11, somas_fixas
+)
+
+BANCO, MOEDA, CARTEIRA, AGENCIA, CONTA, DAC_CONTA = '341', '9', '109', '1704', '26957', '8'
+
+def modulo_10_original(num):
+    """Módulo 10 como era calculado antes das tabelas."""
+    soma = 0
+    multiplicador = 2
+    for n in reversed(num):
+        produto = int(n) * multiplicador
+        soma += sum(map(int, str(produto)))
+        multiplicador = 1 if multiplicador == 2 else 2
+    resto = soma % 10
+    return 0 if resto == 0 else 10 - resto
+
+def modulo_11_original(num):
+    """Módulo 11 como era calculado antes das tabelas."""
+    pesos = [2, 3, 4, 5, 6, 7, 8, 9]
+    soma = 0
+    for i, n in enumerate(reversed(num)):
+        peso = pesos[i % len(pesos)]
+        soma += int(n) * peso
+    resto = soma % 11
+    dac = 11 - resto
+    return 1 if dac in [0, 1, 10, 11] else dac
+
+def gerar_titulos(quantidade, seed=42):
+    """Gera (fator+valor, nosso número + DAC) aleatórios."""
+    rnd = random.Random(seed)
+    return [(f"{rnd.randint(1000, 9999)}{rnd.randint(0, 10**9):010d}",
+             f"{rnd.randint(0, 10**8 - 1):08d}{rnd.randint(0, 9)}")
+            for _ in range(quantidade)]
+
+def dacs_original(titulos):
+    """Os quatro DACs de cada título percorrendo todas as posições."""
+    sufixo = f"{AGENCIA}{CONTA}{DAC_CONTA}000"
+    for campo5, nn in titulos:
+        codigo = BANCO + MOEDA + campo5 + CARTEIRA + nn + sufixo
+        modulo_11_original(codigo)
+        modulo_10_original(BANCO + MOEDA + CARTEIRA + nn[:2])
+        modulo_10_original(nn[2:] + AGENCIA[:3])
+        modulo_10_original(sufixo[3:])
+
+def dacs_tabelados(titulos):
+    """Os quatro DACs de cada título, sem cache das parcelas constantes."""
+    sufixo = f"{AGENCIA}{CONTA}{DAC_CONTA}000"
+    for campo5, nn in titulos:
+        codigo = BANCO + MOEDA + campo5 + CARTEIRA + nn + sufixo
+        modulo_11(codigo)
+        modulo_10(BANCO + MOEDA + CARTEIRA + nn[:2])
+        modulo_10(nn[2:] + AGENCIA[:3])
+        modulo_10(sufixo[3:])
+
+def dacs_com_cache(titulos):
+    """Os quatro DACs de cada título, processando só as posições variáveis."""
+    for campo5, nn in titulos:
+        fixas = somas_fixas(BANCO, MOEDA, CARTEIRA, AGENCIA, CONTA, DAC_CONTA)
+        _dac_modulo_11(fixas.modulo_11 + _soma_modulo_11(campo5, 25) + _soma_modulo_11(nn, 13))
+        _dac_modulo_10(fixas.campo1_soma + _soma_modulo_10(nn[:2]))
+        _dac_modulo_10(fixas.campo2_soma + _soma_modulo_10(nn[2:], 3))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titulos', type=int, default=100_000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    titulos = gerar_titulos(args.titulos)
+
+    # Sanidade: as três versões precisam concordar
+    for campo5, nn in titulos[:1000]:
+        codigo = BANCO + MOEDA + campo5 + CARTEIRA + nn + f"{AGENCIA}{CONTA}{DAC_CONTA}000"
+        assert modulo_11(codigo) == modulo_11_original(codigo)
+        assert modulo_10(codigo) == modulo_10_original(codigo)
+
+    base = None
+    print(f"{args.titulos} títulos, melhor de {args.repeticoes} execuções")
+    for nome, funcao in [("original", dacs_original),
+                         ("tabelas", dacs_tabelados),
+                         ("tabelas + cache", dacs_com_cache)]:
+        tempo = min(timeit.repeat(lambda: funcao(titulos), number=1, repeat=args.repeticoes))
+        base = base or tempo
+        print(f"  {nome:<16} {tempo:8.3f} s  {args.titulos / tempo:>12,.0f} títulos/s  {base / tempo:5.1f}x")
+
+if __name__ == "__main__":
+    main()
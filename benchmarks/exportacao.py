@@ -0,0 +1,81 @@
+"""
+Tempo de escrita e tamanho dos arquivos de cada formato de exportação, contra
+o caminho anterior (lista de dicionários -> pandas.DataFrame -> to_csv/to_excel).
+
+As linhas digitáveis são geradas antes das medições, para comparar só a
+escrita. Parquet e Arrow são medidos apenas com o pyarrow instalado.
+
+Uso:
+    python -m benchmarks.exportacao [--titulos N] [--sem-xlsx] [--diretorio DIR]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.memoria_titulos import lotes_registros
+from exportacao import exportar, formatos_disponiveis
+from models import TituloBatch
+
+def exportar_pandas(batch, caminho, formato):
+    """Exportação como era feita antes, montando um DataFrame com todos os títulos."""
+    import pandas as pd
+
+    dados = [{
+        'empresa': titulo.empresa,
+        'cedente': titulo.codigo,
+        'sacado': titulo.sacado,
+        'bordero': titulo.bordero,
+        'data_bordero': titulo.data_bordero.strftime('%d/%m/%Y'),
+        'numero_documento': titulo.numero_documento,
+        'seu_numero': titulo.seu_numero,
+        'tipodcto': titulo.tipodcto,
+        'vencimento': titulo.vencimento.strftime('%d/%m/%Y'),
+        'valor': titulo.valor,
+        'linha_digitavel': titulo.linha_digitavel
+    } for titulo in batch]
+    df = pd.DataFrame(dados)
+    if formato == 'xlsx':
+        df.to_excel(caminho, index=False, engine='openpyxl')
+    else:
+        df.to_csv(caminho, index=False, sep=';', encoding='utf-8')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titulos', type=int, default=100_000)
+    parser.add_argument('--sem-xlsx', action='store_true', help="Não mede o XLSX (o mais lento)")
+    parser.add_argument('--diretorio', default=None, help="Onde gravar os arquivos (padrão: temporário)")
+    args = parser.parse_args()
+
+    batch = TituloBatch()
+    for lote in lotes_registros(args.titulos):
+        batch.adicionar(lote)
+    batch.gerar_linhas()
+    indices = range(len(batch))
+
+    medicoes = []
+    for formato in formatos_disponiveis():
+        if formato != 'xlsx' or not args.sem_xlsx:
+            medicoes.append((formato, lambda caminho, formato=formato: exportar(batch, indices, caminho, formato),
+                             formato))
+    try:
+        import pandas  # noqa: F401
+        for formato in ('csv',) if args.sem_xlsx else ('csv', 'xlsx'):
+            medicoes.append((f"pandas {formato}",
+                             lambda caminho, formato=formato: exportar_pandas(batch, caminho, formato), formato))
+    except ImportError:
+        pass
+
+    with tempfile.TemporaryDirectory() as temporario:
+        diretorio = args.diretorio or temporario
+        print(f"{args.titulos} títulos")
+        for nome, funcao, extensao in medicoes:
+            caminho = os.path.join(diretorio, f"titulos_{nome.replace(' ', '_')}.{extensao}")
+            inicio = time.perf_counter()
+            funcao(caminho)
+            tempo = time.perf_counter() - inicio
+            tamanho = os.path.getsize(caminho)
+            print(f"  {nome:<12} {tempo:8.2f} s  {args.titulos / tempo:>10,.0f} títulos/s  {tamanho / 2**20:8.1f} MiB")
+
+if __name__ == "__main__":
+    main()
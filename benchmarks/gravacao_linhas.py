@@ -0,0 +1,57 @@
+"""
+Gravação de linhas digitáveis no banco: em lote (`gravar_linhas`, carga com
+executemany e MERGE) contra uma instrução e um commit por linha
+(`execute_non_query`).
+
+Usa um arquivo SQLite temporário. A gravação linha a linha é medida só para
+as primeiras `--linha-a-linha` linhas (é a mais lenta) e estimada para o total.
+
+Uso:
+    python -m benchmarks.gravacao_linhas [--titulos N] [--linha-a-linha N] [--lote N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from backends import SqliteBackend
+from benchmarks.memoria_titulos import lotes_registros
+from db import DatabaseConnection
+from linha_digitavel import codigo_barras_da_linha
+from models import TituloBatch
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titulos', type=int, default=100_000)
+    parser.add_argument('--linha-a-linha', type=int, default=2_000)
+    parser.add_argument('--lote', type=int, default=10_000, help="Linhas por commit na gravação em lote")
+    args = parser.parse_args()
+
+    batch = TituloBatch()
+    for lote in lotes_registros(args.titulos):
+        batch.adicionar(lote)
+    linhas = list(zip(batch.valores('id'), batch.valores('empresa'), batch.gerar_linhas()))
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        db = DatabaseConnection(SqliteBackend(os.path.join(diretorio, 'gravacao.db')))
+        print(f"{args.titulos} linhas")
+
+        inicio = time.perf_counter()
+        db.gravar_linhas(linhas, args.lote)
+        tempo = time.perf_counter() - inicio
+        print(f"  {'em lote':<14} {tempo:8.2f} s  {args.titulos / tempo:>10,.0f} linhas/s")
+
+        # Títulos novos (outra empresa), para inserir e não só comparar com os já gravados
+        amostra = linhas[:args.linha_a_linha]
+        inicio = time.perf_counter()
+        for titulo_id, empresa, linha in amostra:
+            db.execute_non_query(
+                f"INSERT OR REPLACE INTO {db.tabela_linhas} VALUES (?, ?, ?, ?, datetime('now'))",
+                (titulo_id, f"X{empresa}", linha, codigo_barras_da_linha(linha)))
+        tempo = time.perf_counter() - inicio
+        print(f"  {'linha a linha':<14} {tempo:8.2f} s  {len(amostra) / tempo:>10,.0f} linhas/s"
+              f"  (estimado para {args.titulos}: {tempo * args.titulos / len(amostra):.1f} s)")
+        db.disconnect()
+
+if __name__ == "__main__":
+    main()
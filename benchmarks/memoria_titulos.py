@@ -0,0 +1,84 @@
+"""
+Memória ocupada por uma lista de títulos: objetos `Titulo` (um por título, com
+seus date, str e Decimal) contra o `TituloBatch` (por coluna).
+
+Os registros são criados em lotes, como lidos do banco, e descartados depois
+de convertidos; só a memória que permanece é contada (tracemalloc).
+
+Uso:
+    python -m benchmarks.memoria_titulos [--titulos N] [--com-linhas]
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+
+from models import Titulo, TituloBatch
+
+def lotes_registros(quantidade, tamanho_lote=5000, seed=42):
+    """Registros sintéticos de título, em lotes (objetos novos a cada lote)."""
+    rnd = random.Random(seed)
+    inicio = date(2023, 1, 1).toordinal()
+    for inicio_lote in range(0, quantidade, tamanho_lote):
+        lote = []
+        for id_titulo in range(inicio_lote + 1, min(quantidade, inicio_lote + tamanho_lote) + 1):
+            data_bordero = inicio + rnd.randint(0, 730)
+            lote.append({
+                'id': id_titulo,
+                'empresa': 'FIDC' if id_titulo % 2 else 'SEC',
+                'codigo': rnd.randint(1, 2000),
+                'sacado': rnd.randint(1, 2000),
+                'bordero': id_titulo // 50 + 1,
+                'data_bordero': date.fromordinal(data_bordero),
+                'numero_documento': f"{id_titulo:08d}/1",
+                'seu_numero': f"{id_titulo % 10**8:08d}{id_titulo % 10}",
+                'codigo_dcto': '040',
+                'tipodcto': 'DM',
+                'vencimento': date.fromordinal(data_bordero + rnd.randint(30, 120)),
+                'valor': Decimal(rnd.randint(1_000, 5_000_000)) / 100,
+            })
+        yield lote
+
+def medir(nome, carregar, quantidade, com_linhas):
+    gc.collect()
+    tracemalloc.start()
+    titulos = carregar(quantidade, com_linhas)
+    gc.collect()
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del titulos
+    print(f"  {nome:<12} {memoria / 2**20:9.1f} MiB  {memoria / quantidade:7.0f} bytes/título")
+    return memoria
+
+def carregar_lista(quantidade, com_linhas):
+    titulos = []
+    for lote in lotes_registros(quantidade):
+        titulos.extend(Titulo.from_dict(registro) for registro in lote)
+    if com_linhas:
+        for titulo in titulos:
+            titulo.gerar_linha_digitavel()
+    return titulos
+
+def carregar_batch(quantidade, com_linhas):
+    batch = TituloBatch()
+    for lote in lotes_registros(quantidade):
+        batch.adicionar(lote)
+    if com_linhas:
+        batch.gerar_linhas()
+    return batch
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titulos', type=int, default=1_000_000)
+    parser.add_argument('--com-linhas', action='store_true', help="Gera também as linhas digitáveis")
+    args = parser.parse_args()
+
+    print(f"{args.titulos} títulos{' com linhas digitáveis' if args.com_linhas else ''}")
+    lista = medir("Titulo", carregar_lista, args.titulos, args.com_linhas)
+    batch = medir("TituloBatch", carregar_batch, args.titulos, args.com_linhas)
+    print(f"  redução: {lista / batch:.1f}x")
+
+if __name__ == "__main__":
+    main()
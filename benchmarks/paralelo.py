@@ -0,0 +1,55 @@
+"""
+Vazão da geração das linhas digitáveis no próprio processo
+(`TituloBatch.gerar_linhas`) e em 1, 2, 4 e 8 processos (`GeradorParalelo`).
+
+A criação dos processos é medida à parte (primeira chamada, com poucos
+títulos); o tempo de geração inclui o envio dos dados e o retorno das linhas.
+O ganho depende dos núcleos disponíveis (os.cpu_count()).
+
+Uso:
+    python -m benchmarks.paralelo [--titulos N] [--processos 1 2 4 8] [--bloco N]
+"""
+import argparse
+import os
+import time
+
+from benchmarks.memoria_titulos import lotes_registros
+from models import TituloBatch
+from paralelo import TAMANHO_BLOCO, GeradorParalelo
+
+def carregar(quantidade):
+    batch = TituloBatch()
+    for lote in lotes_registros(quantidade):
+        batch.adicionar(lote)
+    return batch
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titulos', type=int, default=1_000_000)
+    parser.add_argument('--processos', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--bloco', type=int, default=TAMANHO_BLOCO, help="Títulos por tarefa")
+    args = parser.parse_args()
+
+    print(f"{args.titulos} títulos, {os.cpu_count()} CPU(s)")
+    batch = carregar(args.titulos)
+    inicio = time.perf_counter()
+    referencia = batch.gerar_linhas()
+    tempo = time.perf_counter() - inicio
+    print(f"  {'no processo':<14} {tempo:8.2f} s  {args.titulos / tempo:>12,.0f} títulos/s")
+
+    for processos in args.processos:
+        with GeradorParalelo(processos, tamanho_bloco=args.bloco, minimo_paralelo=0) as gerador:
+            inicio = time.perf_counter()
+            gerador.gerar(carregar(1000))
+            partida = time.perf_counter() - inicio
+
+            batch = carregar(args.titulos)
+            inicio = time.perf_counter()
+            linhas = gerador.gerar(batch)
+            tempo = time.perf_counter() - inicio
+            assert linhas == referencia
+            print(f"  {f'{processos} processo(s)':<14} {tempo:8.2f} s  {args.titulos / tempo:>12,.0f} títulos/s"
+                  f"  (início dos processos: {partida:.2f} s)")
+
+if __name__ == "__main__":
+    main()
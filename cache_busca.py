@@ -0,0 +1,114 @@
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Caracteres curinga do LIKE: termos com eles não podem ser filtrados localmente
+_CURINGAS_LIKE = set('%_[')
+
+def _normalizar(texto: str) -> str:
+    """Texto sem acentos e sem diferenciar maiúsculas, como na collation CI_AI do servidor."""
+    decomposto = unicodedata.normalize('NFKD', texto.casefold())
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+class CacheBuscaPessoas:
+    """
+    Cache LRU com validade (TTL) dos resultados de `search_pessoas`, por (tipo, termo).
+
+    Quando um termo só acrescenta letras a um termo já buscado ("ACM" -> "ACME")
+    e o resultado anterior estava completo (menos linhas que o limite da busca),
+    o novo resultado é obtido filtrando o anterior, sem ir ao banco. O filtro
+    ignora acentos e maiúsculas ("jose" encontra "José"), como a busca no
+    servidor. Termos só com dígitos não são refinados, pois também buscam o
+    código exato.
+
+    Args:
+        limite (int): Máximo de linhas da busca no banco (TOP)
+        tamanho (int): Quantidade máxima de termos guardados
+        ttl (float): Segundos de validade de cada resultado
+    """
+
+    def __init__(self, limite: int, tamanho: int = 256, ttl: float = 60):
+        self.limite = limite
+        self.tamanho = tamanho
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._itens = OrderedDict()  # (tipo, termo) -> (momento da busca, resultado)
+        self.acertos = 0
+        self.refinamentos = 0
+        self.faltas = 0
+
+    @staticmethod
+    def _chave(tipo: str, termo: str):
+        return tipo, termo.casefold()
+
+    def _valido(self, chave, agora: float):
+        item = self._itens.get(chave)
+        if item is None:
+            return None
+        if agora - item[0] > self.ttl:
+            del self._itens[chave]
+            return None
+        self._itens.move_to_end(chave)
+        return item
+
+    def _guardar(self, chave, momento: float, resultado: List[Dict[str, Any]]) -> None:
+        self._itens[chave] = (momento, resultado)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.tamanho:
+            self._itens.popitem(last=False)
+
+    @staticmethod
+    def _contem(pessoa: Dict[str, Any], termo: str) -> bool:
+        """Mesmo critério do LIKE '%termo%' em nome e cgc; `termo` já normalizado (`_normalizar`)."""
+        return termo in _normalizar(pessoa['nome'] or '') or termo in _normalizar(pessoa['cgc'] or '')
+
+    def obter(self, tipo: str, termo: str) -> Optional[List[Dict[str, Any]]]:
+        """Resultado em cache (direto ou refinado de um termo menor), ou None."""
+        chave = self._chave(tipo, termo)
+        agora = time.monotonic()
+        with self._lock:
+            item = self._valido(chave, agora)
+            if item is not None:
+                self.acertos += 1
+                return list(item[1])
+
+            texto = chave[1]
+            if not (texto.isdigit() or _CURINGAS_LIKE & set(texto)):
+                # Procura o maior prefixo já buscado com resultado completo
+                for tamanho in range(len(texto) - 1, 0, -1):
+                    anterior = self._valido((tipo, texto[:tamanho]), agora)
+                    if anterior is None or len(anterior[1]) >= self.limite:
+                        continue
+                    normalizado = _normalizar(texto)
+                    resultado = [pessoa for pessoa in anterior[1] if self._contem(pessoa, normalizado)]
+                    # O resultado refinado vale só até o fim da validade do anterior
+                    self._guardar(chave, anterior[0], resultado)
+                    self.refinamentos += 1
+                    return list(resultado)
+
+            self.faltas += 1
+            return None
+
+    def guardar(self, tipo: str, termo: str, resultado: List[Dict[str, Any]]) -> None:
+        """Guarda o resultado de uma busca feita no banco."""
+        with self._lock:
+            self._guardar(self._chave(tipo, termo), time.monotonic(), list(resultado))
+
+    def limpar(self) -> None:
+        """Descarta todos os resultados guardados."""
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores de uso do cache, para ajuste de tamanho e validade."""
+        with self._lock:
+            consultas = self.acertos + self.refinamentos + self.faltas
+            return {
+                'acertos': self.acertos,
+                'refinamentos': self.refinamentos,
+                'faltas': self.faltas,
+                'taxa_acerto': (self.acertos + self.refinamentos) / consultas if consultas else 0.0,
+                'itens': len(self._itens),
+            }
@@ -0,0 +1,186 @@
+"""
+Cache em disco (SQLite) das linhas digitáveis já geradas.
+
+A linha digitável depende só da configuração do boleto da empresa, do seu
+número, do vencimento e do valor. A chave de cada linha é formada por esses
+dados ("F|123456785|739000|150000": configuração FIDC ou SEC, seu número,
+vencimento em ordinal e valor em centavos), e o arquivo guarda o hash das
+configurações do .env com que as linhas foram geradas: se a configuração
+mudar, o cache é esvaziado ao abrir.
+
+O tamanho é limitado em quantidade de linhas; ao passar do limite, as usadas
+há mais tempo são descartadas (LRU, pelo momento do último uso gravado junto
+de cada linha, atualizado no máximo uma vez a cada `INTERVALO_USO` segundos
+para que as leituras repetidas não virem escritas).
+
+Com a geração em lote (NumPy), calcular as linhas é mais rápido que lê-las do
+cache (ver `python -m benchmarks.cache_linhas`); por isso ele é opcional e
+fica desativado se CACHE_LINHAS não estiver no .env.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+from linha_digitavel import EMPRESAS, carregar_configs
+
+logger = logging.getLogger(__name__)
+
+# Chaves por instrução SQL (limite de parâmetros do SQLite)
+_CHAVES_POR_CONSULTA = 900
+# Segundos entre atualizações do último uso de uma mesma linha
+INTERVALO_USO = 3600
+# Muda quando a forma da chave ou o algoritmo de geração mudar
+_VERSAO = 1
+
+def hash_configs() -> str:
+    """Hash das configurações de boleto do .env (todas as empresas)."""
+    configs = carregar_configs()
+    partes = [str(_VERSAO)]
+    for empresa in EMPRESAS:
+        config = configs[empresa]
+        partes.append("|".join((empresa, config.banco, config.moeda, config.carteira,
+                                config.agencia, config.conta, config.dac_conta)))
+    return hashlib.sha256(";".join(partes).encode('utf-8')).hexdigest()
+
+def chave_linha(empresa: str, seu_numero: str, vencimento_ordinal: int, valor_centavos: int) -> str:
+    """Chave de cache de um título (títulos que não são FIDC usam a configuração SEC)."""
+    return f"{'F' if empresa == 'FIDC' else 'S'}|{seu_numero}|{vencimento_ordinal}|{valor_centavos}"
+
+class CacheLinhas:
+    """
+    Cache LRU em disco das linhas digitáveis, por chave do título (`chave_linha`).
+
+    Pode ser usado por várias threads; cada processo abre sua conexão.
+
+    Args:
+        caminho (str): Arquivo SQLite do cache (criado se não existir)
+        tamanho (int): Quantidade máxima de linhas guardadas
+        versao_config (str): Hash da configuração atual (padrão: `hash_configs()`)
+    """
+
+    def __init__(self, caminho: str, tamanho: int = 1_000_000, versao_config: Optional[str] = None):
+        self.caminho = caminho
+        self.tamanho = tamanho
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute("CREATE TABLE IF NOT EXISTS meta (nome TEXT PRIMARY KEY, valor TEXT NOT NULL)")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS linhas ("
+            " chave TEXT PRIMARY KEY, linha TEXT NOT NULL, uso INTEGER NOT NULL"
+            ") WITHOUT ROWID")
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS ix_linhas_uso ON linhas (uso)")
+
+        versao_config = versao_config or hash_configs()
+        with self._transacao():
+            meta = dict(self._conexao.execute("SELECT nome, valor FROM meta"))
+            if meta.get('config') != versao_config:
+                if meta.get('config') is not None:
+                    logger.info("Configuração do boleto alterada: cache de linhas digitáveis esvaziado")
+                self._conexao.execute("DELETE FROM linhas")
+                self._conexao.execute("INSERT OR REPLACE INTO meta VALUES ('config', ?)", (versao_config,))
+            self._quantidade = self._conexao.execute("SELECT COUNT(*) FROM linhas").fetchone()[0]
+        self.acertos = 0
+        self.faltas = 0
+
+    @contextmanager
+    def _transacao(self):
+        self._conexao.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conexao.execute("ROLLBACK")
+            raise
+        self._conexao.execute("COMMIT")
+
+    def obter(self, chaves: Sequence[str]) -> List[Optional[str]]:
+        """Linhas guardadas das chaves (None nas que não estão no cache), marcando-as como usadas."""
+        encontradas: Dict[str, str] = {}
+        agora = int(time.time())
+        with self._lock, self._transacao():
+            for inicio in range(0, len(chaves), _CHAVES_POR_CONSULTA):
+                parte = list(chaves[inicio:inicio + _CHAVES_POR_CONSULTA])
+                antigas = []
+                for chave, linha, uso in self._conexao.execute(
+                        f"SELECT chave, linha, uso FROM linhas WHERE chave IN ({','.join('?' * len(parte))})", parte):
+                    encontradas[chave] = linha
+                    if agora - uso >= INTERVALO_USO:
+                        antigas.append(chave)
+                if antigas:
+                    self._conexao.execute(
+                        f"UPDATE linhas SET uso = ? WHERE chave IN ({','.join('?' * len(antigas))})",
+                        [agora, *antigas])
+            self.acertos += len(encontradas)
+            self.faltas += len(chaves) - len(encontradas)
+        return [encontradas.get(chave) for chave in chaves]
+
+    def guardar(self, chaves: Sequence[str], linhas: Sequence[str]) -> None:
+        """Guarda linhas geradas, descartando as menos usadas se passar do tamanho máximo."""
+        if not chaves:
+            return
+        # Chaves repetidas no lote são gravadas uma vez (vale a última linha)
+        novas = dict(zip(chaves, linhas))
+        agora = int(time.time())
+        with self._lock, self._transacao():
+            unicas = list(novas)
+            existentes = sum(self._contar_existentes(unicas[inicio:inicio + _CHAVES_POR_CONSULTA])
+                             for inicio in range(0, len(unicas), _CHAVES_POR_CONSULTA))
+            self._conexao.executemany("INSERT OR REPLACE INTO linhas VALUES (?, ?, ?)",
+                                      ((chave, linha, agora) for chave, linha in novas.items()))
+            self._quantidade += len(novas) - existentes
+            if self._quantidade > self.tamanho:
+                # Outro processo pode ter gravado no mesmo arquivo: o excesso vem da contagem real
+                self._quantidade = self._conexao.execute("SELECT COUNT(*) FROM linhas").fetchone()[0]
+                if self._quantidade > self.tamanho:
+                    self._conexao.execute(
+                        "DELETE FROM linhas WHERE chave IN (SELECT chave FROM linhas ORDER BY uso LIMIT ?)",
+                        (self._quantidade - self.tamanho,))
+                    self._quantidade = self.tamanho
+
+    def _contar_existentes(self, chaves: List[str]) -> int:
+        return self._conexao.execute(
+            f"SELECT COUNT(*) FROM linhas WHERE chave IN ({','.join('?' * len(chaves))})", chaves).fetchone()[0]
+
+    def limpar(self) -> None:
+        """Descarta todas as linhas guardadas."""
+        with self._lock, self._transacao():
+            self._conexao.execute("DELETE FROM linhas")
+            self._quantidade = 0
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._conexao.close()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores de uso do cache, para ajuste de tamanho."""
+        with self._lock:
+            consultas = self.acertos + self.faltas
+            return {
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+                'itens': self._quantidade,
+            }
+
+@lru_cache(maxsize=None)
+def cache_do_ambiente() -> Optional[CacheLinhas]:
+    """
+    Cache configurado no .env (CACHE_LINHAS com o caminho do arquivo e
+    CACHE_LINHAS_TAMANHO), aberto uma única vez; None se não configurado
+    ou se não puder ser aberto.
+    """
+    caminho = os.getenv('CACHE_LINHAS', '').strip()
+    if not caminho:
+        return None
+    try:
+        return CacheLinhas(caminho, tamanho=int(os.getenv('CACHE_LINHAS_TAMANHO', '1000000')))
+    except Exception as e:
+        logger.warning(f"Cache de linhas digitáveis desativado: {e}")
+        return None
@@ -0,0 +1,191 @@
+"""
+Modo sem interface gráfica do gerador de linhas digitáveis.
+
+Uso:
+    python -m linha_digitavel batch [filtros] [--formato txt|csv|jsonl] [--saida ARQUIVO] [--gravar]
+    python -m linha_digitavel validar ARQUIVO
+
+Não importa PyQt5 nem pandas, para que execuções agendadas (cron) iniciem rápido
+e rodem sem servidor gráfico.
+"""
+import argparse
+import csv
+import json
+import sys
+from datetime import date
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+# Colunas das saídas CSV e JSONL
+COLUNAS = ['id', 'empresa', 'codigo', 'sacado', 'bordero', 'data_bordero', 'numero_documento',
+           'seu_numero', 'codigo_dcto', 'tipodcto', 'vencimento', 'valor', 'linha_digitavel']
+
+def _data(texto: str) -> str:
+    """Valida uma data no formato yyyy-mm-dd (como usado em `get_titulos`)."""
+    try:
+        return date.fromisoformat(texto).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida: {texto} (use yyyy-mm-dd)")
+
+def _criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m linha_digitavel',
+        description="Gerador de Linha Digitável - WBA (modo sem interface gráfica)"
+    )
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    batch = comandos.add_parser('batch', help="Gera as linhas digitáveis dos títulos filtrados")
+    pessoa = batch.add_mutually_exclusive_group()
+    pessoa.add_argument('--cedente', type=int, metavar='CODIGO', help="Código do cedente")
+    pessoa.add_argument('--sacado', type=int, metavar='CODIGO', help="Código do sacado")
+    batch.add_argument('--bordero', type=int, help="Número do bordero")
+    batch.add_argument('--data-bordero', nargs=2, type=_data, metavar=('INICIAL', 'FINAL'),
+                       help="Período da data do bordero (yyyy-mm-dd)")
+    batch.add_argument('--vencimento', nargs=2, type=_data, metavar=('INICIAL', 'FINAL'),
+                       help="Período de vencimento (yyyy-mm-dd)")
+    batch.add_argument('--empresa', choices=['SEC', 'FIDC'], help="Empresa (padrão: ambas)")
+    batch.add_argument('--formato', choices=['txt', 'csv', 'jsonl'], default='txt',
+                       help="txt: uma linha digitável por linha; csv (separado por ;) e jsonl: título completo")
+    batch.add_argument('--saida', help="Arquivo de saída (padrão: saída padrão)")
+    batch.add_argument('--tamanho-lote', type=int, default=5000, help="Títulos gerados por vez")
+    batch.add_argument('--paralelo', action='store_true',
+                       help="Sem --empresa, consulta FIDC e SEC em paralelo (as empresas saem intercaladas)")
+    batch.add_argument('--processos', type=int, default=1, metavar='N',
+                       help="Gera as linhas de cada lote em N processos (use com --tamanho-lote grande, ex.: 500000)")
+    batch.add_argument('--gravar', action='store_true',
+                       help="Grava também as linhas geradas no banco (tabela DB_TABELA_LINHAS)")
+    batch.add_argument('--lote-gravacao', type=int, metavar='N',
+                       help="Linhas gravadas por commit com --gravar (padrão: DB_GRAVACAO_LOTE ou 10000)")
+
+    validar = comandos.add_parser('validar', help="Valida um arquivo com uma linha digitável por linha")
+    validar.add_argument('arquivo', help="Arquivo a validar")
+
+    return parser
+
+def _valor_json(valor: Any) -> Any:
+    """Converte datas e Decimals para tipos serializáveis."""
+    if isinstance(valor, date):
+        return valor.isoformat()
+    if hasattr(valor, 'is_finite'):  # Decimal
+        return str(valor)
+    return valor
+
+class _Escritor:
+    """Escreve títulos com linha digitável no formato escolhido."""
+
+    def __init__(self, saida, formato: str):
+        self.saida = saida
+        self.formato = formato
+        if formato == 'csv':
+            self._csv = csv.writer(saida, delimiter=';', lineterminator='\n')
+            self._csv.writerow(COLUNAS)
+
+    def escrever(self, registros: List[Dict[str, Any]], linhas: List[str]) -> None:
+        if self.formato == 'txt':
+            self.saida.writelines(f"{linha}\n" for linha in linhas)
+        elif self.formato == 'csv':
+            self._csv.writerows(
+                [*(_valor_json(registro[coluna]) for coluna in COLUNAS[:-1]), linha]
+                for registro, linha in zip(registros, linhas)
+            )
+        else:
+            for registro, linha in zip(registros, linhas):
+                dados = {coluna: _valor_json(registro[coluna]) for coluna in COLUNAS[:-1]}
+                dados['linha_digitavel'] = linha
+                self.saida.write(json.dumps(dados, ensure_ascii=False) + "\n")
+
+def _comando_batch(args) -> int:
+    from db import db_connection
+    from linha_digitavel import carregar_configs
+    from models import TituloBatch, gerar_linhas_registros
+    from paralelo import MINIMO_PARALELO, GeradorParalelo
+
+    try:
+        carregar_configs()
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    if not db_connection.connect():
+        print("Não foi possível conectar ao banco de dados.", file=sys.stderr)
+        return 1
+
+    filtros = {
+        'codigo_pessoa': args.cedente or args.sacado,
+        'tipo_pessoa': "Cedente" if args.cedente else "Sacado" if args.sacado else None,
+        'bordero': args.bordero,
+        'empresa': args.empresa,
+    }
+    if args.data_bordero:
+        filtros['data_bordero_inicial'], filtros['data_bordero_final'] = args.data_bordero
+    if args.vencimento:
+        filtros['data_vencimento_inicial'], filtros['data_vencimento_final'] = args.vencimento
+
+    if args.gravar:
+        # A leitura fica com uma conexão por empresa consultada enquanto a gravação usa outra
+        leitura = 2 if args.paralelo and not args.empresa else 1
+        if db_connection.pool.max_size < leitura + 1:
+            print(f"--gravar precisa de DB_POOL_SIZE >= {leitura + 1} "
+                  f"(atual: {db_connection.pool.max_size})", file=sys.stderr)
+            return 2
+
+    saida = open(args.saida, 'w', encoding='utf-8', newline='') if args.saida else sys.stdout
+    gerador = None
+    if args.processos > 1:
+        # Cada lote lido é dividido entre os processos, qualquer que seja --tamanho-lote
+        gerador = GeradorParalelo(args.processos, tamanho_bloco=-(-args.tamanho_lote // args.processos),
+                                  minimo_paralelo=0)
+        if args.tamanho_lote < MINIMO_PARALELO:
+            print(f"Aviso: com --tamanho-lote {args.tamanho_lote}, o envio aos processos tende a custar mais "
+                  f"que a geração; use --tamanho-lote {MINIMO_PARALELO} ou mais com --processos",
+                  file=sys.stderr)
+    try:
+        escritor = _Escritor(saida, args.formato)
+
+        def gerar():
+            # Os títulos são lidos, gerados e escritos lote a lote, em memória constante
+            for lote in db_connection.iter_titulos(batch_size=args.tamanho_lote,
+                                                    paralelo=args.paralelo, **filtros):
+                if gerador is not None:
+                    linhas = gerador.gerar(TituloBatch.from_registros(lote))
+                else:
+                    linhas = gerar_linhas_registros(lote)
+                escritor.escrever(lote, linhas)
+                yield from ((registro['id'], registro['empresa'], linha)
+                            for registro, linha in zip(lote, linhas))
+
+        if args.gravar:
+            gravadas = db_connection.gravar_linhas(gerar(), args.lote_gravacao)
+            print(f"{gravadas} linha(s) gravada(s) em {db_connection.tabela_linhas}", file=sys.stderr)
+        else:
+            for _ in gerar():
+                pass
+    finally:
+        if gerador is not None:
+            gerador.fechar()
+        if saida is not sys.stdout:
+            saida.close()
+        db_connection.disconnect()
+    return 0
+
+def _comando_validar(args) -> int:
+    from linha_digitavel import validar_arquivo
+
+    invalidas = 0
+    for numero, linha, motivo in validar_arquivo(args.arquivo):
+        print(f"{numero};{linha};{motivo}")
+        invalidas += 1
+    print(f"{invalidas} linha(s) inválida(s)", file=sys.stderr)
+    return 1 if invalidas else 0
+
+def main(argv=None) -> int:
+    """Ponto de entrada do modo sem interface gráfica."""
+    args = _criar_parser().parse_args(argv)
+    load_dotenv()
+    if args.comando == 'batch':
+        return _comando_batch(args)
+    return _comando_validar(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
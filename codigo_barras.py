@@ -0,0 +1,170 @@
+import os
+import struct
+import zlib
+from functools import lru_cache
+from typing import Iterable, List
+
+import numpy as np
+
+# Padrões Interleaved 2 of 5 de cada dígito: N = elemento estreito, W = largo
+_PADROES_DIGITO = {
+    '0': 'NNWWN', '1': 'WNNNW', '2': 'NWNNW', '3': 'WWNNN', '4': 'NNWNW',
+    '5': 'WNWNN', '6': 'NWWNN', '7': 'NNNWW', '8': 'WNNWN', '9': 'NWNWN',
+}
+
+# Início (barra, espaço, barra, espaço estreitos) e fim (barra larga, espaço e barra estreitos)
+_INICIO = 'NNNN'
+_FIM = 'WNN'
+
+# Cor de cada pixel em tons de cinza (8 bits)
+_PRETO = 0
+_BRANCO = 255
+
+def _padrao_par(par):
+    """Intercala os padrões de um par de dígitos: barras do primeiro, espaços do segundo."""
+    barras, espacos = _PADROES_DIGITO[par[0]], _PADROES_DIGITO[par[1]]
+    return ''.join(b + e for b, e in zip(barras, espacos))
+
+# Os 100 pares de dígitos, cada um com 10 elementos (barra, espaço, barra, ...)
+_PARES_LARGOS = np.array([[elemento == 'W' for elemento in _padrao_par(f"{par:02d}")]
+                          for par in range(100)], dtype=bool)
+
+class RenderizadorITF:
+    """
+    Renderiza códigos de barras Interleaved 2 of 5 (ITF-25), o padrão dos boletos.
+
+    As larguras dos 100 pares de dígitos, e os pixels de cada par, são
+    pré-calculados na criação do renderizador; cada código é montado apenas
+    juntando os trechos em cache.
+
+    Args:
+        estreita (int): Largura do elemento estreito, em pixels
+        proporcao (int): Quantas vezes o elemento largo é maior que o estreito
+        altura (int): Altura das barras, em pixels
+        margem (int): Zona de silêncio em cada lado, em elementos estreitos
+    """
+
+    def __init__(self, estreita: int = 1, proporcao: int = 3, altura: int = 50, margem: int = 10):
+        if estreita < 1 or proporcao < 2 or altura < 1 or margem < 0:
+            raise ValueError("Parâmetros de renderização inválidos")
+        self.estreita = estreita
+        self.larga = estreita * proporcao
+        self.altura = altura
+        self.margem = margem * estreita
+
+        # Larguras de cada elemento, por par de dígitos e nas guardas
+        self.larguras_pares = np.where(_PARES_LARGOS, self.larga, self.estreita).astype(np.uint16)
+        self.larguras_inicio = np.array([self._largura(e) for e in _INICIO], dtype=np.uint16)
+        self.larguras_fim = np.array([self._largura(e) for e in _FIM], dtype=np.uint16)
+
+        # Pixels de cada trecho; pares e início começam com barra, o fim também
+        self._pixels_pares = [self._pixels(larguras) for larguras in self.larguras_pares]
+        self._pixels_inicio = self._pixels(self.larguras_inicio)
+        self._pixels_fim = self._pixels(self.larguras_fim)
+        self._pixels_margem = bytes([_BRANCO]) * self.margem
+
+    def _largura(self, elemento):
+        return self.larga if elemento == 'W' else self.estreita
+
+    @staticmethod
+    def _pixels(larguras):
+        """Pixels de uma sequência de elementos que começa com barra."""
+        cores = np.where(np.arange(len(larguras)) % 2 == 0, _PRETO, _BRANCO).astype(np.uint8)
+        return np.repeat(cores, larguras).tobytes()
+
+    @staticmethod
+    def _pares(codigo_barras):
+        """Índices (0 a 99) dos pares de dígitos do código."""
+        if len(codigo_barras) % 2 or not (codigo_barras.isascii() and codigo_barras.isdigit()):
+            raise ValueError("O código ITF deve ter uma quantidade par de dígitos")
+        return [int(codigo_barras[i:i + 2]) for i in range(0, len(codigo_barras), 2)]
+
+    def larguras(self, codigo_barras: str) -> np.ndarray:
+        """
+        Larguras dos elementos do código, alternando barra e espaço (começando por barra).
+
+        Não inclui as margens.
+        """
+        return np.concatenate([self.larguras_inicio,
+                               self.larguras_pares[self._pares(codigo_barras)].ravel(),
+                               self.larguras_fim])
+
+    def larguras_batch(self, codigos: Iterable[str]) -> np.ndarray:
+        """
+        Larguras dos elementos de vários códigos de mesmo tamanho, uma linha por código.
+        """
+        codigos = list(codigos)
+        if not codigos:
+            return np.empty((0, 0), dtype=np.uint16)
+        tamanho = len(codigos[0])
+        if tamanho % 2 or any(len(codigo) != tamanho for codigo in codigos):
+            raise ValueError("Os códigos ITF devem ter o mesmo tamanho, com quantidade par de dígitos")
+        digitos = np.frombuffer(''.join(codigos).encode('ascii'), dtype=np.uint8).reshape(len(codigos), tamanho) - ord('0')
+        if (digitos > 9).any():
+            raise ValueError("O código ITF deve conter apenas dígitos")
+        pares = digitos[:, 0::2].astype(np.intp) * 10 + digitos[:, 1::2]
+        n = len(codigos)
+        return np.concatenate([np.broadcast_to(self.larguras_inicio, (n, len(self.larguras_inicio))),
+                               self.larguras_pares[pares].reshape(n, -1),
+                               np.broadcast_to(self.larguras_fim, (n, len(self.larguras_fim)))], axis=1)
+
+    def linha_pixels(self, codigo_barras: str) -> bytes:
+        """Uma linha de pixels (8 bits, 0 = barra) do código, com as margens."""
+        pixels_pares = self._pixels_pares
+        return b''.join([self._pixels_margem, self._pixels_inicio,
+                         *[pixels_pares[par] for par in self._pares(codigo_barras)],
+                         self._pixels_fim, self._pixels_margem])
+
+    def png(self, codigo_barras: str) -> bytes:
+        """Imagem PNG (preto e branco, 1 bit por pixel) do código de barras."""
+        linha = self.linha_pixels(codigo_barras)
+        bits = np.packbits(np.frombuffer(linha, dtype=np.uint8) == _BRANCO).tobytes()
+        # Cada linha da imagem é precedida do filtro 0; todas as linhas são iguais
+        dados = (b'\x00' + bits) * self.altura
+        cabecalho = struct.pack('>IIBBBBB', len(linha), self.altura, 1, 0, 0, 0, 0)
+        return b''.join([b'\x89PNG\r\n\x1a\n',
+                         _chunk_png(b'IHDR', cabecalho),
+                         _chunk_png(b'IDAT', zlib.compress(dados, 6)),
+                         _chunk_png(b'IEND', b'')])
+
+    def svg(self, codigo_barras: str) -> str:
+        """Imagem SVG do código de barras, com um retângulo por barra."""
+        larguras = self.larguras(codigo_barras)
+        posicoes = self.margem + np.concatenate([[0], np.cumsum(larguras[:-1], dtype=np.int64)])
+        largura_total = int(posicoes[-1] + larguras[-1]) + self.margem
+        barras = ''.join(f'<rect x="{x}" width="{w}" height="{self.altura}"/>'
+                         for x, w in zip(posicoes[0::2].tolist(), larguras[0::2].tolist()))
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{largura_total}" height="{self.altura}" '
+                f'viewBox="0 0 {largura_total} {self.altura}" shape-rendering="crispEdges">'
+                f'<rect width="100%" height="100%" fill="#fff"/><g fill="#000">{barras}</g></svg>')
+
+    def salvar_batch(self, codigos: Iterable[str], diretorio: str, formato: str = 'png') -> List[str]:
+        """
+        Salva a imagem de cada código em `diretorio`, com o código como nome do arquivo.
+
+        Returns:
+            list[str]: Caminhos dos arquivos gerados, na ordem de entrada
+        """
+        if formato not in ('png', 'svg'):
+            raise ValueError(f"Formato não suportado: {formato}")
+        os.makedirs(diretorio, exist_ok=True)
+        caminhos = []
+        for codigo in codigos:
+            caminho = os.path.join(diretorio, f"{codigo}.{formato}")
+            if formato == 'png':
+                with open(caminho, 'wb') as arquivo:
+                    arquivo.write(self.png(codigo))
+            else:
+                with open(caminho, 'w', encoding='utf-8') as arquivo:
+                    arquivo.write(self.svg(codigo))
+            caminhos.append(caminho)
+        return caminhos
+
+def _chunk_png(tipo, dados):
+    """Monta um chunk PNG: tamanho, tipo, dados e CRC."""
+    return struct.pack('>I', len(dados)) + tipo + dados + struct.pack('>I', zlib.crc32(tipo + dados))
+
+@lru_cache(maxsize=None)
+def renderizador(estreita: int = 1, proporcao: int = 3, altura: int = 50, margem: int = 10) -> RenderizadorITF:
+    """Renderizador com os parâmetros informados, criado uma única vez."""
+    return RenderizadorITF(estreita, proporcao, altura, margem)
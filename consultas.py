@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple, Union
+
+from backends import Dialeto
+
+Data = Union[date, str, None]
+
+@dataclass(frozen=True)
+class RamoTitulos:
+    """Tabela de títulos de uma empresa e as colunas usadas nos filtros."""
+    empresa: str             # "FIDC" ou "SEC"
+    tabela: str              # Tabela com os dados de cobrança do título
+    alias: str               # Alias da tabela na consulta
+    coluna_vencimento: str   # Coluna de vencimento, sem o alias
+
+# Ramos da consulta de títulos, na ordem em que são unidos
+RAMOS = {
+    'FIDC': RamoTitulos(empresa='FIDC', tabela='sigfidc', alias='fidc', coluna_vencimento='[data]'),
+    'SEC': RamoTitulos(empresa='SEC', tabela='sigflu', alias='sec', coluna_vencimento='vcto_'),
+}
+
+def _como_data(valor: Data) -> Optional[date]:
+    """Converte datas no formato yyyy-mm-dd (como vindas da interface) em date."""
+    if valor is None or valor == '':
+        return None
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(valor)
+
+class ConsultaTitulos:
+    """
+    Monta a consulta de títulos com predicados que permitem busca por índice.
+
+    Os filtros de data são emitidos como intervalos semiabertos sobre as colunas
+    originais (`coluna >= inicio AND coluna < fim + 1 dia`), sem CAST em volta
+    da coluna, e o filtro de vencimento usa a coluna de cada empresa
+    (`fidc.[data]` no FIDC, `sec.vcto_` na SEC).
+
+    `montar` retorna o SQL e os parâmetros, o que permite conferir a consulta
+    sem acesso ao servidor.
+
+    Args:
+        codigo_pessoa: Código da pessoa (Cedente ou Sacado)
+        tipo_pessoa: Tipo da pessoa ("Cedente" ou "Sacado")
+        bordero: Número do bordero (opcional)
+        data_bordero_inicial: Data inicial do bordero (opcional)
+        data_bordero_final: Data final do bordero (opcional)
+        data_vencimento_inicial: Data inicial de vencimento (opcional)
+        data_vencimento_final: Data final de vencimento (opcional)
+        empresa: Empresa (SEC ou FIDC) (opcional)
+        dialeto: Dialeto de SQL do banco (padrão: SQL Server)
+    """
+
+    def __init__(self,
+                 codigo_pessoa: int = None,
+                 tipo_pessoa: str = None,
+                 bordero: int = None,
+                 data_bordero_inicial: Data = None,
+                 data_bordero_final: Data = None,
+                 data_vencimento_inicial: Data = None,
+                 data_vencimento_final: Data = None,
+                 empresa: str = None,
+                 dialeto: Dialeto = None):
+        self.codigo_pessoa = codigo_pessoa
+        self.tipo_pessoa = tipo_pessoa
+        self.bordero = bordero
+        self.data_bordero_inicial = _como_data(data_bordero_inicial)
+        self.data_bordero_final = _como_data(data_bordero_final)
+        self.data_vencimento_inicial = _como_data(data_vencimento_inicial)
+        self.data_vencimento_final = _como_data(data_vencimento_final)
+        self.empresa = empresa
+        self.dialeto = dialeto or Dialeto()
+
+    @property
+    def ramos(self) -> List[RamoTitulos]:
+        """Ramos consultados: o da empresa filtrada ou ambos."""
+        if self.empresa in RAMOS:
+            return [RAMOS[self.empresa]]
+        return list(RAMOS.values())
+
+    @staticmethod
+    def _intervalo(coluna: str, inicial: date, final: date) -> List[Tuple[str, Tuple]]:
+        """Predicados de intervalo semiaberto [inicial, final + 1 dia) sobre a coluna."""
+        return [(f"{coluna} >= ?", (inicial,)),
+                (f"{coluna} < ?", (final + timedelta(days=1),))]
+
+    def predicados(self, ramo: RamoTitulos) -> List[Tuple[str, Tuple]]:
+        """Predicados do WHERE de um ramo, cada um com seus parâmetros."""
+        a = ramo.alias
+        predicados = [
+            ("f.codigo IN ('040')", ()),
+            (f"({a}.banco IS NULL OR LTRIM(RTRIM({a}.banco)) = '')", ()),
+            (f"NOT({a}.numero_port IS NULL OR LTRIM(RTRIM({a}.numero_port)) = '')", ()),
+            ("NOT EXISTS (\n    SELECT 1 FROM sigfcs AS fcs WHERE fcs.sigfls = f.ctrl_id\n)", ()),
+        ]
+
+        # Filtro de pessoa (Cedente ou Sacado)
+        if self.codigo_pessoa and self.tipo_pessoa == "Cedente":
+            predicados.append(("f.clifor = ?", (self.codigo_pessoa,)))
+        elif self.codigo_pessoa and self.tipo_pessoa == "Sacado":
+            predicados.append(("f.sacado = ?", (self.codigo_pessoa,)))
+
+        # Filtro de bordero
+        if self.bordero:
+            predicados.append(("f.bordero = ?", (self.bordero,)))
+
+        # Filtro de data do bordero
+        if self.data_bordero_inicial and self.data_bordero_final:
+            predicados += self._intervalo("f.dtbordero", self.data_bordero_inicial, self.data_bordero_final)
+
+        # Filtro de data de vencimento, na coluna de vencimento da empresa
+        if self.data_vencimento_inicial and self.data_vencimento_final:
+            predicados += self._intervalo(f"{a}.{ramo.coluna_vencimento}",
+                                          self.data_vencimento_inicial, self.data_vencimento_final)
+
+        return predicados
+
+    def montar_ramo(self, ramo: RamoTitulos) -> Tuple[str, Tuple]:
+        """SQL e parâmetros da consulta de um ramo (empresa)."""
+        a = ramo.alias
+        dialeto = self.dialeto
+        predicados = self.predicados(ramo)
+        where = "\nAND ".join(sql for sql, _ in predicados)
+        params = tuple(p for _, parametros in predicados for p in parametros)
+        query = f"""
+SELECT
+f.id,
+'{ramo.empresa}' AS empresa,
+f.clifor AS codigo,
+f.sacado,
+f.bordero,
+{dialeto.como_data('f.dtbordero', 'data_bordero')},
+f.dcto AS numero_documento,
+{a}.numero_port AS seu_numero,
+f.codigo AS codigo_dcto,
+f.tipodcto,
+{dialeto.como_data(f'{a}.{ramo.coluna_vencimento}', 'vencimento')},
+{dialeto.como_decimal(f'{a}.valor', 'valor')}
+
+FROM sigfls AS f
+INNER JOIN {ramo.tabela} AS {a}
+ON {a}.sigfls = f.ctrl_id
+WHERE {where}
+"""
+        return query, params
+
+    def montar(self) -> Tuple[str, Tuple]:
+        """SQL e parâmetros da consulta completa (ramos unidos por UNION ALL)."""
+        partes = [self.montar_ramo(ramo) for ramo in self.ramos]
+        query = " UNION ALL ".join(sql for sql, _ in partes)
+        params = tuple(p for _, parametros in partes for p in parametros)
+        return query, params
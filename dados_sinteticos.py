@@ -0,0 +1,168 @@
+"""
+Gera um banco SQLite com pessoas e títulos sintéticos, para testes e medições.
+
+Uso:
+    python -m dados_sinteticos [--caminho ARQUIVO] [--pessoas N] [--titulos N] [--semente N]
+
+Depois, com DB_BACKEND=sqlite e DB_SQLITE_PATH apontando para o arquivo, a
+aplicação, o modo sem interface gráfica e as exportações usam o banco gerado.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+from dotenv import load_dotenv
+
+from backends import SqliteBackend
+from linha_digitavel import modulo_10
+
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Partes dos nomes das pessoas (com acentos, como nos cadastros reais)
+_PREFIXOS = ['Comércio', 'Indústria', 'Distribuidora', 'Transportes', 'Construtora', 'Agropecuária',
+             'Metalúrgica', 'Farmácia', 'Padaria', 'Confecções', 'Auto Peças', 'Papelaria']
+_NOMES = ['São João', 'Santa Luzia', 'Irmãos Araújo', 'Boa Esperança', 'Nossa Senhora', 'Três Corações',
+          'Vale do Paraíba', 'Souza & Cia', 'Conceição', 'Ipiranga', 'Guarani', 'Paraná', 'Ouro Branco']
+_SUFIXOS = ['Ltda', 'S/A', 'ME', 'EIRELI', 'EPP']
+
+# Proporções dos títulos sintéticos
+_FRACAO_FIDC = 0.5        # Restante é SEC
+_FRACAO_OUTRO_CODIGO = 0.05  # Títulos fora do filtro f.codigo IN ('040')
+_FRACAO_COM_BANCO = 0.1   # Já registrados em banco (ignorados pela consulta)
+_FRACAO_BAIXADOS = 0.03   # Com registro em sigfcs (ignorados pela consulta)
+_TITULOS_POR_BORDERO = 50
+
+def _cnpjs(rng, n):
+    """CNPJs formatados (dígitos aleatórios, sem verificação)."""
+    numeros = rng.integers(0, 10**8, n)
+    filiais = rng.integers(1, 10, n)
+    dvs = rng.integers(0, 100, n)
+    return [f"{num // 10**6:02d}.{num // 1000 % 1000:03d}.{num % 1000:03d}/{filial:04d}-{dv:02d}"
+            for num, filial, dv in zip(numeros.tolist(), filiais.tolist(), dvs.tolist())]
+
+def gerar_pessoas(connection, quantidade: int, rng) -> None:
+    """Insere `quantidade` pessoas, metade cedentes e metade sacados."""
+    prefixos = rng.integers(0, len(_PREFIXOS), quantidade).tolist()
+    nomes = rng.integers(0, len(_NOMES), quantidade).tolist()
+    sufixos = rng.integers(0, len(_SUFIXOS), quantidade).tolist()
+    cnpjs = _cnpjs(rng, quantidade)
+    connection.executemany(
+        "INSERT INTO sigcad (id, codigo, nome, cgc, tipo) VALUES (?, ?, ?, ?, ?)",
+        ((i + 1, i + 1, f"{_PREFIXOS[p]} {_NOMES[n]} {i + 1} {_SUFIXOS[s]}", cnpj,
+          'Cedente' if i % 2 == 0 else 'Sacado')
+         for i, (p, n, s, cnpj) in enumerate(zip(prefixos, nomes, sufixos, cnpjs)))
+    )
+
+def _prefixo_dac() -> str:
+    """Agência, conta e carteira que antecedem o nosso número no cálculo do DAC."""
+    return f"{os.getenv('AGENCIA', '0000')}{os.getenv('FIDC_CONTA', '00000')}{os.getenv('CARTEIRA', '109')}"
+
+def gerar_titulos(connection, quantidade: int, pessoas: int, rng,
+                  inicio: date = date(2023, 1, 1), dias: int = 730, tamanho_lote: int = 100_000) -> None:
+    """
+    Insere `quantidade` títulos em sigfls, com a cobrança em sigfidc ou sigflu.
+
+    Os títulos são gerados em lotes com NumPy, para carregar milhões de linhas
+    em memória limitada.
+    """
+    cedentes = np.arange(1, pessoas + 1, 2)
+    sacados = np.arange(2, pessoas + 1, 2) if pessoas > 1 else cedentes
+    ordinal_inicio = inicio.toordinal()
+    prefixo_dac = _prefixo_dac()
+
+    for inicio_lote in range(0, quantidade, tamanho_lote):
+        n = min(tamanho_lote, quantidade - inicio_lote)
+        ids = np.arange(inicio_lote + 1, inicio_lote + n + 1)
+        clifor = rng.choice(cedentes, n)
+        sacado = rng.choice(sacados, n)
+        dtbordero = ordinal_inicio + rng.integers(0, dias, n)
+        vencimento = dtbordero + rng.integers(30, 121, n)
+        segundos = rng.integers(0, 86400, n)
+        fidc = rng.random(n) < _FRACAO_FIDC
+        codigo = np.where(rng.random(n) < _FRACAO_OUTRO_CODIGO, '041', '040')
+        com_banco = rng.random(n) < _FRACAO_COM_BANCO
+        baixado = rng.random(n) < _FRACAO_BAIXADOS
+        centavos = rng.integers(1_000, 5_000_000, n)
+
+        datas = {ordinal: date.fromordinal(ordinal).isoformat()
+                 for ordinal in np.unique(np.concatenate([dtbordero, vencimento])).tolist()}
+
+        linhas_fls = []
+        linhas_fidc = []
+        linhas_flu = []
+        for i, ctrl_id in enumerate(ids.tolist()):
+            s = int(segundos[i])
+            linhas_fls.append((ctrl_id, ctrl_id, int(clifor[i]), int(sacado[i]),
+                               (ctrl_id - 1) // _TITULOS_POR_BORDERO + 1,
+                               f"{datas[int(dtbordero[i])]} {s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}",
+                               f"{ctrl_id:08d}/1", str(codigo[i]), 'DM'))
+            nosso_numero = f"{ctrl_id % 10**8:08d}"
+            # DAC do nosso número: módulo 10 de agência, conta, carteira e nosso número
+            dac = modulo_10(prefixo_dac + nosso_numero)
+            cobranca = (ctrl_id, f"{nosso_numero}{dac}",
+                        '341' if com_banco[i] else None, datas[int(vencimento[i])],
+                        f"{centavos[i] // 100}.{centavos[i] % 100:02d}")
+            (linhas_fidc if fidc[i] else linhas_flu).append(cobranca)
+
+        connection.executemany(
+            "INSERT INTO sigfls (id, ctrl_id, clifor, sacado, bordero, dtbordero, dcto, codigo, tipodcto) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", linhas_fls)
+        connection.executemany(
+            "INSERT INTO sigfidc (sigfls, numero_port, banco, [data], valor) VALUES (?, ?, ?, ?, ?)", linhas_fidc)
+        connection.executemany(
+            "INSERT INTO sigflu (sigfls, numero_port, banco, vcto_, valor) VALUES (?, ?, ?, ?, ?)", linhas_flu)
+        connection.executemany(
+            "INSERT INTO sigfcs (sigfls) VALUES (?)", ((ctrl_id,) for ctrl_id in ids[baixado].tolist()))
+        connection.commit()
+        logger.info(f"{inicio_lote + n} de {quantidade} título(s) gerado(s)")
+
+def gerar_banco(caminho: str, pessoas: int = 2_000, titulos: int = 100_000, semente: int = 0) -> None:
+    """Cria o arquivo SQLite em `caminho` com as tabelas, os dados sintéticos e os índices."""
+    inicio = time.monotonic()
+    backend = SqliteBackend(caminho)
+    rng = np.random.default_rng(semente)
+    connection = backend.conectar()
+    try:
+        # Carga sem diário: o arquivo é descartável e pode ser gerado de novo
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        backend.criar_tabelas(connection)
+        gerar_pessoas(connection, pessoas, rng)
+        gerar_titulos(connection, titulos, pessoas, rng)
+        backend.criar_indices(connection)
+        connection.commit()
+    finally:
+        connection.close()
+    logger.info(f"Banco {caminho} gerado em {time.monotonic() - inicio:.1f}s")
+
+def main(argv=None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(prog='python -m dados_sinteticos',
+                                     description="Gera um banco SQLite com dados sintéticos")
+    parser.add_argument('--caminho', default=os.getenv('DB_SQLITE_PATH', 'linha_digitavel.db'),
+                        help="Arquivo SQLite (padrão: DB_SQLITE_PATH ou linha_digitavel.db)")
+    parser.add_argument('--pessoas', type=int, default=2_000, help="Quantidade de pessoas")
+    parser.add_argument('--titulos', type=int, default=100_000, help="Quantidade de títulos")
+    parser.add_argument('--semente', type=int, default=0, help="Semente dos números aleatórios")
+    parser.add_argument('--substituir', action='store_true', help="Apaga o arquivo, se já existir")
+    args = parser.parse_args(argv)
+
+    if args.pessoas < 1 or args.titulos < 0:
+        parser.error("--pessoas deve ser ao menos 1 e --titulos não pode ser negativo")
+    if os.path.exists(args.caminho):
+        if not args.substituir:
+            print(f"{args.caminho} já existe (use --substituir para gerar de novo)", file=sys.stderr)
+            return 1
+        os.remove(args.caminho)
+
+    gerar_banco(args.caminho, args.pessoas, args.titulos, args.semente)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
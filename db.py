@@ -1,105 +1,457 @@
 import os
-import pyodbc
+import queue
+import re
+import threading
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+from itertools import islice
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
 import logging
 
+from backends import Backend, backend_do_ambiente
+from cache_busca import CacheBuscaPessoas
+from consultas import ConsultaTitulos
+from linha_digitavel import codigo_barras_da_linha
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Máximo de pessoas retornadas por `search_pessoas`
+LIMITE_BUSCA_PESSOAS = 15
+
+# Nome de tabela aceito em DB_TABELA_LINHAS (com esquema opcional, ex.: dbo.linhas_digitaveis)
+_NOME_TABELA = re.compile(r'^[A-Za-z_]\w*(\.[A-Za-z_]\w*)?$')
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
-class DatabaseConnection:
+class ConnectionPool:
+    """
+    Pool limitado de conexões, seguro para uso por várias threads.
+    
+    Cada thread obtém sua própria conexão com `checkout` (ou com o gerenciador
+    de contexto `connection`) e a devolve com `checkin`. Conexões ociosas há
+    mais de `idle_timeout` segundos são fechadas, e as ociosas há mais de
+    `health_check_after` segundos são testadas antes de serem entregues,
+    sendo recriadas se a conexão tiver caído. Quem espera por uma conexão
+    desiste após `checkout_timeout` segundos (None: espera indefinidamente).
+    """
+    
+    def __init__(self, factory: Callable[[], Any], max_size: int = 4,
+                 idle_timeout: float = 300, health_check_after: float = 10,
+                 health_query: str = 'SELECT 1', checkout_timeout: Optional[float] = 60):
+        if max_size < 1:
+            raise ValueError("O pool deve permitir ao menos uma conexão")
+        self.factory = factory
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.health_query = health_query
+        self._idle: List[Tuple[Any, float]] = []  # (conexão, momento da devolução)
+        self._size = 0  # Conexões abertas, ociosas ou em uso
+        self._generation = 0  # Incrementada por close_all; conexões antigas não voltam ao pool
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Condition()
+    
+    def _close(self, connection) -> None:
+        try:
+            connection.close()
+        except Exception as e:
+            logger.error(f"Erro ao fechar conexão com o banco de dados: {e}")
+    
+    def _evict_idle(self) -> List[Any]:
+        """Remove do pool as conexões ociosas há muito tempo (chamar com o lock)."""
+        limit = time.monotonic() - self.idle_timeout
+        expired = [connection for connection, returned in self._idle if returned < limit]
+        if expired:
+            self._idle = [(c, returned) for c, returned in self._idle if returned >= limit]
+            self._size -= len(expired)
+            for connection in expired:
+                self._generations.pop(id(connection), None)
+        return expired
+    
+    def _is_healthy(self, connection) -> bool:
+        try:
+            cursor = connection.cursor()
+            cursor.execute(self.health_query)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception as e:
+            logger.warning(f"Conexão do pool inválida, reconectando: {e}")
+            return False
+    
+    def _create(self, generation: int):
+        connection = self.factory()
+        with self._lock:
+            self._generations[id(connection)] = generation
+        return connection
+    
+    def checkout(self, timeout: float = None):
+        """
+        Obtém uma conexão do pool, criando uma nova se houver vaga.
+        
+        Args:
+            timeout: Segundos de espera por uma conexão livre (padrão: `checkout_timeout`)
+        
+        Raises:
+            TimeoutError: Se todas as conexões estiverem em uso por mais de `timeout` segundos
+            Exception: Erros ao criar a conexão
+        """
+        if timeout is None:
+            timeout = self.checkout_timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            expired = self._evict_idle()
+            while not self._idle and self._size >= self.max_size:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"Nenhuma conexão disponível no pool após {timeout:g}s "
+                                       f"({self.max_size} em uso); aumente DB_POOL_SIZE")
+                self._lock.wait(remaining)
+            if self._idle:
+                connection, returned = self._idle.pop()
+            else:
+                connection, returned = None, None
+                self._size += 1
+            generation = self._generation
+        
+        for old in expired:
+            self._close(old)
+        
+        try:
+            if connection is not None:
+                if time.monotonic() - returned < self.health_check_after or self._is_healthy(connection):
+                    return connection
+                with self._lock:
+                    self._generations.pop(id(connection), None)
+                self._close(connection)
+            return self._create(generation)
+        except Exception:
+            # A vaga não foi ocupada; libera para outra thread
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+    
+    def checkin(self, connection, discard: bool = False) -> None:
+        """Devolve uma conexão ao pool; com `discard`, ela é fechada."""
+        with self._lock:
+            current = self._generations.get(id(connection)) == self._generation
+            if discard or not current:
+                self._generations.pop(id(connection), None)
+                self._size -= 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+            expired = self._evict_idle()
+            self._lock.notify()
+        if discard or not current:
+            expired.append(connection)
+        for old in expired:
+            self._close(old)
+    
+    @contextmanager
+    def connection(self, timeout: float = None):
+        """Gerenciador de contexto que obtém e devolve uma conexão do pool."""
+        connection = self.checkout(timeout)
+        discard = False
+        try:
+            yield connection
+        except Exception:
+            # Desfaz o que ficou pendente; se nem isso funcionar, a conexão é descartada
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+            raise
+        finally:
+            self.checkin(connection, discard=discard)
+    
+    def close_all(self) -> None:
+        """Fecha as conexões ociosas; as em uso são fechadas quando devolvidas."""
+        with self._lock:
+            idle = [connection for connection, _ in self._idle]
+            self._idle = []
+            self._size -= len(idle)
+            for connection in idle:
+                self._generations.pop(id(connection), None)
+            self._generation += 1
+            self._lock.notify_all()
+        for connection in idle:
+            self._close(connection)
+
+class Cancelamento:
+    """
+    Permite cancelar, de outra thread, uma consulta de `execute_query`.
+    
+    A consulta registra a instrução em execução; `cancelar` marca o pedido e
+    interrompe a instrução, se houver uma. Uma consulta cujo cancelamento já foi
+    pedido nem chega a ser enviada ao banco.
+    """
+    
     def __init__(self):
-        self.connection = None
-        self.server = os.getenv('DB_SERVER')
-        self.database = os.getenv('DB_DATABASE')
-        self.username = os.getenv('DB_USERNAME')
-        self.password = os.getenv('DB_PASSWORD')
+        self._lock = threading.Lock()
+        self._interromper: Optional[Callable[[], None]] = None
+        self.cancelado = False
+    
+    def registrar(self, interromper: Callable[[], None]) -> bool:
+        """Registra a instrução em execução; retorna False se já foi cancelada."""
+        with self._lock:
+            if self.cancelado:
+                return False
+            self._interromper = interromper
+            return True
+    
+    def liberar(self) -> None:
+        """Encerra o registro (antes de a conexão voltar ao pool)."""
+        with self._lock:
+            self._interromper = None
+    
+    def cancelar(self) -> None:
+        """Cancela a consulta, interrompendo a instrução se estiver em execução."""
+        with self._lock:
+            self.cancelado = True
+            if self._interromper is not None:
+                try:
+                    self._interromper()
+                except Exception as e:
+                    logger.warning(f"Não foi possível interromper a consulta: {e}")
+
+class DatabaseConnection:
+    def __init__(self, backend: Backend = None):
+        # SQL Server de produção ou SQLite local, conforme DB_BACKEND
+        self.backend = backend or backend_do_ambiente()
+        # Cada thread (busca de pessoas, busca de títulos, ...) usa sua própria conexão
+        self.pool = ConnectionPool(
+            self._create_connection,
+            max_size=int(os.getenv('DB_POOL_SIZE', '4')),
+            idle_timeout=float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300')),
+            checkout_timeout=float(os.getenv('DB_POOL_TIMEOUT', '60'))
+        )
+        # Resultados recentes da busca de pessoas (a busca roda a cada pausa na digitação)
+        self.cache_pessoas = CacheBuscaPessoas(
+            LIMITE_BUSCA_PESSOAS,
+            tamanho=int(os.getenv('DB_CACHE_BUSCA_TAMANHO', '256')),
+            ttl=float(os.getenv('DB_CACHE_BUSCA_TTL', '60'))
+        )
+        # Destino das linhas digitáveis gravadas por `gravar_linhas`
+        self.tabela_linhas = os.getenv('DB_TABELA_LINHAS', 'linhas_digitaveis').strip()
+        self.lote_gravacao = int(os.getenv('DB_GRAVACAO_LOTE', '10000'))
+        self._tabela_linhas_criada = False
+    
+    def _create_connection(self):
+        """Abre uma nova conexão com o banco de dados."""
+        return self.backend.conectar()
         
     def connect(self) -> bool:
-        """Estabelece conexão com o banco de dados."""
+        """Verifica se é possível obter uma conexão com o banco de dados."""
         try:
-            connection_string = (
-                f'DRIVER={{ODBC Driver 17 for SQL Server}};'
-                f'SERVER={self.server};'
-                f'DATABASE={self.database};'
-                f'UID={self.username};'
-                f'PWD={self.password}'
-            )
-            self.connection = pyodbc.connect(connection_string)
-            return True
+            with self.pool.connection():
+                return True
         except Exception as e:
             logger.error(f"Erro ao conectar ao banco de dados: {e}")
             return False
     
     def disconnect(self) -> None:
-        """Fecha a conexão com o banco de dados se estiver aberta."""
-        if self.connection:
-            try:
-                self.connection.close()
-                self.connection = None
-            except Exception as e:
-                logger.error(f"Erro ao fechar conexão com o banco de dados: {e}")
+        """Fecha as conexões com o banco de dados."""
+        logger.info(f"Cache da busca de pessoas: {self.cache_pessoas.estatisticas()}")
+        self.pool.close_all()
     
-    def execute_query(self, query: str, params: Tuple = None) -> Optional[List[Dict[str, Any]]]:
-        """Executa uma consulta SQL e retorna os resultados como uma lista de dicionários."""
-        if not self.connection and not self.connect():
-            return None
+    def execute_query(self, query: str, params: Tuple = None,
+                      cancelamento: Cancelamento = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Executa uma consulta SQL e retorna os resultados como uma lista de dicionários.
         
+        Com `cancelamento`, a consulta pode ser interrompida de outra thread;
+        nesse caso retorna None, como nos erros.
+        """
         try:
-            cursor = self.connection.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            # Extrair nomes das colunas
-            columns = [column[0] for column in cursor.description]
-            
-            # Converter resultados para lista de dicionários
-            result = [dict(zip(columns, row)) for row in cursor.fetchall()]
-            
-            cursor.close()
-            return result
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                if cancelamento is not None and not cancelamento.registrar(
+                        lambda: self.backend.cancelar(connection, cursor)):
+                    cursor.close()
+                    return None
+                try:
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    
+                    # Extrair nomes das colunas
+                    columns = [column[0] for column in cursor.description]
+                    
+                    # Converter resultados para lista de dicionários
+                    result = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                finally:
+                    # A conexão só volta ao pool depois de sair do alcance do cancelamento
+                    if cancelamento is not None:
+                        cancelamento.liberar()
+                
+                cursor.close()
+                return result
         except Exception as e:
+            if cancelamento is not None and cancelamento.cancelado:
+                logger.debug(f"Consulta cancelada: {e}")
+                return None
             logger.error(f"Erro ao executar consulta: {e}")
             logger.error(f"Query: {query}")
             logger.error(f"Parâmetros: {params}")
             return None
     
+    def iter_query(self, query: str, params: Tuple = None,
+                   batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Executa uma consulta SQL e produz os resultados em lotes de dicionários.
+        
+        As linhas são lidas com `fetchmany`, então apenas um lote fica em memória
+        por vez, qualquer que seja o tamanho do resultado. A conexão fica
+        reservada até o fim da leitura.
+        
+        Raises:
+            Exception: Erros de conexão ou de execução são registrados no log e
+            propagados, para que quem consome o fluxo não receba dados incompletos
+        """
+        try:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    
+                    # Extrair nomes das colunas
+                    columns = [column[0] for column in cursor.description]
+                    
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        yield [dict(zip(columns, row)) for row in rows]
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.error(f"Erro ao executar consulta: {e}")
+            logger.error(f"Query: {query}")
+            logger.error(f"Parâmetros: {params}")
+            raise
+    
     def execute_non_query(self, query: str, params: Tuple = None) -> bool:
         """Executa uma instrução SQL (INSERT, UPDATE, DELETE) sem retorno de dados."""
-        if not self.connection and not self.connect():
-            return False
-        
         try:
-            cursor = self.connection.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            self.connection.commit()
-            cursor.close()
-            return True
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                
+                connection.commit()
+                cursor.close()
+                return True
         except Exception as e:
             logger.error(f"Erro ao executar instrução: {e}")
             logger.error(f"Query: {query}")
             logger.error(f"Parâmetros: {params}")
             return False
 
-    def search_pessoas(self, search_term: str, tipo: str) -> List[Dict[str, Any]]:
-        """Busca pessoas por nome, CGC ou código com o tipo especificado."""
-        query = """
-        SELECT TOP(15) id, codigo, nome, cgc, tipo
+    def gravar_linhas(self, linhas: Iterable[Tuple[int, str, str]], tamanho_lote: int = None) -> int:
+        """
+        Grava linhas digitáveis geradas na tabela DB_TABELA_LINHAS.
+        
+        Cada lote é inserido de uma vez (`executemany`; no SQL Server com
+        `fast_executemany`) numa tabela temporária de carga e levado à tabela
+        de destino com um único MERGE (no SQLite, INSERT ... ON CONFLICT),
+        seguido de commit. Títulos já gravados só são atualizados se a linha
+        mudou. A tabela de destino é criada se não existir.
+        
+        Args:
+            linhas: Tuplas (id do título, empresa, linha digitável); linhas com
+                erro na geração (que não são linhas digitáveis) são ignoradas
+            tamanho_lote (int): Linhas por commit (padrão: DB_GRAVACAO_LOTE)
+        
+        Returns:
+            int: Quantidade de linhas gravadas
+        
+        Raises:
+            Exception: Erros são registrados no log e propagados; os lotes já
+            confirmados permanecem gravados
+        """
+        tabela = self.tabela_linhas
+        if not _NOME_TABELA.match(tabela):
+            raise ValueError(f"DB_TABELA_LINHAS inválido: {tabela}")
+        tamanho_lote = tamanho_lote or self.lote_gravacao
+        dialeto = self.backend.dialeto
+        gerado_em = datetime.now().replace(microsecond=0)
+        linhas = iter(linhas)
+        gravadas = 0
+        try:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    if not self._tabela_linhas_criada:
+                        cursor.execute(dialeto.criar_tabela_linhas(tabela))
+                        self._tabela_linhas_criada = True
+                    cursor.execute(dialeto.criar_carga_linhas())
+                    connection.commit()
+                    self.backend.preparar_carga(cursor)
+                    insercao = (f"INSERT INTO {dialeto.tabela_carga_linhas} "
+                                f"(titulo_id, empresa, linha_digitavel, codigo_barras, gerado_em) "
+                                f"VALUES (?, ?, ?, ?, ?)")
+                    mesclagem = dialeto.mesclar_linhas(tabela)
+                    while True:
+                        bloco = list(islice(linhas, tamanho_lote))
+                        if not bloco:
+                            break
+                        # Uma linha por título no lote (o MERGE não aceita chaves repetidas na origem)
+                        lote = {}
+                        for titulo_id, empresa, linha in bloco:
+                            try:
+                                codigo_barras = codigo_barras_da_linha(linha)
+                            except ValueError:
+                                continue
+                            lote[(empresa, titulo_id)] = (titulo_id, empresa, linha, codigo_barras, gerado_em)
+                        if not lote:
+                            continue
+                        cursor.execute(dialeto.limpar_carga_linhas())
+                        cursor.executemany(insercao, list(lote.values()))
+                        cursor.execute(mesclagem)
+                        connection.commit()
+                        gravadas += len(lote)
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.error(f"Erro ao gravar linhas digitáveis em {tabela} ({gravadas} já gravada(s)): {e}")
+            raise
+        logger.info(f"{gravadas} linha(s) digitável(is) gravada(s) em {tabela}")
+        return gravadas
+
+    def search_pessoas(self, search_term: str, tipo: str,
+                       cancelamento: Cancelamento = None) -> List[Dict[str, Any]]:
+        """
+        Busca pessoas por nome, CGC ou código com o tipo especificado.
+        
+        Os resultados ficam em `cache_pessoas`; buscas que só estendem um termo
+        anterior com resultado completo são respondidas sem ir ao banco. Uma
+        busca cancelada (ver `Cancelamento`) retorna lista vazia.
+        """
+        resultado = self.cache_pessoas.obter(tipo, search_term)
+        if resultado is not None:
+            return resultado
+        
+        dialeto = self.backend.dialeto
+        query = f"""
+        SELECT {dialeto.top(LIMITE_BUSCA_PESSOAS)}id, codigo, nome, cgc, tipo
         FROM sigcad
         WHERE tipo = ?
         AND (nome LIKE ? OR cgc LIKE ? OR codigo = ?)
-        ORDER BY nome
+        ORDER BY nome{dialeto.limite(LIMITE_BUSCA_PESSOAS)}
         """
         
         try:
@@ -110,7 +462,11 @@ class DatabaseConnection:
                 codigo = -1  # Valor inválido para garantir que não encontre por código
                 
             params = (tipo, f'%{search_term}%', f'%{search_term}%', codigo)
-            return self.execute_query(query, params) or []
+            resultado = self.execute_query(query, params, cancelamento)
+            if resultado is None:
+                return []
+            self.cache_pessoas.guardar(tipo, search_term, resultado)
+            return resultado
         except Exception as e:
             logger.error(f"Erro na busca de pessoas: {e}")
             return []
@@ -127,120 +483,104 @@ class DatabaseConnection:
         """
         Busca títulos com os filtros especificados.
         
-        Args:
-            codigo_pessoa: Código da pessoa (Cedente ou Sacado)
-            tipo_pessoa: Tipo da pessoa ("Cedente" ou "Sacado")
-            bordero: Número do bordero (opcional)
-            data_bordero_inicial: Data inicial do bordero (opcional)
-            data_bordero_final: Data final do bordero (opcional)
-            data_vencimento_inicial: Data inicial de vencimento (opcional)
-            data_vencimento_final: Data final de vencimento (opcional)
-            empresa: Empresa (SEC ou FIDC) (opcional)
-            
+        Os filtros são os de `consultas.ConsultaTitulos`; as datas podem ser
+        date ou texto no formato yyyy-mm-dd.
+        
         Returns:
             Lista de títulos encontrados
         """
-        # Base da consulta
-        query_fidc = """
-        SELECT
-        f.id,
-        'FIDC' AS empresa,
-        f.clifor AS codigo,
-        f.sacado,
-        f.bordero,
-        CAST(f.dtbordero AS DATE) AS data_bordero,
-        f.dcto AS numero_documento,
-        fidc.numero_port AS seu_numero,
-        f.codigo AS codigo_dcto,
-        f.tipodcto,
-        CAST(fidc.[data] AS DATE) AS vencimento,
-        fidc.valor
-
-        FROM sigfls AS f
-        INNER JOIN sigfidc AS fidc
-        ON fidc.sigfls = f.ctrl_id
-        WHERE f.codigo IN ('040')
-        AND (fidc.banco IS NULL OR LTRIM(RTRIM(fidc.banco)) = '')
-        AND NOT(fidc.numero_port IS NULL OR LTRIM(RTRIM(fidc.numero_port)) = '')
-        AND NOT EXISTS (
-            SELECT 1 FROM sigfcs AS fcs WHERE fcs.sigfls = f.ctrl_id
-        )
+        query, params = ConsultaTitulos(
+            codigo_pessoa, tipo_pessoa, bordero,
+            data_bordero_inicial, data_bordero_final,
+            data_vencimento_inicial, data_vencimento_final, empresa,
+            dialeto=self.backend.dialeto
+        ).montar()
+        return self.execute_query(query, params) or []
+    
+    def iter_titulos(self, batch_size: int = 1000, paralelo: bool = False,
+                     **filtros) -> Iterator[List[Dict[str, Any]]]:
         """
+        Busca títulos com os filtros de `get_titulos`, produzindo-os em lotes.
         
-        query_sec = """
-        SELECT
-        f.id,
-        'SEC' AS empresa,
-        f.clifor AS codigo,
-        f.sacado,
-        f.bordero,
-        CAST(f.dtbordero AS DATE) AS data_bordero,
-        f.dcto AS numero_documento,
-        sec.numero_port AS seu_numero,
-        f.codigo AS codigo_dcto,
-        f.tipodcto,
-        CAST(sec.vcto_ AS DATE) AS vencimento,
-        sec.valor
-
-        FROM sigfls AS f
-        INNER JOIN sigflu AS sec
-        ON sec.sigfls = f.ctrl_id
-        WHERE f.codigo IN ('040')
-        AND (sec.banco IS NULL OR LTRIM(RTRIM(sec.banco)) = '')
-        AND NOT(sec.numero_port IS NULL OR LTRIM(RTRIM(sec.numero_port)) = '')
-        AND NOT EXISTS (
-            SELECT 1 FROM sigfcs AS fcs WHERE fcs.sigfls = f.ctrl_id
-        )
-        """
+        Usa memória constante, qualquer que seja a quantidade de títulos, e é
+        a forma indicada para exportações e geração em lote.
         
-        # Parâmetros base
-        params_fidc = []
-        params_sec = []
-        
-        # Adiciona filtro de pessoa (Cedente ou Sacado) se fornecido
-        if codigo_pessoa and tipo_pessoa:
-            if tipo_pessoa == "Cedente":
-                query_fidc += " AND f.clifor = ?"
-                query_sec += " AND f.clifor = ?"
-                params_fidc.append(codigo_pessoa)
-                params_sec.append(codigo_pessoa)
-            elif tipo_pessoa == "Sacado":
-                query_fidc += " AND f.sacado = ?"
-                query_sec += " AND f.sacado = ?"
-                params_fidc.append(codigo_pessoa)
-                params_sec.append(codigo_pessoa)
-        
-        # Adiciona filtro de bordero se fornecido
-        if bordero:
-            query_fidc += " AND f.bordero = ?"
-            query_sec += " AND f.bordero = ?"
-            params_fidc.append(bordero)
-            params_sec.append(bordero)
-        
-        # Adiciona filtro de data do bordero se fornecido
-        if data_bordero_inicial and data_bordero_final:
-            query_fidc += " AND CAST(f.dtbordero AS DATE) BETWEEN ? AND ?"
-            query_sec += " AND CAST(f.dtbordero AS DATE) BETWEEN ? AND ?"
-            params_fidc.extend([data_bordero_inicial, data_bordero_final])
-            params_sec.extend([data_bordero_inicial, data_bordero_final])
-        
-        # Adiciona filtro de data de vencimento se fornecido
-        if data_vencimento_inicial and data_vencimento_final:
-            query_fidc += " AND CAST(fidc.vcto_ AS DATE) BETWEEN ? AND ?"
-            query_sec += " AND CAST(sec.vcto_ AS DATE) BETWEEN ? AND ?"
-            params_fidc.extend([data_vencimento_inicial, data_vencimento_final])
-            params_sec.extend([data_vencimento_inicial, data_vencimento_final])
-        
-        # Executa a consulta com base no filtro de empresa
-        if empresa == "FIDC":
-            return self.execute_query(query_fidc, tuple(params_fidc)) or []
-        elif empresa == "SEC":
-            return self.execute_query(query_sec, tuple(params_sec)) or []
+        Com `paralelo=True` e sem filtro de empresa, as consultas do FIDC e da
+        SEC rodam ao mesmo tempo, em conexões separadas, e os lotes são
+        produzidos na ordem em que chegam (intercalando as empresas).
+        """
+        consulta = ConsultaTitulos(dialeto=self.backend.dialeto, **filtros)
+        if paralelo and len(consulta.ramos) > 1:
+            yield from self._iter_ramos_paralelo(consulta, batch_size)
         else:
-            # Se não houver filtro de empresa, executa ambas as consultas e une os resultados
-            query = f"{query_fidc} UNION ALL {query_sec}"
-            params = params_fidc + params_sec
-            return self.execute_query(query, tuple(params)) or []
+            query, params = consulta.montar()
+            yield from self.iter_query(query, params, batch_size)
+    
+    def _iter_ramos_paralelo(self, consulta: ConsultaTitulos,
+                             batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Executa cada ramo da consulta em uma thread e intercala os lotes.
+        
+        A fila é limitada, então uma empresa rápida não acumula o resultado
+        inteiro em memória enquanto o consumidor processa os lotes. O tempo de
+        cada ramo (primeiro lote e total) é registrado no log.
+        """
+        fila = queue.Queue(maxsize=4)
+        parar = threading.Event()
+        
+        def enfileirar(item) -> bool:
+            # Espera por espaço na fila, desistindo se o consumidor parou
+            while not parar.is_set():
+                try:
+                    fila.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        def executar(ramo):
+            inicio = time.monotonic()
+            primeiro_lote = None
+            linhas = 0
+            try:
+                query, params = consulta.montar_ramo(ramo)
+                lotes = self.iter_query(query, params, batch_size)
+                try:
+                    for lote in lotes:
+                        if primeiro_lote is None:
+                            primeiro_lote = time.monotonic() - inicio
+                        linhas += len(lote)
+                        if not enfileirar(lote):
+                            return
+                finally:
+                    lotes.close()
+                primeiro = f"{primeiro_lote:.2f}s" if primeiro_lote is not None else "-"
+                logger.info(f"Títulos {ramo.empresa}: {linhas} linha(s), primeiro lote em "
+                            f"{primeiro}, total em {time.monotonic() - inicio:.2f}s")
+                enfileirar(None)
+            except Exception as e:
+                enfileirar(e)
+        
+        threads = [threading.Thread(target=executar, args=(ramo,), daemon=True,
+                                    name=f"titulos-{ramo.empresa}")
+                   for ramo in consulta.ramos]
+        for thread in threads:
+            thread.start()
+        
+        try:
+            pendentes = len(threads)
+            while pendentes:
+                item = fila.get()
+                if item is None:
+                    pendentes -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            # Avisa as threads que ainda estejam lendo (erro ou consumidor parou);
+            # elas devolvem a conexão ao pool no próximo lote
+            parar.set()
 
 # Instância global para uso em todo o projeto
 db_connection = DatabaseConnection() 
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Exportação dos títulos para arquivos XLSX, CSV, Parquet e Arrow.
+
+Os títulos são lidos do `TituloBatch` em blocos e escritos à medida que são
+formatados (openpyxl em modo write-only, módulo csv, pyarrow), sem montar a
+planilha inteira em memória. As linhas digitáveis que faltam são geradas por
+bloco. O arquivo é escrito num temporário e só substitui o destino ao final;
+se a exportação for cancelada ou falhar, o destino não é alterado.
+
+XLSX e CSV têm as colunas formatadas para leitura (datas dd/mm/aaaa, valor
+decimal). Parquet e Arrow (IPC) guardam as colunas tipadas, para leitura por
+outros programas: datas como date32, o valor em centavos (int64) e os textos
+como string. Esses dois formatos dependem do pacote opcional pyarrow.
+"""
+import csv
+import logging
+import os
+from datetime import date
+from typing import Callable, Iterable, List, Optional
+
+from models import ERRO_LINHA_DIGITAVEL, TituloBatch
+
+logger = logging.getLogger(__name__)
+
+FORMATOS = ('xlsx', 'csv', 'parquet', 'arrow')
+TAMANHO_BLOCO = 5000
+
+# Ordinal de 01/01/1970, origem do date32 do Arrow
+_ORDINAL_EPOCH = date(1970, 1, 1).toordinal()
+# Valor ausente nas colunas inteiras de `TituloBatch.coluna`
+_NULO = -(2 ** 63)
+
+def _data_br(data):
+    return data.strftime('%d/%m/%Y') if data is not None else None
+
+# Colunas dos arquivos: (cabeçalho, coluna do TituloBatch, conversão do valor)
+COLUNAS = [
+    ('empresa', 'empresa', None),
+    ('cedente', 'codigo', None),
+    ('sacado', 'sacado', None),
+    ('bordero', 'bordero', None),
+    ('data_bordero', 'data_bordero', _data_br),
+    ('numero_documento', 'numero_documento', None),
+    ('seu_numero', 'seu_numero', None),
+    ('tipodcto', 'tipodcto', None),
+    ('vencimento', 'vencimento', _data_br),
+    ('valor', 'valor_centavos', lambda centavos: centavos / 100),
+    ('linha_digitavel', 'linha_digitavel', None),
+]
+
+class ExportacaoCancelada(Exception):
+    """A exportação foi interrompida a pedido do usuário."""
+
+def formatos_disponiveis() -> List[str]:
+    """Formatos cujas dependências estão instaladas."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return ['xlsx', 'csv']
+    return list(FORMATOS)
+
+class _EscritorCsv:
+    """CSV separado por ponto e vírgula, em UTF-8."""
+
+    def __init__(self, caminho: str):
+        self._arquivo = open(caminho, 'w', encoding='utf-8', newline='')
+        self._csv = csv.writer(self._arquivo, delimiter=';', lineterminator='\n')
+        self._csv.writerow([cabecalho for cabecalho, _, _ in COLUNAS])
+
+    def escrever(self, batch: TituloBatch, indices: List[int]) -> None:
+        self._csv.writerows(linhas_bloco(batch, indices))
+
+    def fechar(self) -> None:
+        self._arquivo.close()
+
+class _EscritorXlsx:
+    """Planilha XLSX gravada linha a linha (openpyxl em modo write-only)."""
+
+    def __init__(self, caminho: str):
+        from openpyxl import Workbook
+
+        self._caminho = caminho
+        self._workbook = Workbook(write_only=True)
+        self._planilha = self._workbook.create_sheet('Sheet1')
+        self._planilha.append([cabecalho for cabecalho, _, _ in COLUNAS])
+
+    def escrever(self, batch: TituloBatch, indices: List[int]) -> None:
+        for linha in linhas_bloco(batch, indices):
+            self._planilha.append(linha)
+
+    def fechar(self) -> None:
+        self._workbook.save(self._caminho)
+
+class _EscritorArrow:
+    """
+    Colunas tipadas em Parquet ou Arrow IPC, um grupo de linhas (record batch) por bloco.
+    """
+
+    def __init__(self, caminho: str, formato: str):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise RuntimeError(f"A exportação em {formato} requer o pacote pyarrow (pip install pyarrow)")
+        self._pa = pa
+        self._schema = pa.schema([
+            ('empresa', pa.string()),
+            ('cedente', pa.int64()),
+            ('sacado', pa.int64()),
+            ('bordero', pa.int64()),
+            ('data_bordero', pa.date32()),
+            ('numero_documento', pa.string()),
+            ('seu_numero', pa.string()),
+            ('tipodcto', pa.string()),
+            ('vencimento', pa.date32()),
+            ('valor_centavos', pa.int64()),
+            ('linha_digitavel', pa.string()),
+        ])
+        if formato == 'parquet':
+            import pyarrow.parquet as pq
+            self._escritor = pq.ParquetWriter(caminho, self._schema, compression='zstd')
+        else:
+            import pyarrow.ipc
+            self._sink = pa.OSFile(caminho, 'wb')
+            self._escritor = pyarrow.ipc.new_file(self._sink, self._schema)
+
+    def _inteiros(self, batch: TituloBatch, nome: str, indices: List[int]):
+        valores = batch.coluna(nome, indices)
+        return self._pa.array(valores, mask=valores == _NULO)
+
+    def _datas(self, batch: TituloBatch, nome: str, indices: List[int]):
+        ordinais = batch.coluna(nome, indices)
+        return self._pa.array(ordinais - _ORDINAL_EPOCH, mask=ordinais == 0).cast(self._pa.date32())
+
+    def escrever(self, batch: TituloBatch, indices: List[int]) -> None:
+        pa = self._pa
+        faltantes = [i for i in indices if batch.linha(i) is None]
+        if faltantes:
+            batch.gerar_linhas(faltantes)
+        # Títulos com erro na geração ficam sem linha digitável (nulo)
+        linhas = [batch.linha(i) for i in indices]
+        linhas = [None if linha == ERRO_LINHA_DIGITAVEL else linha for linha in linhas]
+        colunas = [
+            pa.array(batch.valores('empresa', indices), pa.string()),
+            self._inteiros(batch, 'codigo', indices),
+            self._inteiros(batch, 'sacado', indices),
+            self._inteiros(batch, 'bordero', indices),
+            self._datas(batch, 'data_bordero', indices),
+            pa.array(batch.valores('numero_documento', indices), pa.string()),
+            pa.array(batch.valores('seu_numero', indices), pa.string()),
+            pa.array(batch.valores('tipodcto', indices), pa.string()),
+            self._datas(batch, 'vencimento', indices),
+            self._inteiros(batch, 'valor_centavos', indices),
+            pa.array(linhas, pa.string()),
+        ]
+        self._escritor.write_batch(pa.record_batch(colunas, schema=self._schema))
+
+    def fechar(self) -> None:
+        self._escritor.close()
+        if hasattr(self, '_sink'):
+            self._sink.close()
+
+_ESCRITORES = {
+    'xlsx': _EscritorXlsx,
+    'csv': _EscritorCsv,
+    'parquet': lambda caminho: _EscritorArrow(caminho, 'parquet'),
+    'arrow': lambda caminho: _EscritorArrow(caminho, 'arrow'),
+}
+
+def linhas_bloco(batch: TituloBatch, indices: List[int]) -> List[list]:
+    """Valores das colunas de exportação de um bloco de títulos, gerando as linhas digitáveis que faltam."""
+    faltantes = [i for i in indices if batch.linha(i) is None]
+    if faltantes:
+        batch.gerar_linhas(faltantes)
+    colunas = []
+    for _, nome, converter in COLUNAS:
+        if nome == 'linha_digitavel':
+            valores = [batch.linha(i) for i in indices]
+        else:
+            valores = batch.valores(nome, indices)
+            if converter is not None:
+                convertidos = {}
+                valores = [convertidos[valor] if valor in convertidos
+                           else convertidos.setdefault(valor, None if valor is None else converter(valor))
+                           for valor in valores]
+        colunas.append(valores)
+    return [list(linha) for linha in zip(*colunas)]
+
+def exportar(batch: TituloBatch, indices: Iterable[int], caminho: str, formato: str,
+             progresso: Optional[Callable[[int, int], None]] = None,
+             cancelado: Optional[Callable[[], bool]] = None,
+             tamanho_bloco: int = TAMANHO_BLOCO) -> int:
+    """
+    Exporta títulos de um lote para um arquivo XLSX, CSV, Parquet ou Arrow.
+
+    Args:
+        batch (TituloBatch): Lote com os títulos
+        indices: Posições dos títulos no lote, na ordem de exportação
+        caminho (str): Arquivo de destino
+        formato (str): 'xlsx', 'csv', 'parquet' ou 'arrow' (ver `FORMATOS`)
+        progresso: Chamada após cada bloco com (exportados, total)
+        cancelado: Consultada antes de cada bloco; se retornar True, a exportação
+            é interrompida com `ExportacaoCancelada`
+        tamanho_bloco (int): Títulos formatados e escritos por vez
+
+    Returns:
+        int: Quantidade de títulos exportados
+    """
+    if formato not in _ESCRITORES:
+        raise ValueError(f"Formato de exportação inválido: {formato} (use {', '.join(FORMATOS)})")
+    indices = list(indices)
+    total = len(indices)
+    temporario = f"{caminho}.parcial"
+    escritor = _ESCRITORES[formato](temporario)
+    try:
+        try:
+            for inicio in range(0, total, tamanho_bloco):
+                if cancelado is not None and cancelado():
+                    raise ExportacaoCancelada()
+                bloco = indices[inicio:inicio + tamanho_bloco]
+                escritor.escrever(batch, bloco)
+                if progresso is not None:
+                    progresso(inicio + len(bloco), total)
+        finally:
+            escritor.fechar()
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    logger.info(f"{total} título(s) exportado(s) para {caminho}")
+    return total
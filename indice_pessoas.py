@@ -0,0 +1,210 @@
+"""
+Índice em memória das pessoas (sigcad) para a busca enquanto se digita.
+
+Responde às mesmas buscas de `DatabaseConnection.search_pessoas` (nome, CNPJ/CPF
+ou código, por tipo, ordenadas por nome) sem ir ao banco, com duas melhorias:
+ignora acentos e maiúsculas, e encontra CNPJs digitados só com os números.
+"""
+import heapq
+import logging
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+_TAMANHO_NGRAMA = 3
+_NAO_DIGITO = re.compile(r'\D')
+# Termos só com dígitos e a pontuação de CNPJ/CPF são buscados também pelos dígitos
+_TERMO_DOCUMENTO = re.compile(r'^[\d./\- ]*\d[\d./\- ]*$')
+
+_CONSULTA_PESSOAS = """
+SELECT id, codigo, nome, cgc, tipo
+FROM sigcad
+WHERE id > ?
+ORDER BY id
+"""
+
+def normalizar(texto: Optional[str]) -> str:
+    """Texto sem acentos e em minúsculas, para comparação."""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in texto if not unicodedata.combining(c)).casefold()
+
+def _ngramas(texto: str) -> Set[str]:
+    return {texto[i:i + _TAMANHO_NGRAMA] for i in range(len(texto) - _TAMANHO_NGRAMA + 1)}
+
+class _Registro:
+    """Pessoa indexada, com os textos já normalizados."""
+    __slots__ = ('dados', 'tipo', 'codigo', 'nome', 'cgc', 'cgc_digitos', 'ordem')
+
+    def __init__(self, dados: Dict[str, Any]):
+        self.dados = dados
+        self.tipo = dados['tipo']
+        self.codigo = dados['codigo']
+        self.nome = normalizar(dados['nome'])
+        self.cgc = normalizar(dados['cgc'])
+        self.cgc_digitos = _NAO_DIGITO.sub('', dados['cgc'] or '')
+        self.ordem = (self.nome, dados['nome'] or '')
+
+    def ngramas(self) -> Set[str]:
+        return _ngramas(self.nome) | _ngramas(self.cgc) | _ngramas(self.cgc_digitos)
+
+class IndicePessoas:
+    """
+    Índice de trigramas das pessoas, carregado do banco e atualizado em segundo plano.
+
+    Cada trigrama (três caracteres seguidos) do nome e do CNPJ/CPF normalizados
+    aponta para as pessoas que o contêm; uma busca intersecta as listas dos
+    trigramas do termo e confere só essas candidatas. Termos com menos de três
+    caracteres são conferidos em todas as pessoas.
+
+    A atualização incremental traz as pessoas com id maior que o último
+    carregado; a cada `intervalo_completo` segundos o índice é recarregado
+    inteiro, para refletir alterações e exclusões.
+
+    Args:
+        db: Conexão com o banco (`DatabaseConnection`)
+        intervalo (float): Segundos entre as atualizações incrementais
+        intervalo_completo (float): Segundos entre as recargas completas
+    """
+
+    def __init__(self, db, intervalo: float = 60, intervalo_completo: float = 1800):
+        self.db = db
+        self.intervalo = intervalo
+        self.intervalo_completo = intervalo_completo
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+        self._limpar()
+        self.pronto = False
+        self.ultima_carga = 0.0
+
+    def _limpar(self) -> None:
+        self._registros: Dict[int, _Registro] = {}  # id -> pessoa
+        self._ngramas: Dict[str, Set[int]] = {}    # trigrama -> ids
+        self._codigos: Dict[Any, Set[int]] = {}    # código -> ids
+        self._ultimo_id = 0
+
+    def __len__(self) -> int:
+        return len(self._registros)
+
+    def _remover(self, id_pessoa) -> None:
+        registro = self._registros.pop(id_pessoa, None)
+        if registro is None:
+            return
+        for ngrama in registro.ngramas():
+            ids = self._ngramas.get(ngrama)
+            if ids is not None:
+                ids.discard(id_pessoa)
+                if not ids:
+                    del self._ngramas[ngrama]
+        self._codigos.get(registro.codigo, set()).discard(id_pessoa)
+
+    def _adicionar(self, dados: Dict[str, Any]) -> None:
+        id_pessoa = dados['id']
+        if id_pessoa in self._registros:
+            self._remover(id_pessoa)
+        registro = _Registro(dados)
+        self._registros[id_pessoa] = registro
+        for ngrama in registro.ngramas():
+            self._ngramas.setdefault(ngrama, set()).add(id_pessoa)
+        self._codigos.setdefault(registro.codigo, set()).add(id_pessoa)
+        if id_pessoa > self._ultimo_id:
+            self._ultimo_id = id_pessoa
+
+    def adicionar(self, pessoas: Iterable[Dict[str, Any]]) -> None:
+        """Inclui (ou substitui, pelo id) pessoas no índice."""
+        with self._lock:
+            for dados in pessoas:
+                self._adicionar(dados)
+
+    def _ler(self, a_partir_de: int) -> Iterable[List[Dict[str, Any]]]:
+        return self.db.iter_query(_CONSULTA_PESSOAS, (a_partir_de,), batch_size=5000)
+
+    def carregar(self) -> None:
+        """Recarrega o índice inteiro do banco (o índice anterior segue respondendo até o fim)."""
+        inicio = time.monotonic()
+        novo = IndicePessoas(self.db)
+        for lote in self._ler(0):
+            novo.adicionar(lote)
+        with self._lock:
+            self._registros, self._ngramas = novo._registros, novo._ngramas
+            self._codigos, self._ultimo_id = novo._codigos, novo._ultimo_id
+            self.pronto = True
+            self.ultima_carga = time.monotonic()
+        logger.info(f"Índice de pessoas carregado: {len(novo)} pessoa(s) em {time.monotonic() - inicio:.2f}s")
+
+    def atualizar(self) -> int:
+        """Inclui as pessoas cadastradas desde a última carga; retorna quantas."""
+        novas = 0
+        for lote in self._ler(self._ultimo_id):
+            self.adicionar(lote)
+            novas += len(lote)
+        if novas:
+            logger.info(f"Índice de pessoas: {novas} pessoa(s) nova(s)")
+        return novas
+
+    def _executar(self) -> None:
+        while not self._parar.is_set():
+            try:
+                if not self.pronto or time.monotonic() - self.ultima_carga >= self.intervalo_completo:
+                    self.carregar()
+                else:
+                    self.atualizar()
+            except Exception as e:
+                logger.error(f"Erro ao atualizar o índice de pessoas: {e}")
+            self._parar.wait(self.intervalo)
+
+    def iniciar(self) -> None:
+        """Carrega e passa a atualizar o índice numa thread em segundo plano."""
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, daemon=True, name='indice-pessoas')
+            self._thread.start()
+
+    def parar(self) -> None:
+        """Interrompe as atualizações em segundo plano."""
+        self._parar.set()
+
+    def _candidatos(self, termo: str) -> Optional[Set[int]]:
+        """Ids que contêm todos os trigramas do termo; None se o termo é curto demais."""
+        ngramas = _ngramas(termo)
+        if not ngramas:
+            return None
+        listas = sorted((self._ngramas.get(ngrama, set()) for ngrama in ngramas), key=len)
+        return set(listas[0]).intersection(*listas[1:])
+
+    def buscar(self, termo: str, tipo: str, limite: int = 15) -> List[Dict[str, Any]]:
+        """
+        Pessoas do tipo cujo nome ou CNPJ/CPF contém o termo, ou cujo código é o termo.
+
+        Returns:
+            Até `limite` pessoas, ordenadas por nome, no formato de `search_pessoas`
+        """
+        texto = normalizar(termo.strip())
+        digitos = _NAO_DIGITO.sub('', texto) if _TERMO_DOCUMENTO.match(texto) else ''
+        codigo = int(texto) if texto.isdigit() else None
+
+        with self._lock:
+            registros = self._registros
+            candidatos = self._candidatos(texto)
+            if candidatos is not None and digitos:
+                candidatos |= self._candidatos(digitos) or set()
+            if candidatos is None or (digitos and len(digitos) < _TAMANHO_NGRAMA):
+                candidatos = registros.keys()
+            elif codigo is not None:
+                candidatos |= self._codigos.get(codigo, set())
+
+            encontrados = []
+            for id_pessoa in candidatos:
+                registro = registros[id_pessoa]
+                if registro.tipo != tipo:
+                    continue
+                if (texto in registro.nome or texto in registro.cgc
+                        or (digitos and digitos in registro.cgc_digitos)
+                        or registro.codigo == codigo):
+                    encontrados.append(registro)
+
+        return [registro.dados for registro in heapq.nsmallest(limite, encontrados, key=lambda r: r.ordem)]
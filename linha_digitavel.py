@@ -1,31 +1,222 @@
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, ROUND_DOWN
+from functools import lru_cache
+from itertools import cycle, islice
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 import os
+import sys
 
-def modulo_10(num):
+import numpy as np
+
+# Tabelas de dígito -> parcela já somada, para evitar int() e str() por dígito.
+# Módulo 10: soma dos algarismos do produto do dígito pelo multiplicador (2 ou 1)
+_MOD10_DOBRO = {str(d): sum(divmod(d * 2, 10)) for d in range(10)}
+_MOD10_SIMPLES = {str(d): d for d in range(10)}
+
+# Módulo 11: produto do dígito pelo peso, um dicionário por peso (2 a 9)
+_PESOS_MOD11 = (2, 3, 4, 5, 6, 7, 8, 9)
+_MOD11_PRODUTOS = tuple({str(d): d * peso for d in range(10)} for peso in _PESOS_MOD11)
+
+# Caracteres ignorados na leitura de linhas digitáveis digitadas ou copiadas
+_PONTUACAO = str.maketrans('', '', ' .-\t\r\n')
+
+def _soma_modulo_10(num, deslocamento=0):
     """
-    Calcula o dígito verificador utilizando o módulo 10.
+    Soma ponderada do módulo 10 de `num`.
+    
+    `deslocamento` é a quantidade de dígitos que ficam à direita de `num`
+    dentro do campo, o que permite somar um campo em partes.
+    
+    Raises:
+        ValueError: Se `num` tiver algum caractere que não é dígito
+    """
+    invertido = num[::-1]
+    paridade = deslocamento % 2
+    try:
+        return (sum(map(_MOD10_DOBRO.__getitem__, invertido[paridade::2])) +
+                sum(map(_MOD10_SIMPLES.__getitem__, invertido[1 - paridade::2])))
+    except KeyError as e:
+        raise ValueError(f"Dígito inválido: {e.args[0]!r}") from None
+
+def _soma_modulo_11(num, deslocamento=0):
+    """
+    Soma ponderada do módulo 11 de `num`.
+    
+    `deslocamento` é a quantidade de dígitos que ficam à direita de `num`
+    dentro do código, o que permite somar o código em partes.
+    
+    Raises:
+        ValueError: Se `num` tiver algum caractere que não é dígito
     """
-    soma = 0
-    multiplicador = 2
-    for n in reversed(num):
-        produto = int(n) * multiplicador
-        soma += sum(map(int, str(produto)))
-        multiplicador = 1 if multiplicador == 2 else 2
+    pesos = islice(cycle(_MOD11_PRODUTOS), deslocamento % 8, None)
+    try:
+        return sum(tabela[n] for tabela, n in zip(pesos, reversed(num)))
+    except KeyError as e:
+        raise ValueError(f"Dígito inválido: {e.args[0]!r}") from None
+
+def _dac_modulo_10(soma):
+    """Converte a soma ponderada do módulo 10 no dígito verificador."""
     resto = soma % 10
     return 0 if resto == 0 else 10 - resto
 
+def _dac_modulo_11(soma):
+    """Converte a soma ponderada do módulo 11 no dígito verificador."""
+    dac = 11 - soma % 11
+    return 1 if dac in (0, 1, 10, 11) else dac
+
+def modulo_10(num):
+    """
+    Calcula o dígito verificador utilizando o módulo 10.
+    """
+    return _dac_modulo_10(_soma_modulo_10(num))
+
 def modulo_11(num):
     """
     Calcula o dígito verificador utilizando o módulo 11.
     """
-    pesos = [2, 3, 4, 5, 6, 7, 8, 9]
-    soma = 0
-    for i, n in enumerate(reversed(num)):
-        peso = pesos[i % len(pesos)]
-        soma += int(n) * peso
-    resto = soma % 11
-    dac = 11 - resto
-    return 1 if dac in [0, 1, 10, 11] else dac
+    return _dac_modulo_11(_soma_modulo_11(num))
+
+class SomasFixas(NamedTuple):
+    """Parcelas dos dígitos verificadores que dependem apenas da configuração do boleto."""
+    modulo_11: int        # Banco, Moeda, Carteira, Agência, Conta, DAC Conta e "000"
+    campo1_prefixo: str   # Banco + Moeda + Carteira
+    campo1_soma: int
+    campo2_sufixo: str    # Três primeiros dígitos da Agência
+    campo2_soma: int
+    campo3: str           # Campo 3 inteiro, já formatado e com DAC
+
+@lru_cache(maxsize=None)
+def somas_fixas(banco, moeda, carteira, agencia, conta, dac_conta):
+    """
+    Pré-calcula as parcelas constantes dos dígitos verificadores de uma configuração.
+    
+    Das 43 posições do código de barras (sem o DAC), só o fator de vencimento,
+    o valor e o Nosso Número com seu DAC variam entre títulos da mesma empresa.
+    O resultado fica em cache por configuração.
+    
+    Returns:
+        SomasFixas: Somas parciais e trechos fixos da linha digitável
+    """
+    agencia = agencia.zfill(4)
+    conta = conta.zfill(5)
+    sufixo = f"{agencia}{conta}{dac_conta}000"
+
+    # Posições no código sem DAC: Banco/Moeda (0-3), Fator/Valor (4-17),
+    # Carteira (18-20), Nosso Número/DAC (21-29), Agência..."000" (30-42)
+    soma_11 = (_soma_modulo_11(banco + moeda, 39) +
+               _soma_modulo_11(carteira, 22) +
+               _soma_modulo_11(sufixo))
+
+    # Campo 1: Banco + Moeda + Carteira + 2 primeiros dígitos do Nosso Número
+    campo1_prefixo = banco + moeda + carteira
+    # Campo 2: 6 últimos dígitos do Nosso Número + DAC + 3 primeiros da Agência
+    campo2_sufixo = agencia[:3]
+    # Campo 3: último dígito da Agência + Conta + DAC Conta + "000" (constante)
+    campo3 = sufixo[3:]
+    campo3 = f"{campo3[:5]}.{campo3[5:]}{modulo_10(campo3)}"
+
+    return SomasFixas(
+        modulo_11=soma_11,
+        campo1_prefixo=campo1_prefixo,
+        campo1_soma=_soma_modulo_10(campo1_prefixo, 2),
+        campo2_sufixo=campo2_sufixo,
+        campo2_soma=_soma_modulo_10(campo2_sufixo),
+        campo3=campo3,
+    )
+
+# Regras de cada campo da configuração: (nome da variável, mínimo e máximo de dígitos)
+_REGRAS_CONFIG = {
+    'banco': ('BANCO', 3, 3),
+    'moeda': ('MOEDA', 1, 1),
+    'carteira': ('CARTEIRA', 3, 3),
+    'agencia': ('AGENCIA', 1, 4),
+    'conta': ('CONTA', 1, 5),
+    'dac_conta': ('DAC_CONTA', 1, 1),
+}
+
+EMPRESAS = ('FIDC', 'SEC')
+
+# Data base do fator de vencimento (fator 1000); o fator reinicia em 1000 a cada 9000 dias
+_ORDINAL_BASE_FATOR = date(2000, 7, 3).toordinal()
+_CICLO_FATOR = 9000
+# Ordinal de 01/01/1970, origem do numpy.datetime64
+_ORDINAL_EPOCH = date(1970, 1, 1).toordinal()
+
+@dataclass(frozen=True)
+class BoletoConfig:
+    """
+    Configuração fixa do boleto de uma empresa, validada na criação.
+    
+    Guarda Agência e Conta já completadas com zeros, o sufixo do campo livre
+    já formatado e as parcelas constantes dos dígitos verificadores, de modo
+    que a geração de cada título não consulta o ambiente nem formata nada fixo.
+    """
+    empresa: str
+    banco: str
+    moeda: str
+    carteira: str
+    agencia: str
+    conta: str
+    dac_conta: str
+    campo_livre_sufixo: str = field(init=False)
+    somas: SomasFixas = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        erros = []
+        for campo, (variavel, minimo, maximo) in _REGRAS_CONFIG.items():
+            valor = getattr(self, campo)
+            if campo in ('conta', 'dac_conta') and self.empresa:
+                variavel = f"{self.empresa}_{variavel}"
+            if not valor:
+                erros.append(f"{variavel} não configurado")
+            elif not (valor.isascii() and valor.isdigit()) or not minimo <= len(valor) <= maximo:
+                tamanho = f"{maximo}" if minimo == maximo else f"até {maximo}"
+                erros.append(f"{variavel} deve ter {tamanho} dígito(s), recebido '{valor}'")
+        if erros:
+            empresa = f" ({self.empresa})" if self.empresa else ""
+            raise ValueError(f"Configuração do boleto inválida{empresa}: " + "; ".join(erros))
+
+        object.__setattr__(self, 'agencia', self.agencia.zfill(4))
+        object.__setattr__(self, 'conta', self.conta.zfill(5))
+        # Campo livre após o Nosso Número: Agência (4) + Conta (5) + DAC Conta (1) + "000"
+        object.__setattr__(self, 'campo_livre_sufixo', f"{self.agencia}{self.conta}{self.dac_conta}000")
+        object.__setattr__(self, 'somas', somas_fixas(self.banco, self.moeda, self.carteira,
+                                                      self.agencia, self.conta, self.dac_conta))
+
+    @classmethod
+    def from_env(cls, empresa: str) -> 'BoletoConfig':
+        """Cria a configuração da empresa (FIDC ou SEC) a partir das variáveis do .env."""
+        if empresa not in EMPRESAS:
+            raise ValueError(f"Empresa desconhecida: {empresa}")
+        return cls(
+            empresa=empresa,
+            banco=os.getenv('BANCO'),
+            moeda=os.getenv('MOEDA'),
+            carteira=os.getenv('CARTEIRA'),
+            agencia=os.getenv('AGENCIA'),
+            conta=os.getenv(f'{empresa}_CONTA'),
+            dac_conta=os.getenv(f'{empresa}_DAC_CONTA'),
+        )
+
+@lru_cache(maxsize=None)
+def carregar_configs() -> Dict[str, BoletoConfig]:
+    """
+    Carrega uma única vez as configurações de boleto de todas as empresas.
+    
+    Raises:
+        ValueError: Se alguma configuração do .env estiver ausente ou inválida
+    """
+    return {empresa: BoletoConfig.from_env(empresa) for empresa in EMPRESAS}
+
+def config_empresa(empresa: str) -> BoletoConfig:
+    """Retorna a configuração da empresa; títulos que não são FIDC usam a da SEC."""
+    return carregar_configs()['FIDC' if empresa == 'FIDC' else 'SEC']
+
+@lru_cache(maxsize=64)
+def _config_avulsa(banco, moeda, carteira, agencia, conta, dac_conta):
+    """Configuração montada a partir de parâmetros soltos, em cache."""
+    return BoletoConfig('', banco, moeda, carteira, agencia, conta, dac_conta)
 
 def gerar_linha_digitavel(vencimento, valor, carteira, nosso_numero, agencia, conta, dac_nosso_numero, dac_conta):
     """
@@ -44,52 +235,543 @@ def gerar_linha_digitavel(vencimento, valor, carteira, nosso_numero, agencia, co
     Returns:
         str: Linha digitável formatada
     """
-    banco = os.getenv('BANCO')
-    moeda = os.getenv('MOEDA')
+    config = _config_avulsa(os.getenv('BANCO'), os.getenv('MOEDA'), carteira, agencia, conta, dac_conta)
+    return gerar_linha_digitavel_config(config, vencimento, valor, nosso_numero, dac_nosso_numero)
+
+def gerar_linha_digitavel_config(config, vencimento, valor, nosso_numero, dac_nosso_numero):
+    """
+    Gera a linha digitável de um boleto a partir de uma configuração já carregada.
+    
+    Args:
+        config (BoletoConfig): Configuração do boleto da empresa
+        vencimento (str): Data de vencimento no formato dd/mm/yyyy
+        valor (str): Valor do título (ex: 123.45)
+        nosso_numero (str): Nosso Número (8 dígitos)
+        dac_nosso_numero (str): DAC Nosso Número (1 dígito)
+        
+    Returns:
+        str: Linha digitável formatada
+    """
+    return gerar_linha_digitavel_tipada(
+        config,
+        datetime.strptime(vencimento, '%d/%m/%Y').date(),
+        valor_em_centavos(valor),
+        nosso_numero,
+        dac_nosso_numero
+    )
+
+def valor_em_centavos(valor) -> int:
+    """
+    Converte um valor monetário (Decimal, int, float ou str) em centavos inteiros.
+    
+    A conversão é feita em Decimal, sem passar por float, e descarta frações de
+    centavo. Floats são convertidos pela sua representação curta (0.29 -> 29).
+    """
+    if isinstance(valor, int):
+        return valor * 100
+    if not isinstance(valor, Decimal):
+        valor = Decimal(str(valor))
+    return int(valor.scaleb(2).to_integral_value(rounding=ROUND_DOWN))
 
-    # Fator de vencimento: Base 03/07/2000 (fator 1000)
-    venc_dt = datetime.strptime(vencimento, '%d/%m/%Y')
-    base = datetime(2000, 7, 3)
-    dias_decorridos = (venc_dt - base).days
-    fator = str(dias_decorridos + 1000).zfill(4)
-    fator_venc = fator if int(fator) <= 9999 else str(1000 + (int(fator) - 10000))
+def _calcular_fator(ordinal):
+    """Fator de vencimento (inteiro) do ordinal de uma data, sem tabela; aceita arrays."""
+    fator = ordinal - _ORDINAL_BASE_FATOR + 1000
+    if isinstance(fator, np.ndarray):
+        return np.where(fator > 9999, fator - _CICLO_FATOR, fator)
+    return fator - _CICLO_FATOR if fator > 9999 else fator
 
-    # Valor formatado com 10 dígitos (sem vírgula ou ponto)
-    valor_formatado = str(int(float(valor) * 100)).zfill(10)
+class TabelaFatores:
+    """
+    Tabela pré-calculada de ordinal de data -> fator de vencimento, numa janela de datas.
+    
+    A janela padrão vai da data base (03/07/2000) até o último dia antes do
+    segundo reinício do fator, cobrindo o reinício de 22/02/2025. Datas fora
+    da janela são calculadas diretamente, com o mesmo resultado.
+    """
 
-    # Campo livre: Carteira (3) + Nosso Número (8) + DAC Nosso Número (1) +
-    # Agência (4) + Conta (5) + DAC Conta (1) + "000"
-    campo_livre = f"{carteira}{nosso_numero}{dac_nosso_numero}{agencia.zfill(4)}{conta.zfill(5)}{dac_conta}000"
+    def __init__(self, inicio: date = None, fim: date = None):
+        self.inicio = inicio or date.fromordinal(_ORDINAL_BASE_FATOR)
+        self.fim = fim or date.fromordinal(_ORDINAL_BASE_FATOR + 2 * _CICLO_FATOR - 1)
+        if self.fim < self.inicio:
+            raise ValueError("A data final da janela de fatores deve ser posterior à inicial")
+        self._ordinal_inicio = self.inicio.toordinal()
+        self.fatores = _calcular_fator(np.arange(self._ordinal_inicio, self.fim.toordinal() + 1, dtype=np.int64))
+        self._textos = [f"{fator:04d}" for fator in self.fatores.tolist()]
+
+    def __contains__(self, vencimento: date) -> bool:
+        return self.inicio <= vencimento <= self.fim
+
+    def fator(self, vencimento: date) -> str:
+        """Fator de vencimento (4 dígitos) de uma data."""
+        indice = vencimento.toordinal() - self._ordinal_inicio
+        if 0 <= indice < len(self._textos):
+            return self._textos[indice]
+        return f"{_calcular_fator(vencimento.toordinal()):04d}"
+
+    def fatores_ordinais(self, ordinais) -> np.ndarray:
+        """Fatores de vencimento (inteiros) de um array de ordinais de data."""
+        indices = np.asarray(ordinais, dtype=np.int64) - self._ordinal_inicio
+        dentro = (indices >= 0) & (indices < len(self.fatores))
+        if dentro.all():
+            return self.fatores[indices]
+        return np.where(dentro, self.fatores[np.clip(indices, 0, len(self.fatores) - 1)],
+                        _calcular_fator(indices + self._ordinal_inicio))
+
+    def vencimento(self, fator, referencia: date = None) -> date:
+        """
+        Data de vencimento de um fator (operação inversa, para decodificação).
+        
+        Como o fator se repete a cada 9000 dias, entre as datas da janela com
+        esse fator é escolhida a mais próxima da data de referência (hoje, se
+        não informada).
+        
+        Raises:
+            ValueError: Se o fator for inválido ou não ocorrer na janela
+        """
+        fator = int(fator)
+        if not 1000 <= fator <= 9999:
+            raise ValueError(f"Fator de vencimento inválido: {fator}")
+        referencia = (referencia or date.today()).toordinal()
+        primeiro = _ORDINAL_BASE_FATOR + fator - 1000
+        ciclo = max(0, round((referencia - primeiro) / _CICLO_FATOR))
+        candidatos = [primeiro + _CICLO_FATOR * c for c in (ciclo - 1, ciclo, ciclo + 1) if c >= 0]
+        candidatos = [o for o in candidatos if self._ordinal_inicio <= o <= self.fim.toordinal()]
+        if not candidatos:
+            raise ValueError(f"Fator de vencimento {fator} fora da janela {self.inicio} a {self.fim}")
+        return date.fromordinal(min(candidatos, key=lambda o: abs(o - referencia)))
+
+@lru_cache(maxsize=None)
+def tabela_fatores(inicio: date = None, fim: date = None) -> TabelaFatores:
+    """Tabela de fatores da janela informada (ou da padrão), criada uma única vez."""
+    return TabelaFatores(inicio, fim)
 
-    # Monta o código de barras sem o DAC (posição 5)
-    # O formato é: Banco (3) + Moeda (1) + [DAC] + Fator de Vencimento (4) + Valor (10) + Campo Livre (25)
-    # Colocamos temporariamente um marcador "X" no lugar do DAC
-    codigo_barras = banco + moeda + 'X' + fator_venc + valor_formatado + campo_livre
+def fator_vencimento(vencimento: date, tabela: TabelaFatores = None) -> str:
+    """
+    Calcula o fator de vencimento (4 dígitos) de uma data.
     
-    dac_barras = str(modulo_11(codigo_barras.replace('X', '')))
+    Base 03/07/2000 (fator 1000); após o fator 9999 (21/02/2025) a contagem
+    reinicia em 1000. O valor vem da tabela pré-calculada.
+    """
+    return (tabela or tabela_fatores()).fator(vencimento)
+
+def vencimento_do_fator(fator, referencia: date = None, tabela: TabelaFatores = None) -> date:
+    """Data de vencimento correspondente a um fator; ver `TabelaFatores.vencimento`."""
+    return (tabela or tabela_fatores()).vencimento(fator, referencia)
+
+def gerar_linha_digitavel_tipada(config, vencimento: date, valor_centavos: int, nosso_numero, dac_nosso_numero,
+                                 tabela: TabelaFatores = None):
+    """
+    Gera a linha digitável a partir de valores já tipados, sem conversões de texto.
     
-    codigo_barras = codigo_barras.replace('X', dac_barras)
+    Args:
+        config (BoletoConfig): Configuração do boleto da empresa
+        vencimento (date): Data de vencimento
+        valor_centavos (int): Valor do título em centavos
+        nosso_numero (str): Nosso Número (8 dígitos)
+        dac_nosso_numero (str): DAC Nosso Número (1 dígito)
+        tabela (TabelaFatores): Tabela de fatores a usar (opcional, padrão em cache)
+        
+    Returns:
+        str: Linha digitável formatada
+
+    Raises:
+        ValueError: Se o vencimento, o valor ou o Nosso Número estiverem fora da faixa do boleto
+    """
+    # Fator de vencimento a partir do ordinal da data
+    fator_venc = fator_vencimento(vencimento, tabela)
+    if not 1000 <= int(fator_venc) <= 9999:
+        raise ValueError("Data de vencimento fora da faixa do fator de vencimento")
+
+    if not 0 <= valor_centavos < 10 ** 10:
+        raise ValueError("Valor fora da faixa de 10 dígitos")
+    # Valor formatado com 10 dígitos (sem vírgula ou ponto)
+    valor_formatado = f"{valor_centavos:010d}"
+
+    if len(nosso_numero) != 8 or len(dac_nosso_numero) != 1:
+        raise ValueError("Nosso Número deve ter 8 dígitos e seu DAC 1 dígito")
+
+    # Parcelas constantes dos DACs para esta configuração
+    fixas = config.somas
+
+    # Código de barras: Banco (3) + Moeda (1) + [DAC] + Fator de Vencimento (4) + Valor (10) + Campo Livre (25)
+    # Campo livre: Carteira (3) + Nosso Número (8) + DAC Nosso Número (1) +
+    # Agência (4) + Conta (5) + DAC Conta (1) + "000"
+    # O DAC (módulo 11) soma só as posições variáveis às parcelas fixas
+    campo5 = fator_venc + valor_formatado
+    nosso_numero_dac = nosso_numero + dac_nosso_numero
+    dac_barras = str(_dac_modulo_11(fixas.modulo_11 +
+                                    _soma_modulo_11(campo5, 25) +
+                                    _soma_modulo_11(nosso_numero_dac, 13)))
 
     # Montagem da linha digitável:
     # Campo 1: Posições 1-4 + Posições 20-24 (código de barras) e seu DAC (módulo 10)
-    campo1 = codigo_barras[0:4] + codigo_barras[19:24]
-    dac1 = str(modulo_10(campo1))
+    variavel1 = nosso_numero[:2]
+    dac1 = _dac_modulo_10(fixas.campo1_soma + _soma_modulo_10(variavel1))
+    campo1 = fixas.campo1_prefixo + variavel1
     campo1 = f"{campo1[:5]}.{campo1[5:]}{dac1}"
 
     # Campo 2: Posições 25-34 do código de barras e seu DAC (módulo 10)
-    campo2 = codigo_barras[24:34]
-    dac2 = str(modulo_10(campo2))
+    variavel2 = nosso_numero_dac[2:]
+    dac2 = _dac_modulo_10(fixas.campo2_soma + _soma_modulo_10(variavel2, 3))
+    campo2 = variavel2 + fixas.campo2_sufixo
     campo2 = f"{campo2[:5]}.{campo2[5:]}{dac2}"
 
-    # Campo 3: Posições 35-44 do código de barras e seu DAC (módulo 10)
-    campo3 = codigo_barras[34:44]
-    dac3 = str(modulo_10(campo3))
-    campo3 = f"{campo3[:5]}.{campo3[5:]}{dac3}"
+    # Campo 3: Posições 35-44 do código de barras, constante por configuração
+    campo3 = fixas.campo3
 
     # Campo 4: DAC do código de barras (já calculado)
     campo4 = dac_barras
 
-    # Campo 5: Fator de vencimento + valor
-    campo5 = fator_venc + valor_formatado
+    return f"{campo1} {campo2} {campo3} {campo4} {campo5}"
+
+def gerar_codigo_barras_tipada(config, vencimento: date, valor_centavos: int, nosso_numero, dac_nosso_numero,
+                               tabela: TabelaFatores = None):
+    """
+    Gera o código de barras (44 dígitos) de um boleto, com os mesmos argumentos
+    de `gerar_linha_digitavel_tipada`.
+    
+    Returns:
+        str: Código de barras
+    """
+    return codigo_barras_da_linha(gerar_linha_digitavel_tipada(
+        config, vencimento, valor_centavos, nosso_numero, dac_nosso_numero, tabela))
+
+def codigo_barras_da_linha(linha):
+    """
+    Reordena uma linha digitável (com ou sem pontuação) no código de barras de 44 dígitos.
+    
+    Não verifica os DACs; para isso use `ler_linha_digitavel`.
+    """
+    digitos = linha.translate(_PONTUACAO)
+    if len(digitos) != 47:
+        raise ValueError("A linha digitável deve ter 47 dígitos")
+    # Banco/Moeda + DAC + Fator/Valor + Campo Livre (campos 1, 2 e 3 sem seus DACs)
+    return (digitos[0:4] + digitos[32] + digitos[33:47] +
+            digitos[4:9] + digitos[10:20] + digitos[21:31])
+
+def _digitos_texto(valores, largura, nome):
+    """
+    Converte uma sequência de textos numéricos de largura fixa em uma matriz
+    de dígitos (n x largura).
+    """
+    arr = np.asarray(valores, dtype=f'S{largura + 1}').ravel()
+    if arr.size and not (np.char.str_len(arr) == largura).all():
+        raise ValueError(f"{nome} deve ter exatamente {largura} dígito(s)")
+    digitos = arr.view(np.uint8).reshape(-1, largura + 1)[:, :largura] - ord('0')
+    if (digitos > 9).any():
+        raise ValueError(f"{nome} deve conter apenas dígitos")
+    return digitos
+
+def _digitos_numero(valores, largura):
+    """Decompõe uma coluna de inteiros em uma matriz de dígitos (n x largura)."""
+    potencias = 10 ** np.arange(largura - 1, -1, -1, dtype=np.int64)
+    return ((valores[:, None] // potencias) % 10).astype(np.uint8)
+
+def _soma_modulo_10_batch(digitos, deslocamento=0):
+    """Soma ponderada do módulo 10 sobre as linhas de uma matriz de dígitos."""
+    largura = digitos.shape[1]
+    multiplicadores = np.where((np.arange(largura - 1, -1, -1) + deslocamento) % 2 == 0, 2, 1)
+    produtos = digitos.astype(np.int64) * multiplicadores
+    # Soma dos algarismos do produto (no máximo 18 = 1 + 8)
+    return (produtos - 9 * (produtos > 9)).sum(axis=1)
+
+def _dac_modulo_10_batch(digitos, deslocamento=0):
+    """DACs do módulo 10 das linhas de uma matriz de dígitos."""
+    return (10 - _soma_modulo_10_batch(digitos, deslocamento) % 10) % 10
+
+def _soma_modulo_11_batch(digitos, deslocamento=0):
+    """Soma ponderada do módulo 11 sobre as linhas de uma matriz de dígitos."""
+    largura = digitos.shape[1]
+    pesos = np.array(_PESOS_MOD11)[(np.arange(largura - 1, -1, -1) + deslocamento) % 8]
+    return digitos.astype(np.int64) @ pesos
+
+def _calcular_batch(vencimentos, valores_centavos, nossos_numeros, dacs_nosso_numero, config, tabela):
+    """
+    Calcula, por coluna, as partes variáveis do código de barras e seu DAC.
+    
+    Returns:
+        tuple: Dígitos de Fator + Valor (n x 14), de Nosso Número + DAC (n x 9)
+        e os DACs do código de barras (n)
+    """
+    vencimentos = np.asarray(vencimentos, dtype='datetime64[D]').ravel()
+    valores = np.asarray(valores_centavos, dtype=np.int64).ravel()
+    n = len(vencimentos)
+    if len(valores) != n:
+        raise ValueError("As colunas de entrada devem ter o mesmo tamanho")
+
+    # Fator de vencimento pela tabela pré-calculada, a partir do ordinal das datas
+    ordinais = vencimentos.astype(np.int64) + _ORDINAL_EPOCH
+    fatores = (tabela or tabela_fatores()).fatores_ordinais(ordinais)
+    if ((fatores < 1000) | (fatores > 9999)).any():
+        raise ValueError("Data de vencimento fora da faixa do fator de vencimento")
+    if ((valores < 0) | (valores >= 10 ** 10)).any():
+        raise ValueError("Valor fora da faixa de 10 dígitos")
+
+    # Só as posições variáveis do código de barras são processadas:
+    # Fator (4) + Valor (10) e Nosso Número (8) + DAC Nosso Número (1)
+    campo5 = np.concatenate([_digitos_numero(fatores, 4), _digitos_numero(valores, 10)], axis=1)
+    nosso_numero_dac = np.concatenate([_digitos_texto(nossos_numeros, 8, 'Nosso Número'),
+                                       _digitos_texto(dacs_nosso_numero, 1, 'DAC Nosso Número')], axis=1)
+    if len(nosso_numero_dac) != n:
+        raise ValueError("As colunas de entrada devem ter o mesmo tamanho")
+
+    # DAC do código de barras (módulo 11), somado às parcelas constantes da configuração
+    dac_barras = 11 - (config.somas.modulo_11 +
+                       _soma_modulo_11_batch(campo5, 25) +
+                       _soma_modulo_11_batch(nosso_numero_dac, 13)) % 11
+    dac_barras = np.where(dac_barras >= 10, 1, dac_barras)
+
+    return campo5, nosso_numero_dac, dac_barras
+
+def _ascii(texto):
+    """Bytes de um texto ASCII como array numpy."""
+    return np.frombuffer(texto.encode('ascii'), dtype=np.uint8)
+
+def gerar_linhas_digitaveis_batch(vencimentos, valores_centavos, nossos_numeros, dacs_nosso_numero, config,
+                                  tabela: TabelaFatores = None):
+    """
+    Gera as linhas digitáveis de vários boletos de uma vez, operando por coluna.
+    
+    Produz exatamente o mesmo texto que `gerar_linha_digitavel` para cada título.
+    
+    Args:
+        vencimentos: Datas de vencimento (date, datetime ou numpy.datetime64)
+        valores_centavos: Valores dos títulos em centavos (inteiros)
+        nossos_numeros: Nossos Números (8 dígitos cada)
+        dacs_nosso_numero: DACs dos Nossos Números (1 dígito cada)
+        config (BoletoConfig): Configuração do boleto da empresa
+        tabela (TabelaFatores): Tabela de fatores a usar (opcional, padrão em cache)
+        
+    Returns:
+        list[str]: Linhas digitáveis formatadas, na ordem de entrada
+    """
+    campo5, nosso_numero_dac, dac_barras = _calcular_batch(
+        vencimentos, valores_centavos, nossos_numeros, dacs_nosso_numero, config, tabela)
+    n = len(campo5)
+    if n == 0:
+        return []
+
+    # Parcelas constantes dos DACs para esta configuração
+    fixas = config.somas
+
+    # DACs dos campos 1 e 2 (módulo 10); o campo 3 é constante
+    dac1 = (10 - (fixas.campo1_soma + _soma_modulo_10_batch(nosso_numero_dac[:, :2])) % 10) % 10
+    dac2 = (10 - (fixas.campo2_soma + _soma_modulo_10_batch(nosso_numero_dac[:, 2:], 3)) % 10) % 10
+
+    # Montagem do texto: "AAAAA.AAAAD BBBBB.BBBBBD CCCCC.CCCCCD K FFFFVVVVVVVVVV"
+    campo1 = fixas.campo1_prefixo
+    campo2 = fixas.campo2_sufixo
+    linhas = np.full((n, 54), ord(' '), dtype=np.uint8)
+    linhas[:, 0:5] = _ascii(campo1[:5])
+    linhas[:, 5] = ord('.')
+    linhas[:, 6:8] = _ascii(campo1[5:])
+    linhas[:, 8:10] = nosso_numero_dac[:, :2] + ord('0')
+    linhas[:, 10] = dac1 + ord('0')
+    linhas[:, 12:17] = nosso_numero_dac[:, 2:7] + ord('0')
+    linhas[:, 17] = ord('.')
+    linhas[:, 18:20] = nosso_numero_dac[:, 7:9] + ord('0')
+    linhas[:, 20:23] = _ascii(campo2)
+    linhas[:, 23] = dac2 + ord('0')
+    linhas[:, 25:37] = _ascii(fixas.campo3)
+    linhas[:, 38] = dac_barras + ord('0')
+    linhas[:, 40:54] = campo5 + ord('0')
+
+    return linhas.view('S54').ravel().astype('U54').tolist()
+
+def gerar_codigos_barras_batch(vencimentos, valores_centavos, nossos_numeros, dacs_nosso_numero, config,
+                               tabela: TabelaFatores = None):
+    """
+    Gera os códigos de barras (44 dígitos) de vários boletos de uma vez.
+    
+    Recebe os mesmos argumentos de `gerar_linhas_digitaveis_batch`.
+    
+    Returns:
+        list[str]: Códigos de barras, na ordem de entrada
+    """
+    campo5, nosso_numero_dac, dac_barras = _calcular_batch(
+        vencimentos, valores_centavos, nossos_numeros, dacs_nosso_numero, config, tabela)
+    n = len(campo5)
+    if n == 0:
+        return []
+
+    # Banco (3) + Moeda (1) + DAC (1) + Fator (4) + Valor (10) + Campo Livre (25)
+    codigos = np.empty((n, 44), dtype=np.uint8)
+    codigos[:, 0:4] = _ascii(config.banco + config.moeda)
+    codigos[:, 4] = dac_barras + ord('0')
+    codigos[:, 5:19] = campo5 + ord('0')
+    codigos[:, 19:22] = _ascii(config.carteira)
+    codigos[:, 22:31] = nosso_numero_dac + ord('0')
+    codigos[:, 31:44] = _ascii(config.campo_livre_sufixo)
+
+    return codigos.view('S44').ravel().astype('U44').tolist()
+
+class LinhaDigitavelInvalida(ValueError):
+    """Linha digitável ou código de barras com formato ou dígitos verificadores inválidos."""
+
+@dataclass(frozen=True)
+class DadosBoleto:
+    """Campos extraídos de uma linha digitável ou de um código de barras."""
+    codigo_barras: str
+    linha_digitavel: str
+    banco: str
+    moeda: str
+    fator: str
+    vencimento: Optional[date]  # None para fator "0000" ou fora da janela de fatores
+    valor_centavos: int
+    carteira: str
+    nosso_numero: str
+    dac_nosso_numero: str
+    agencia: str
+    conta: str
+    dac_conta: str
+
+def _linha_de_codigo_barras(codigo_barras):
+    """Monta a linha digitável formatada a partir dos 44 dígitos do código de barras."""
+    campo1 = codigo_barras[0:4] + codigo_barras[19:24]
+    campo2 = codigo_barras[24:34]
+    campo3 = codigo_barras[34:44]
+    return (f"{campo1[:5]}.{campo1[5:]}{modulo_10(campo1)} "
+            f"{campo2[:5]}.{campo2[5:]}{modulo_10(campo2)} "
+            f"{campo3[:5]}.{campo3[5:]}{modulo_10(campo3)} "
+            f"{codigo_barras[4]} {codigo_barras[5:19]}")
+
+def ler_codigo_barras(codigo_barras, referencia: date = None) -> DadosBoleto:
+    """
+    Decodifica um código de barras de 44 dígitos, verificando seu DAC (módulo 11).
+    
+    Args:
+        codigo_barras (str): Código de barras (44 dígitos)
+        referencia (date): Data de referência para resolver o fator de vencimento (padrão: hoje)
+        
+    Returns:
+        DadosBoleto: Campos do boleto
+        
+    Raises:
+        LinhaDigitavelInvalida: Se o formato ou o DAC forem inválidos
+    """
+    if len(codigo_barras) != 44 or not (codigo_barras.isascii() and codigo_barras.isdigit()):
+        raise LinhaDigitavelInvalida("O código de barras deve ter 44 dígitos")
+    if modulo_11(codigo_barras[:4] + codigo_barras[5:]) != int(codigo_barras[4]):
+        raise LinhaDigitavelInvalida("DAC do código de barras inválido")
+
+    fator = codigo_barras[5:9]
+    try:
+        vencimento = vencimento_do_fator(fator, referencia) if fator >= '1000' else None
+    except ValueError:
+        vencimento = None
+
+    # Campo livre: Carteira (3) + Nosso Número (8) + DAC Nosso Número (1) +
+    # Agência (4) + Conta (5) + DAC Conta (1) + "000"
+    campo_livre = codigo_barras[19:44]
+    return DadosBoleto(
+        codigo_barras=codigo_barras,
+        linha_digitavel=_linha_de_codigo_barras(codigo_barras),
+        banco=codigo_barras[0:3],
+        moeda=codigo_barras[3],
+        fator=fator,
+        vencimento=vencimento,
+        valor_centavos=int(codigo_barras[9:19]),
+        carteira=campo_livre[0:3],
+        nosso_numero=campo_livre[3:11],
+        dac_nosso_numero=campo_livre[11],
+        agencia=campo_livre[12:16],
+        conta=campo_livre[16:21],
+        dac_conta=campo_livre[21],
+    )
+
+def ler_linha_digitavel(linha, referencia: date = None) -> DadosBoleto:
+    """
+    Decodifica uma linha digitável de 47 dígitos, com ou sem pontuação.
+    
+    Verifica os quatro DACs: os dos campos 1, 2 e 3 (módulo 10) e o do
+    código de barras (módulo 11).
+    
+    Args:
+        linha (str): Linha digitável
+        referencia (date): Data de referência para resolver o fator de vencimento (padrão: hoje)
+        
+    Returns:
+        DadosBoleto: Campos do boleto, incluindo o código de barras de 44 dígitos
+        
+    Raises:
+        LinhaDigitavelInvalida: Se o formato ou algum DAC forem inválidos
+    """
+    digitos = linha.translate(_PONTUACAO)
+    if len(digitos) != 47 or not (digitos.isascii() and digitos.isdigit()):
+        raise LinhaDigitavelInvalida("A linha digitável deve ter 47 dígitos")
+
+    for numero, (inicio, fim) in enumerate(((0, 9), (10, 20), (21, 31)), start=1):
+        if modulo_10(digitos[inicio:fim]) != int(digitos[fim]):
+            raise LinhaDigitavelInvalida(f"DAC do campo {numero} inválido")
+
+    return ler_codigo_barras(codigo_barras_da_linha(digitos), referencia)
+
+def validar_linhas_batch(linhas, inicio: int = 0) -> List[Tuple[int, str, str]]:
+    """
+    Valida muitas linhas digitáveis de uma vez e retorna apenas as inválidas.
+    
+    Args:
+        linhas: Sequência de linhas digitáveis (com ou sem pontuação)
+        inicio (int): Índice atribuído à primeira linha (útil ao validar em blocos)
+        
+    Returns:
+        list[tuple]: (índice, linha, motivo) de cada linha inválida, em ordem
+    """
+    linhas = list(linhas)
+    normalizadas = [linha.translate(_PONTUACAO) for linha in linhas]
+    tamanhos = np.fromiter(map(len, normalizadas), dtype=np.int64, count=len(normalizadas))
+    motivos = np.full(len(linhas), None, dtype=object)
+    motivos[tamanhos != 47] = "A linha digitável deve ter 47 dígitos"
+
+    indices = np.flatnonzero(tamanhos == 47)
+    if len(indices):
+        texto = ''.join([normalizadas[i] for i in indices]).encode('ascii', errors='replace')
+        digitos = np.frombuffer(texto, dtype=np.uint8).reshape(-1, 47) - ord('0')
+
+        # As verificações são feitas da última para a primeira, para que o
+        # motivo registrado seja o da primeira que falhar
+        codigo_sem_dac = np.concatenate([digitos[:, 0:4], digitos[:, 33:47], digitos[:, 4:9],
+                                         digitos[:, 10:20], digitos[:, 21:31]], axis=1)
+        dac_barras = 11 - _soma_modulo_11_batch(codigo_sem_dac) % 11
+        dac_barras = np.where(dac_barras >= 10, 1, dac_barras)
+        verificacoes = [
+            (dac_barras != digitos[:, 32], "DAC do código de barras inválido"),
+            (_dac_modulo_10_batch(digitos[:, 21:31]) != digitos[:, 31], "DAC do campo 3 inválido"),
+            (_dac_modulo_10_batch(digitos[:, 10:20]) != digitos[:, 20], "DAC do campo 2 inválido"),
+            (_dac_modulo_10_batch(digitos[:, 0:9]) != digitos[:, 9], "DAC do campo 1 inválido"),
+            ((digitos > 9).any(axis=1), "A linha digitável deve ter 47 dígitos"),
+        ]
+        for falhas, motivo in verificacoes:
+            motivos[indices[falhas]] = motivo
+
+    return [(inicio + int(i), linhas[i], motivos[i]) for i in np.flatnonzero(motivos != None)]  # noqa: E711
+
+def validar_arquivo(caminho, tamanho_bloco: int = 200_000, encoding: str = 'utf-8') -> Iterator[Tuple[int, str, str]]:
+    """
+    Valida um arquivo com uma linha digitável por linha, em blocos.
+    
+    Linhas em branco são ignoradas.
+    
+    Args:
+        caminho (str): Caminho do arquivo
+        tamanho_bloco (int): Quantidade de linhas validadas por vez
+        encoding (str): Codificação do arquivo
+        
+    Yields:
+        tuple: (número da linha no arquivo, linha, motivo) de cada linha inválida
+    """
+    with open(caminho, encoding=encoding, errors='replace') as arquivo:
+        numero = 1
+        while True:
+            bloco = [linha.rstrip('\r\n') for linha in islice(arquivo, tamanho_bloco)]
+            if not bloco:
+                break
+            for indice, linha, motivo in validar_linhas_batch(bloco, inicio=numero):
+                if linha.strip():
+                    yield indice, linha, motivo
+            numero += len(bloco)
 
-    return f"{campo1} {campo2} {campo3} {campo4} {campo5}" 
\ No newline at end of file
+if __name__ == "__main__":
+    # Modo sem interface gráfica: python -m linha_digitavel batch|validar ...
+    from cli import main
+    sys.exit(main())
@@ -7,6 +7,7 @@ import logging
 
 from ui import MainWindow
 from db import db_connection
+from linha_digitavel import carregar_configs
 
 # Configurar logging
 logging.basicConfig(
@@ -28,8 +29,10 @@ def main():
     app.setApplicationName("Gerador de Linha Digitável - WBA")
     
     # Verificar se as variáveis de ambiente estão configuradas
-    required_env_vars = ['DB_SERVER', 'DB_DATABASE', 'DB_USERNAME', 'DB_PASSWORD',
-                         'BANCO', 'MOEDA', 'CARTEIRA', 'AGENCIA', 'FIDC_CONTA', 'FIDC_DAC_CONTA', 'SEC_CONTA', 'SEC_DAC_CONTA']
+    required_env_vars = ['BANCO', 'MOEDA', 'CARTEIRA', 'AGENCIA', 'FIDC_CONTA', 'FIDC_DAC_CONTA', 'SEC_CONTA', 'SEC_DAC_CONTA']
+    # O banco SQLite local (DB_BACKEND=sqlite) não usa as credenciais do servidor
+    if os.getenv('DB_BACKEND', 'sqlserver').strip().lower() != 'sqlite':
+        required_env_vars = ['DB_SERVER', 'DB_DATABASE', 'DB_USERNAME', 'DB_PASSWORD'] + required_env_vars
     
     missing_vars = [var for var in required_env_vars if not os.getenv(var)]
     if missing_vars:
@@ -44,6 +47,21 @@ def main():
         msg.exec_()
         return 1
     
+    # Validar as configurações do boleto uma única vez, antes do primeiro título
+    try:
+        carregar_configs()
+    except ValueError as e:
+        logger.error(str(e))
+        from PyQt5.QtWidgets import QMessageBox
+        msg = QMessageBox()
+        msg.setIcon(QMessageBox.Critical)
+        msg.setWindowTitle("Erro de Configuração")
+        msg.setText("Configuração do boleto inválida")
+        msg.setInformativeText(str(e))
+        msg.setDetailedText("Edite o arquivo .env na raiz do projeto e corrija as configurações do boleto.")
+        msg.exec_()
+        return 1
+    
     # Testar conexão com o banco de dados
     if not db_connection.connect():
         from PyQt5.QtWidgets import QMessageBox
@@ -1,12 +1,18 @@
+from array import array
 from dataclasses import dataclass
 from datetime import datetime, date
-from typing import List, Dict, Any, Optional
-import os
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from dotenv import load_dotenv
 import logging
+import threading
+import numpy as np
 
+from cache_linhas import cache_do_ambiente, chave_linha
 # Importação da função de geração de linha digitável
-from linha_digitavel import gerar_linha_digitavel
+from linha_digitavel import (
+    codigo_barras_da_linha, config_empresa, gerar_linha_digitavel_tipada,
+    gerar_linhas_digitaveis_batch, valor_em_centavos
+)
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, 
@@ -16,6 +22,9 @@ logger = logging.getLogger(__name__)
 # Carregar variáveis de ambiente
 load_dotenv()
 
+# Mensagem gravada no lugar da linha digitável quando a geração falha
+ERRO_LINHA_DIGITAVEL = "Erro na geração da linha digitável"
+
 @dataclass
 class Pessoa:
     """Classe que representa uma pessoa (Cedente ou Sacado) no sistema."""
@@ -52,6 +61,8 @@ class Titulo:
     vencimento: date
     valor: float
     linha_digitavel: Optional[str] = None
+    valor_centavos: Optional[int] = None  # Valor exato em centavos, lido do Decimal do banco
+    codigo_barras: Optional[str] = None  # Código de barras (44 dígitos) da linha digitável
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Titulo':
@@ -78,7 +89,8 @@ class Titulo:
                 codigo_dcto=data['codigo_dcto'],
                 tipodcto=data['tipodcto'],
                 vencimento=vencimento,
-                valor=float(data['valor'])
+                valor=float(data['valor']),
+                valor_centavos=valor_em_centavos(data['valor'])
             )
         except Exception as e:
             logger.error(f"Erro ao criar Titulo: {e}")
@@ -86,43 +98,34 @@ class Titulo:
             raise
     
     def gerar_linha_digitavel(self) -> str:
-        """Gera a linha digitável para o título usando os dados fixos do .env"""
+        """Gera a linha digitável para o título usando a configuração da empresa carregada do .env"""
         try:
-            # Obter dados do ambiente
-            carteira = os.getenv('CARTEIRA')
-            agencia = os.getenv('AGENCIA')
-            
-            if self.empresa == 'FIDC':
-                conta = os.getenv('FIDC_CONTA')
-                dac_conta = os.getenv('FIDC_DAC_CONTA')
-            else:
-                conta = os.getenv('SEC_CONTA')
-                dac_conta = os.getenv('SEC_DAC_CONTA')
+            # Configuração da empresa, carregada uma única vez
+            config = config_empresa(self.empresa)
             
             # Extrai o número e DAC do nosso número do seu_numero
             # Assumindo que seu_numero contém o nosso número (8 dígitos) seguido do DAC (1 dígito)
             nosso_numero = self.seu_numero[:8]
             dac_nosso_numero = self.seu_numero[8:9]
             
-            # Formatar data de vencimento como string dd/mm/yyyy
-            vencimento_str = self.vencimento.strftime('%d/%m/%Y')
+            # Valor em centavos exatos; títulos criados sem ele usam o float
+            if self.valor_centavos is None:
+                self.valor_centavos = valor_em_centavos(self.valor)
             
-            # Gerar linha digitável
-            self.linha_digitavel = gerar_linha_digitavel(
-                vencimento=vencimento_str,
-                valor=str(self.valor),
-                carteira=carteira,
+            # Gerar linha digitável direto da data e dos centavos, sem conversões de texto
+            self.linha_digitavel = gerar_linha_digitavel_tipada(
+                config,
+                vencimento=self.vencimento,
+                valor_centavos=self.valor_centavos,
                 nosso_numero=nosso_numero,
-                agencia=agencia,
-                conta=conta,
-                dac_nosso_numero=dac_nosso_numero,
-                dac_conta=dac_conta
+                dac_nosso_numero=dac_nosso_numero
             )
+            self.codigo_barras = codigo_barras_da_linha(self.linha_digitavel)
             
             return self.linha_digitavel
         except Exception as e:
             logger.error(f"Erro ao gerar linha digitável: {e}")
-            return "Erro na geração da linha digitável"
+            return ERRO_LINHA_DIGITAVEL
     
     def to_dict(self) -> Dict[str, Any]:
         """Converte o título para um dicionário, incluindo a linha digitável."""
@@ -142,5 +145,518 @@ class Titulo:
             'tipodcto': self.tipodcto,
             'vencimento': self.vencimento.strftime('%d/%m/%Y'),
             'valor': self.valor,
-            'linha_digitavel': self.linha_digitavel
-        } 
\ No newline at end of file
+            'linha_digitavel': self.linha_digitavel,
+            'codigo_barras': self.codigo_barras
+        }
+
+# Ordinal de 01/01/1970, origem do numpy.datetime64
+_ORDINAL_EPOCH = date(1970, 1, 1).toordinal()
+# Marca de valor ausente nas colunas inteiras (datas ausentes têm ordinal 0)
+_NULO = -(2 ** 63)
+_TAMANHO_LINHA = 54
+_ERRO_LINHA_BYTES = ERRO_LINHA_DIGITAVEL.encode('utf-8')
+
+def _ordinal(valor) -> int:
+    """Ordinal de uma data (date, datetime ou texto yyyy-mm-dd); 0 se ausente."""
+    if valor is None:
+        return 0
+    if isinstance(valor, str):
+        return date.fromisoformat(valor[:10]).toordinal()
+    return valor.toordinal()
+
+def _data(ordinal: int) -> Optional[date]:
+    return date.fromordinal(ordinal) if ordinal else None
+
+def _inteiro(valor) -> Optional[int]:
+    return None if valor == _NULO else valor
+
+class _ColunaTexto:
+    """Textos de uma coluna concatenados em UTF-8, com a posição final de cada um."""
+    __slots__ = ('dados', 'fins')
+
+    def __init__(self):
+        self.dados = bytearray()
+        self.fins = array('I')  # Até 4 GiB de texto por coluna
+
+    def estender(self, textos: Iterable[Optional[str]]) -> None:
+        dados, fins = self.dados, self.fins
+        for texto in textos:
+            if texto:
+                dados += texto.encode('utf-8')
+            fins.append(len(dados))
+
+    def anexar(self, outra: '_ColunaTexto') -> None:
+        deslocamento = len(self.dados)
+        self.dados += outra.dados
+        self.fins.extend(fim + deslocamento for fim in outra.fins)
+
+    def bytes_de(self, i: int) -> bytes:
+        return bytes(self.dados[self.fins[i - 1] if i else 0:self.fins[i]])
+
+    def __getitem__(self, i: int) -> str:
+        return self.bytes_de(i).decode('utf-8')
+
+    def largura_fixa(self, indices: np.ndarray, largura: int) -> Optional[np.ndarray]:
+        """Matriz de bytes (n x largura) dos textos, ou None se algum tem outra largura."""
+        todos = np.frombuffer(self.fins, dtype=np.uint32)
+        fins = todos[indices].astype(np.int64)
+        inicios = fins - largura
+        anteriores = todos[np.maximum(indices - 1, 0)].astype(np.int64)
+        del todos
+        anteriores[indices == 0] = 0
+        if not (anteriores == inicios).all():
+            return None
+        dados = np.frombuffer(self.dados, dtype=np.uint8)
+        matriz = dados[inicios[:, None] + np.arange(largura)]
+        del dados
+        return matriz
+
+class _ColunaCategoria:
+    """Coluna com poucos valores distintos (empresa, tipo de documento): códigos e dicionário."""
+    __slots__ = ('codigos', 'valores', '_posicoes')
+
+    def __init__(self):
+        self.codigos = array('H')
+        self.valores: List[Any] = []
+        self._posicoes: Dict[Any, int] = {}
+
+    def codigo(self, valor) -> int:
+        posicao = self._posicoes.get(valor)
+        if posicao is None:
+            posicao = self._posicoes[valor] = len(self.valores)
+            self.valores.append(valor)
+        return posicao
+
+    def estender(self, valores: Iterable[Any]) -> None:
+        self.codigos.extend(self.codigo(valor) for valor in valores)
+
+    def anexar(self, outra: '_ColunaCategoria') -> None:
+        self.estender(outra.valores[codigo] for codigo in outra.codigos)
+
+    def __getitem__(self, i: int):
+        return self.valores[self.codigos[i]]
+
+# Colunas do TituloBatch: inteiras (array 'q'), datas (ordinais, array 'i'),
+# categorias (códigos e dicionário) e textos (UTF-8 concatenado)
+_COLUNAS_INTEIRAS = ('id', 'codigo', 'sacado', 'bordero', 'valor_centavos')
+_COLUNAS_DATAS = ('data_bordero', 'vencimento')
+_COLUNAS_CATEGORIAS = ('empresa', 'codigo_dcto', 'tipodcto')
+_COLUNAS_TEXTOS = ('numero_documento', 'seu_numero')
+
+class TituloBatch:
+    """
+    Títulos guardados por coluna, para listas grandes (a tabela da interface,
+    as exportações e a geração em lote).
+
+    Cada título ocupa algumas dezenas de bytes, contra mais de um kilobyte de
+    um `Titulo` com seus objetos date, str e Decimal. As datas são guardadas
+    como ordinais, os valores em centavos e as linhas digitáveis, depois de
+    geradas, com largura fixa. `batch[i]` devolve uma `TituloView`, com os
+    mesmos atributos e métodos de `Titulo`, criada apenas quando usada.
+
+    O lote cresce com `adicionar`/`estender`; títulos não são removidos. A
+    geração de linhas pode rodar numa thread enquanto a interface acrescenta
+    títulos: o crescimento das colunas espera a geração em andamento.
+    """
+
+    def __init__(self):
+        self._inteiros = {nome: array('q') for nome in _COLUNAS_INTEIRAS}
+        self._datas = {nome: array('i') for nome in _COLUNAS_DATAS}
+        self._categorias = {nome: _ColunaCategoria() for nome in _COLUNAS_CATEGORIAS}
+        self._textos = {nome: _ColunaTexto() for nome in _COLUNAS_TEXTOS}
+        self._linhas: Optional[bytearray] = None  # Alocadas na primeira geração
+        # As colunas não podem crescer enquanto arrays numpy as leem diretamente
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_registros(cls, registros: Iterable[Dict[str, Any]]) -> 'TituloBatch':
+        """Cria o lote a partir de registros de título (como retornados por `get_titulos`)."""
+        batch = cls()
+        batch.adicionar(registros)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._inteiros['id'])
+
+    def __getitem__(self, i: int) -> 'TituloView':
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return TituloView(self, i)
+
+    def __iter__(self) -> Iterator['TituloView']:
+        return (TituloView(self, i) for i in range(len(self)))
+
+    def adicionar(self, registros: Iterable[Dict[str, Any]]) -> None:
+        """Acrescenta registros de título ao fim do lote."""
+        registros = registros if isinstance(registros, list) else list(registros)
+        if not registros:
+            return
+        try:
+            colunas = {
+                'id': [r['id'] for r in registros],
+                'codigo': [_NULO if r['codigo'] is None else r['codigo'] for r in registros],
+                'sacado': [_NULO if r['sacado'] is None else r['sacado'] for r in registros],
+                'bordero': [_NULO if r['bordero'] is None else r['bordero'] for r in registros],
+                'valor_centavos': [valor_em_centavos(r['valor']) for r in registros],
+            }
+            datas = {nome: [_ordinal(r[nome]) for r in registros] for nome in _COLUNAS_DATAS}
+        except Exception as e:
+            logger.error(f"Erro ao criar TituloBatch: {e}")
+            raise
+        # Só altera o lote depois de converter todas as colunas
+        with self._lock:
+            for nome, valores in colunas.items():
+                self._inteiros[nome].extend(valores)
+            for nome, valores in datas.items():
+                self._datas[nome].extend(valores)
+            for nome, coluna in self._categorias.items():
+                coluna.estender(r[nome] for r in registros)
+            for nome, coluna in self._textos.items():
+                coluna.estender(r[nome] for r in registros)
+            self._ajustar_linhas()
+
+    def estender(self, outro: 'TituloBatch') -> None:
+        """Acrescenta os títulos (e as linhas já geradas) de outro lote."""
+        with self._lock:
+            inicio = len(self)
+            for nome, coluna in self._inteiros.items():
+                coluna.extend(outro._inteiros[nome])
+            for nome, coluna in self._datas.items():
+                coluna.extend(outro._datas[nome])
+            for nome, coluna in self._categorias.items():
+                coluna.anexar(outro._categorias[nome])
+            for nome, coluna in self._textos.items():
+                coluna.anexar(outro._textos[nome])
+            if outro._linhas is not None:
+                self._ajustar_linhas(forcar=True)
+                self._linhas[inicio * _TAMANHO_LINHA:] = outro._linhas
+            else:
+                self._ajustar_linhas()
+
+    def _ajustar_linhas(self, forcar: bool = False) -> None:
+        if self._linhas is None and not forcar:
+            return
+        if self._linhas is None:
+            self._linhas = bytearray()
+        self._linhas.extend(bytes(len(self) * _TAMANHO_LINHA - len(self._linhas)))
+
+    @property
+    def nbytes(self) -> int:
+        """Memória aproximada ocupada pelas colunas."""
+        total = sum(len(c) * c.itemsize for c in (*self._inteiros.values(), *self._datas.values()))
+        total += sum(len(c.codigos) * c.codigos.itemsize for c in self._categorias.values())
+        total += sum(len(c.dados) + len(c.fins) * c.fins.itemsize for c in self._textos.values())
+        return total + (len(self._linhas) if self._linhas is not None else 0)
+
+    def coluna(self, nome: str, indices: Optional[Iterable[int]] = None) -> np.ndarray:
+        """
+        Cópia de uma coluna (dos títulos em `indices`, ou de todos) como array
+        numpy: inteiros (ausentes = menor int64), datas como ordinais (ausentes
+        = 0), categorias e textos como objetos.
+        """
+        if indices is not None:
+            indices = np.asarray(list(indices) if not isinstance(indices, np.ndarray) else indices, dtype=np.intp)
+        if nome in self._inteiros or nome in self._datas:
+            tipo = np.int64 if nome in self._inteiros else np.int32
+            coluna = self._inteiros[nome] if nome in self._inteiros else self._datas[nome]
+            if indices is None:
+                return np.array(coluna, dtype=tipo)
+            with self._lock:
+                return np.frombuffer(coluna, dtype=tipo)[indices] if len(coluna) else np.empty(0, dtype=tipo)
+        if nome in self._categorias or nome in self._textos:
+            return np.array(self.valores(nome, None if indices is None else indices.tolist()), dtype=object)
+        raise KeyError(nome)
+
+    def chave_ordenacao(self, nome: str) -> np.ndarray:
+        """
+        Chave de ordenação dos títulos por uma coluna, para `numpy.argsort`;
+        valores ausentes ficam no início. Para 'linha_digitavel', gera antes
+        as linhas que faltam.
+        """
+        if nome == 'linha_digitavel':
+            with self._lock:
+                if self._linhas is None:
+                    faltantes = np.arange(len(self))
+                else:
+                    faltantes = np.flatnonzero(
+                        np.frombuffer(self._linhas, dtype=np.uint8)[::_TAMANHO_LINHA] == 0)
+                if len(faltantes):
+                    self.gerar_linhas(faltantes)
+                return np.frombuffer(self._linhas, dtype=f'S{_TAMANHO_LINHA}').copy()
+        if nome in self._categorias:
+            coluna = self._categorias[nome]
+            ordenados = sorted(range(len(coluna.valores)),
+                               key=lambda c: (coluna.valores[c] is not None, str(coluna.valores[c])))
+            posicoes = np.empty(len(ordenados), dtype=np.int64)
+            posicoes[ordenados] = np.arange(len(ordenados))
+            return posicoes[np.array(coluna.codigos, dtype=np.intp)]
+        if nome in self._textos:
+            return self.coluna(nome).astype(str)
+        return self.coluna(nome)
+
+    def valores(self, nome: str, indices: Optional[Iterable[int]] = None) -> List[Any]:
+        """Valores de uma coluna dos títulos (padrão: todos), com os tipos de `Titulo`."""
+        if indices is None:
+            indices = range(len(self))
+        if nome in self._inteiros:
+            coluna = self._inteiros[nome]
+            return [None if coluna[i] == _NULO else coluna[i] for i in indices]
+        if nome in self._datas:
+            coluna, datas = self._datas[nome], {}
+            return [datas[ordinal] if ordinal in datas else datas.setdefault(ordinal, _data(ordinal))
+                    for ordinal in (coluna[i] for i in indices)]
+        if nome in self._categorias:
+            coluna = self._categorias[nome]
+            return [coluna.valores[coluna.codigos[i]] for i in indices]
+        coluna = self._textos[nome]
+        dados, fins = coluna.dados, coluna.fins
+        return [dados[fins[i - 1] if i else 0:fins[i]].decode('utf-8') for i in indices]
+
+    def valor(self, nome: str, i: int):
+        """Valor de uma coluna do título `i`, com o tipo de `Titulo`."""
+        if nome in self._inteiros:
+            return _inteiro(self._inteiros[nome][i])
+        if nome in self._datas:
+            return _data(self._datas[nome][i])
+        if nome in self._categorias:
+            return self._categorias[nome][i]
+        return self._textos[nome][i]
+
+    def linha(self, i: int) -> Optional[str]:
+        """Linha digitável já gerada do título `i`, ou None."""
+        if self._linhas is None:
+            return None
+        texto = self._linhas[i * _TAMANHO_LINHA:(i + 1) * _TAMANHO_LINHA].rstrip(b'\0')
+        return texto.decode('utf-8') if texto else None
+
+    def _guardar_linha(self, i: int, linha: str) -> None:
+        dados = linha.encode('utf-8')
+        if len(dados) != _TAMANHO_LINHA and dados != _ERRO_LINHA_BYTES:
+            raise ValueError(f"Linha digitável com {len(dados)} bytes (esperado {_TAMANHO_LINHA}): {linha!r}")
+        with self._lock:
+            self._ajustar_linhas(forcar=True)
+            self._linhas[i * _TAMANHO_LINHA:(i + 1) * _TAMANHO_LINHA] = dados.ljust(_TAMANHO_LINHA, b'\0')
+
+    def textos_largura_fixa(self, nome: str, indices: Iterable[int], largura: int) -> Optional[np.ndarray]:
+        """Textos de uma coluna como array numpy 'S{largura}', ou None se algum tem outra largura."""
+        indices = np.asarray(indices if isinstance(indices, np.ndarray) else list(indices), dtype=np.int64)
+        with self._lock:
+            matriz = self._textos[nome].largura_fixa(indices, largura)
+        return None if matriz is None else np.ascontiguousarray(matriz).view(f'S{largura}').ravel()
+
+    def guardar_linhas(self, indices: Iterable[int], linhas) -> None:
+        """
+        Guarda linhas digitáveis geradas fora do lote (textos, ou array numpy
+        'S54' com o texto em UTF-8) dos títulos em `indices`.
+
+        Raises:
+            ValueError: Se alguma linha não tiver exatamente 54 bytes (exceto
+                `ERRO_LINHA_DIGITAVEL`)
+        """
+        indices = np.asarray(indices if isinstance(indices, np.ndarray) else list(indices), dtype=np.intp)
+        if not isinstance(linhas, np.ndarray):
+            linhas = np.array([linha.encode('utf-8') for linha in linhas], dtype=bytes)
+        invalidas = (np.char.str_len(linhas) != _TAMANHO_LINHA) & (linhas != _ERRO_LINHA_BYTES)
+        if invalidas.any():
+            raise ValueError(f"{int(invalidas.sum())} linha(s) digitável(is) sem {_TAMANHO_LINHA} bytes")
+        matriz = np.asarray(linhas, dtype=f'S{_TAMANHO_LINHA}').view(np.uint8).reshape(-1, _TAMANHO_LINHA)
+        with self._lock:
+            self._ajustar_linhas(forcar=True)
+            destino = np.frombuffer(self._linhas, dtype=np.uint8).reshape(-1, _TAMANHO_LINHA)
+            destino[indices] = matriz
+            del destino
+
+    def gerar_linha(self, i: int) -> str:
+        """Gera (e guarda) a linha digitável do título `i`, como `Titulo.gerar_linha_digitavel`."""
+        try:
+            seu_numero = self._textos['seu_numero'][i]
+            linha = gerar_linha_digitavel_tipada(
+                config_empresa(self._categorias['empresa'][i]),
+                vencimento=_data(self._datas['vencimento'][i]),
+                valor_centavos=self._inteiros['valor_centavos'][i],
+                nosso_numero=seu_numero[:8],
+                dac_nosso_numero=seu_numero[8:9]
+            )
+        except Exception as e:
+            logger.error(f"Erro ao gerar linha digitável: {e}")
+            linha = ERRO_LINHA_DIGITAVEL
+        self._guardar_linha(i, linha)
+        return linha
+
+    def gerar_linhas(self, indices: Optional[Iterable[int]] = None) -> List[str]:
+        """
+        Gera (e guarda) as linhas digitáveis dos títulos, em lote por empresa.
+
+        Se algum título de uma empresa tiver dados inválidos, os títulos dessa
+        empresa são gerados um a um, e os inválidos recebem `ERRO_LINHA_DIGITAVEL`.
+
+        Com o cache em disco configurado (CACHE_LINHAS, ver `cache_linhas`), as
+        linhas já geradas em outras execuções são lidas dele e só as demais são
+        calculadas.
+
+        Args:
+            indices: Posições dos títulos no lote (padrão: todos)
+
+        Returns:
+            Linhas digitáveis na ordem dos índices
+        """
+        indices = np.arange(len(self)) if indices is None else np.asarray(list(indices), dtype=np.int64)
+        if not len(indices):
+            return []
+        cache = cache_do_ambiente()
+        if cache is None:
+            return self._calcular_linhas(indices)
+
+        chaves = self._chaves_cache(indices)
+        try:
+            linhas = cache.obter([chave for chave in chaves if chave is not None])
+        except Exception as e:
+            logger.warning(f"Erro ao ler o cache de linhas digitáveis: {e}")
+            return self._calcular_linhas(indices)
+        encontradas = iter(linhas)
+        linhas = [None if chave is None else next(encontradas) for chave in chaves]
+        acertos = [posicao for posicao, linha in enumerate(linhas) if linha is not None]
+        faltas = [posicao for posicao, linha in enumerate(linhas) if linha is None]
+        if acertos:
+            self.guardar_linhas(indices[acertos], [linhas[posicao] for posicao in acertos])
+        if faltas:
+            calculadas = self._calcular_linhas(indices[faltas])
+            novas = []
+            for posicao, linha in zip(faltas, calculadas):
+                linhas[posicao] = linha
+                if chaves[posicao] is not None and linha != ERRO_LINHA_DIGITAVEL:
+                    novas.append((chaves[posicao], linha))
+            try:
+                cache.guardar([chave for chave, _ in novas], [linha for _, linha in novas])
+            except Exception as e:
+                logger.warning(f"Erro ao gravar o cache de linhas digitáveis: {e}")
+        return linhas
+
+    def _chaves_cache(self, indices: np.ndarray) -> List[Optional[str]]:
+        """Chaves de `cache_linhas` dos títulos (None para os sem seu número ou vencimento)."""
+        posicoes = indices.tolist()
+        empresas = self.valores('empresa', posicoes)
+        seus_numeros = self.valores('seu_numero', posicoes)
+        vencimentos = self.coluna('vencimento', indices).tolist()
+        centavos = self.coluna('valor_centavos', indices).tolist()
+        return [chave_linha(empresa, seu_numero, vencimento, valor)
+                if seu_numero and vencimento and valor != _NULO else None
+                for empresa, seu_numero, vencimento, valor in zip(empresas, seus_numeros, vencimentos, centavos)]
+
+    def _calcular_linhas(self, indices: np.ndarray) -> List[str]:
+        linhas: List[Optional[str]] = [None] * len(indices)
+        with self._lock:
+            empresas = self._categorias['empresa']
+            codigos = np.frombuffer(empresas.codigos, dtype=np.uint16)[indices]
+            vencimentos = np.frombuffer(self._datas['vencimento'], dtype=np.int32)[indices]
+            centavos = np.frombuffer(self._inteiros['valor_centavos'], dtype=np.int64)[indices]
+
+            for codigo in np.unique(codigos).tolist():
+                posicoes = np.flatnonzero(codigos == codigo)
+                grupo = indices[posicoes]
+                empresa = empresas.valores[codigo]
+                try:
+                    seus_numeros = self._textos['seu_numero'].largura_fixa(grupo, 9)
+                    if seus_numeros is None or (vencimentos[posicoes] == 0).any():
+                        raise ValueError("seu número ou vencimento inválido")
+                    geradas = gerar_linhas_digitaveis_batch(
+                        vencimentos=(vencimentos[posicoes] - _ORDINAL_EPOCH).astype('datetime64[D]'),
+                        valores_centavos=centavos[posicoes],
+                        nossos_numeros=np.ascontiguousarray(seus_numeros[:, :8]).view('S8').ravel(),
+                        dacs_nosso_numero=np.ascontiguousarray(seus_numeros[:, 8:]).view('S1').ravel(),
+                        config=config_empresa('FIDC' if empresa == 'FIDC' else 'SEC')
+                    )
+                    self._ajustar_linhas(forcar=True)
+                    destino = np.frombuffer(self._linhas, dtype=np.uint8).reshape(-1, _TAMANHO_LINHA)
+                    destino[grupo] = np.array(geradas, dtype=f'S{_TAMANHO_LINHA}').view(np.uint8).reshape(-1, _TAMANHO_LINHA)
+                    del destino
+                except Exception as e:
+                    logger.warning(f"Geração em lote falhou para {empresa}, gerando um a um: {e}")
+                    geradas = [self.gerar_linha(i) for i in grupo.tolist()]
+                for posicao, linha in zip(posicoes.tolist(), geradas):
+                    linhas[posicao] = linha
+
+        return linhas
+
+class TituloView:
+    """
+    Um título de um `TituloBatch`, com a mesma interface de `Titulo`.
+
+    Não guarda dados: os atributos são lidos das colunas do lote.
+    """
+    __slots__ = ('_batch', '_indice')
+
+    def __init__(self, batch: TituloBatch, indice: int):
+        self._batch = batch
+        self._indice = indice
+
+    @property
+    def batch(self) -> TituloBatch:
+        return self._batch
+
+    @property
+    def indice(self) -> int:
+        """Posição do título no lote."""
+        return self._indice
+
+    @property
+    def valor(self) -> float:
+        return self.valor_centavos / 100
+
+    @property
+    def linha_digitavel(self) -> Optional[str]:
+        return self._batch.linha(self._indice)
+
+    @property
+    def codigo_barras(self) -> Optional[str]:
+        linha = self.linha_digitavel
+        if not linha or linha == ERRO_LINHA_DIGITAVEL:
+            return None
+        return codigo_barras_da_linha(linha)
+
+    def gerar_linha_digitavel(self) -> str:
+        """Gera a linha digitável do título, como `Titulo.gerar_linha_digitavel`."""
+        return self._batch.gerar_linha(self._indice)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte o título para um dicionário, como `Titulo.to_dict`."""
+        if not self.linha_digitavel:
+            self.gerar_linha_digitavel()
+        return {
+            'id': self.id,
+            'empresa': self.empresa,
+            'codigo': self.codigo,
+            'sacado': self.sacado,
+            'bordero': self.bordero,
+            'data_bordero': self.data_bordero.strftime('%d/%m/%Y'),
+            'numero_documento': self.numero_documento,
+            'seu_numero': self.seu_numero,
+            'codigo_dcto': self.codigo_dcto,
+            'tipodcto': self.tipodcto,
+            'vencimento': self.vencimento.strftime('%d/%m/%Y'),
+            'valor': self.valor,
+            'linha_digitavel': self.linha_digitavel,
+            'codigo_barras': self.codigo_barras
+        }
+
+    def __repr__(self) -> str:
+        return f"TituloView(id={self.id}, empresa={self.empresa!r}, seu_numero={self.seu_numero!r})"
+
+def _atributo_coluna(nome: str) -> property:
+    return property(lambda self: self._batch.valor(nome, self._indice))
+
+for _nome in (*_COLUNAS_INTEIRAS, *_COLUNAS_DATAS, *_COLUNAS_CATEGORIAS, *_COLUNAS_TEXTOS):
+    setattr(TituloView, _nome, _atributo_coluna(_nome))
+del _nome
+
+def gerar_linhas_registros(registros: List[Dict[str, Any]]) -> List[str]:
+    """
+    Gera as linhas digitáveis de registros de títulos (como retornados por
+    `get_titulos`), em lote por empresa (ver `TituloBatch.gerar_linhas`).
+    
+    Returns:
+        Linhas digitáveis na ordem dos registros
+    """
+    return TituloBatch.from_registros(registros).gerar_linhas()
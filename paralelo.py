@@ -0,0 +1,191 @@
+"""
+Geração das linhas digitáveis em vários processos, para lotes muito grandes
+(fechamento do mês, toda a carteira das duas empresas).
+
+Os títulos são divididos em blocos e gerados num `ProcessPoolExecutor`. Cada
+processo recebe as configurações de boleto uma única vez, ao iniciar, e cada
+tarefa leva só as colunas necessárias do bloco como arrays numpy (empresa,
+vencimento, valor em centavos e seu número). Os resultados voltam como arrays
+'S54' e são devolvidos na ordem de entrada.
+
+Abaixo de `MINIMO_PARALELO` títulos, a geração é feita no próprio processo,
+por `TituloBatch.gerar_linhas`, pois o custo de iniciar os processos e enviar
+os dados supera o ganho.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from linha_digitavel import BoletoConfig, carregar_configs, gerar_linha_digitavel_tipada, gerar_linhas_digitaveis_batch
+from models import ERRO_LINHA_DIGITAVEL, TituloBatch
+
+logger = logging.getLogger(__name__)
+
+# Títulos por tarefa enviada a um processo
+TAMANHO_BLOCO = 50_000
+# Abaixo disso a geração é feita no próprio processo
+MINIMO_PARALELO = 200_000
+
+_ORDINAL_EPOCH = date(1970, 1, 1).toordinal()
+_NULO = -(2 ** 63)
+_TAMANHO_LINHA = 54
+
+# Configurações recebidas por cada processo ao iniciar (`_iniciar_processo`)
+_configs: Dict[str, BoletoConfig] = {}
+
+def _iniciar_processo(configs: Dict[str, BoletoConfig]) -> None:
+    global _configs
+    _configs = configs
+
+def _gerar_uma(config: BoletoConfig, vencimento: int, centavos: int, seu_numero) -> bytes:
+    """Linha de um título (b'' se os dados forem inválidos)."""
+    try:
+        if isinstance(seu_numero, bytes):
+            seu_numero = seu_numero.decode('utf-8')
+        if not vencimento or centavos == _NULO or seu_numero is None:
+            raise ValueError("vencimento, valor ou seu número ausente")
+        return gerar_linha_digitavel_tipada(
+            config, vencimento=date.fromordinal(vencimento), valor_centavos=centavos,
+            nosso_numero=seu_numero[:8], dac_nosso_numero=seu_numero[8:9]
+        ).encode('utf-8')
+    except Exception as e:
+        logger.error(f"Erro ao gerar linha digitável: {e}")
+        return b''
+
+def gerar_bloco(fidc: np.ndarray, vencimentos: np.ndarray, centavos: np.ndarray, seus_numeros) -> np.ndarray:
+    """
+    Gera as linhas digitáveis de um bloco de títulos, com as configurações do processo.
+
+    Args:
+        fidc: Se cada título é do FIDC (bool); os demais usam a configuração SEC
+        vencimentos: Vencimentos como ordinais de data (0 = ausente)
+        centavos: Valores em centavos (menor int64 = ausente)
+        seus_numeros: Seus números (8 dígitos + DAC), como array 'S9' ou lista de textos
+
+    Returns:
+        Array 'S54' com as linhas na ordem de entrada; b'' nos títulos com dados inválidos
+    """
+    linhas = np.zeros(len(seus_numeros), dtype=f'S{_TAMANHO_LINHA}')
+    configs = _configs or carregar_configs()
+    for empresa, grupo in (('FIDC', fidc), ('SEC', ~fidc)):
+        posicoes = np.flatnonzero(grupo)
+        if not len(posicoes):
+            continue
+        config = configs[empresa]
+        try:
+            if (vencimentos[posicoes] == 0).any() or (centavos[posicoes] == _NULO).any():
+                raise ValueError("vencimento ou valor ausente")
+            if isinstance(seus_numeros, np.ndarray):
+                numeros = seus_numeros[posicoes]
+            else:
+                numeros = [seus_numeros[posicao] for posicao in posicoes.tolist()]
+                if any(numero is None or len(numero) != 9 for numero in numeros):
+                    raise ValueError("seu número inválido")
+            digitos = np.asarray(numeros, dtype='S9').view(np.uint8).reshape(-1, 9)
+            linhas[posicoes] = gerar_linhas_digitaveis_batch(
+                vencimentos=(vencimentos[posicoes] - _ORDINAL_EPOCH).astype('datetime64[D]'),
+                valores_centavos=centavos[posicoes],
+                nossos_numeros=np.ascontiguousarray(digitos[:, :8]).view('S8').ravel(),
+                dacs_nosso_numero=np.ascontiguousarray(digitos[:, 8:]).view('S1').ravel(),
+                config=config
+            )
+        except Exception as e:
+            logger.warning(f"Geração em lote falhou para {empresa}, gerando um a um: {e}")
+            linhas[posicoes] = [_gerar_uma(config, int(vencimentos[posicao]), int(centavos[posicao]),
+                                           seus_numeros[posicao])
+                                for posicao in posicoes.tolist()]
+    return linhas
+
+class GeradorParalelo:
+    """
+    Gera as linhas digitáveis de um `TituloBatch` em vários processos.
+
+    Os processos são criados no primeiro uso e reaproveitados até `fechar`
+    (ou o fim do bloco `with`). Se o pool não puder ser usado (processo
+    interrompido, ambiente sem multiprocessing), a geração continua no
+    próprio processo, com um aviso no log. O cache em disco (`cache_linhas`)
+    é usado só na geração no próprio processo.
+
+    Args:
+        processos (int): Quantidade de processos (padrão: número de CPUs)
+        tamanho_bloco (int): Títulos por tarefa
+        minimo_paralelo (int): Quantidade mínima de títulos para usar os processos
+    """
+
+    def __init__(self, processos: Optional[int] = None, tamanho_bloco: int = TAMANHO_BLOCO,
+                 minimo_paralelo: int = MINIMO_PARALELO):
+        self.processos = processos or os.cpu_count() or 1
+        self.tamanho_bloco = tamanho_bloco
+        self.minimo_paralelo = minimo_paralelo
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'GeradorParalelo':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.fechar()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processos,
+                initializer=_iniciar_processo,
+                initargs=(carregar_configs(),)
+            )
+        return self._executor
+
+    def fechar(self) -> None:
+        """Encerra os processos."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def gerar(self, batch: TituloBatch, indices: Optional[Iterable[int]] = None) -> List[str]:
+        """
+        Gera (e guarda no lote) as linhas digitáveis dos títulos, como `TituloBatch.gerar_linhas`.
+
+        Args:
+            batch (TituloBatch): Lote com os títulos
+            indices: Posições dos títulos no lote (padrão: todos)
+
+        Returns:
+            Linhas digitáveis na ordem dos índices
+        """
+        indices = np.arange(len(batch)) if indices is None else np.asarray(list(indices), dtype=np.int64)
+        if len(indices) < self.minimo_paralelo:
+            return batch.gerar_linhas(indices)
+
+        fidc = batch.coluna('empresa', indices) == 'FIDC'
+        vencimentos = batch.coluna('vencimento', indices)
+        centavos = batch.coluna('valor_centavos', indices)
+        # Seus números vão como array de largura fixa (envio bem mais barato que uma lista de textos)
+        seus_numeros = batch.textos_largura_fixa('seu_numero', indices, 9)
+        if seus_numeros is None:
+            seus_numeros = batch.valores('seu_numero', indices.tolist())
+        blocos = range(0, len(indices), self.tamanho_bloco)
+        try:
+            # map devolve os resultados na ordem dos blocos
+            resultados = list(self._pool().map(
+                gerar_bloco,
+                [fidc[inicio:inicio + self.tamanho_bloco] for inicio in blocos],
+                [vencimentos[inicio:inicio + self.tamanho_bloco] for inicio in blocos],
+                [centavos[inicio:inicio + self.tamanho_bloco] for inicio in blocos],
+                [seus_numeros[inicio:inicio + self.tamanho_bloco] for inicio in blocos],
+            ))
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Geração em paralelo indisponível, gerando no próprio processo: {e}")
+            # O pool pode nem ter sido criado (falha no próprio ProcessPoolExecutor)
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            return batch.gerar_linhas(indices)
+
+        linhas = np.concatenate(resultados)
+        linhas[linhas == b''] = ERRO_LINHA_DIGITAVEL.encode('utf-8')
+        batch.guardar_linhas(indices, linhas)
+        return [linha.decode('utf-8') for linha in linhas.tolist()]
@@ -0,0 +1,457 @@
+"""
+Serviço HTTP local de geração de linhas digitáveis, para outros sistemas.
+
+Rotas:
+    POST /linhas   Corpo: lista JSON de títulos, cada um com "empresa" (FIDC ou
+                   SEC), "seu_numero" (9 dígitos), "vencimento" (yyyy-mm-dd)
+                   e "valor" (número ou texto, em reais). Resposta: lista JSON
+                   com a linha digitável de cada título, na mesma ordem (null
+                   nos títulos cuja linha não pôde ser gerada). Um título
+                   inválido recusa a requisição inteira (400).
+    GET /metrics   Contadores no formato texto do Prometheus.
+
+As requisições que chegam ao mesmo tempo (de várias conexões ou em pipeline
+numa mesma conexão) são agrupadas num único lote do `TituloBatch`, gerado
+numa thread à parte enquanto o laço de eventos continua recebendo. As
+conexões são mantidas abertas (keep-alive) e aceitam requisições em pipeline,
+respondidas na ordem de chegada.
+
+Feito só com asyncio, sem dependências novas; escuta por padrão apenas em
+127.0.0.1.
+
+Uso:
+    python -m servico [--host 127.0.0.1] [--porta 8080] [--lote N] [--espera-ms MS]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from linha_digitavel import EMPRESAS, carregar_configs, fator_vencimento, valor_em_centavos
+from models import ERRO_LINHA_DIGITAVEL, TituloBatch
+
+logger = logging.getLogger(__name__)
+
+# Máximo de títulos num lote de geração e espera por mais requisições antes de gerar
+TAMANHO_LOTE = 20_000
+ESPERA_LOTE = 0.002
+# Limites de uma requisição e da conexão
+TAMANHO_MAXIMO_CORPO = 16 * 2 ** 20
+TAMANHO_MAXIMO_CABECALHO = 64 * 2 ** 10
+TEMPO_OCIOSO = 30
+PIPELINE_MAXIMO = 32
+# Limites (segundos) das faixas do histograma de duração das requisições
+FAIXAS_DURACAO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+_MOTIVOS = {
+    100: "Continue", 200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+    500: "Internal Server Error", 501: "Not Implemented",
+}
+
+class ErroHttp(Exception):
+    """
+    Requisição recusada com o status HTTP informado. Nos erros de leitura da
+    requisição (cabeçalho, tamanho do corpo) a conexão é fechada em seguida.
+    """
+
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+def converter_titulo(dado: Any, indice: int) -> Dict[str, Any]:
+    """
+    Registro de título (como lido do banco) a partir de um título do JSON.
+
+    Raises:
+        ErroHttp: 400, se o título não tiver os campos necessários ou se o seu
+            número, o vencimento ou o valor não couberem no boleto. Um título
+            inválido levaria o lote inteiro da empresa para a geração um a um.
+    """
+    if not isinstance(dado, dict):
+        raise ErroHttp(400, f"título {indice}: esperado um objeto")
+    empresa, seu_numero = dado.get('empresa'), dado.get('seu_numero')
+    if empresa not in EMPRESAS:
+        raise ErroHttp(400, f"título {indice}: empresa deve ser {' ou '.join(EMPRESAS)}")
+    if not (isinstance(seu_numero, str) and len(seu_numero) == 9 and seu_numero.isascii()
+            and seu_numero.isdigit()):
+        raise ErroHttp(400, f"título {indice}: seu_numero deve ter 9 dígitos (Nosso Número e DAC)")
+    try:
+        vencimento = date.fromisoformat(dado.get('vencimento'))
+    except (TypeError, ValueError):
+        raise ErroHttp(400, f"título {indice}: vencimento deve estar no formato yyyy-mm-dd")
+    if not 1000 <= int(fator_vencimento(vencimento)) <= 9999:
+        raise ErroHttp(400, f"título {indice}: vencimento fora da faixa do fator de vencimento")
+    valor = dado.get('valor')
+    try:
+        if isinstance(valor, bool) or not isinstance(valor, (int, float, str)):
+            raise ValueError
+        centavos = valor_em_centavos(valor)
+    except (ValueError, ArithmeticError):
+        raise ErroHttp(400, f"título {indice}: valor inválido")
+    if not 0 <= centavos < 10 ** 10:
+        raise ErroHttp(400, f"título {indice}: valor fora da faixa de 0 a 99.999.999,99")
+    return {
+        'id': indice, 'empresa': empresa, 'codigo': None, 'sacado': None, 'bordero': None,
+        'data_bordero': None, 'numero_documento': None, 'seu_numero': seu_numero,
+        'codigo_dcto': None, 'tipodcto': None, 'vencimento': vencimento, 'valor': valor,
+    }
+
+def gerar_linhas(registros: List[Dict[str, Any]]) -> List[Optional[str]]:
+    """Linhas dos registros num único lote; None onde a geração falhou."""
+    linhas = TituloBatch.from_registros(registros).gerar_linhas()
+    return [None if linha == ERRO_LINHA_DIGITAVEL else linha for linha in linhas]
+
+class Metricas:
+    """Contadores do serviço, expostos em /metrics."""
+
+    def __init__(self):
+        self.requisicoes: Dict[Tuple[str, int], int] = {}
+        self.duracoes = [0] * (len(FAIXAS_DURACAO) + 1)
+        self.duracao_total = 0.0
+        self.titulos = 0
+        self.linhas_com_erro = 0
+        self.lotes = 0
+        self.titulos_em_lotes = 0
+        self.requisicoes_em_lotes = 0
+        self.conexoes_abertas = 0
+        self.conexoes_total = 0
+
+    def registrar_requisicao(self, rota: str, status: int, duracao: float) -> None:
+        chave = (rota, status)
+        self.requisicoes[chave] = self.requisicoes.get(chave, 0) + 1
+        faixa = next((i for i, limite in enumerate(FAIXAS_DURACAO) if duracao <= limite), len(FAIXAS_DURACAO))
+        self.duracoes[faixa] += 1
+        self.duracao_total += duracao
+
+    def registrar_lote(self, requisicoes: int, titulos: int) -> None:
+        self.lotes += 1
+        self.requisicoes_em_lotes += requisicoes
+        self.titulos_em_lotes += titulos
+
+    def texto(self) -> str:
+        """Métricas no formato texto do Prometheus."""
+        linhas = ["# TYPE linhas_requisicoes_total counter"]
+        for (rota, status), quantidade in sorted(self.requisicoes.items()):
+            linhas.append(f'linhas_requisicoes_total{{rota="{rota}",status="{status}"}} {quantidade}')
+        linhas.append("# TYPE linhas_requisicao_segundos histogram")
+        acumulado = 0
+        for limite, quantidade in zip((*FAIXAS_DURACAO, '+Inf'), self.duracoes):
+            acumulado += quantidade
+            linhas.append(f'linhas_requisicao_segundos_bucket{{le="{limite}"}} {acumulado}')
+        linhas += [
+            f"linhas_requisicao_segundos_sum {self.duracao_total:.6f}",
+            f"linhas_requisicao_segundos_count {acumulado}",
+            "# TYPE linhas_titulos_total counter",
+            f"linhas_titulos_total {self.titulos}",
+            "# TYPE linhas_erros_geracao_total counter",
+            f"linhas_erros_geracao_total {self.linhas_com_erro}",
+            "# TYPE linhas_lotes_total counter",
+            f"linhas_lotes_total {self.lotes}",
+            "# TYPE linhas_lote_requisicoes_total counter",
+            f"linhas_lote_requisicoes_total {self.requisicoes_em_lotes}",
+            "# TYPE linhas_lote_titulos_total counter",
+            f"linhas_lote_titulos_total {self.titulos_em_lotes}",
+            "# TYPE linhas_conexoes_abertas gauge",
+            f"linhas_conexoes_abertas {self.conexoes_abertas}",
+            "# TYPE linhas_conexoes_total counter",
+            f"linhas_conexoes_total {self.conexoes_total}",
+        ]
+        return "\n".join(linhas) + "\n"
+
+class LoteadorLinhas:
+    """
+    Agrupa as requisições de geração que chegam ao mesmo tempo num único lote.
+
+    Cada requisição espera sua parte do resultado (`gerar`). O lote é gerado
+    quando passa de `tamanho_maximo` títulos ou `espera` segundos depois da
+    primeira requisição pendente; enquanto um lote é gerado (numa thread), as
+    novas requisições se acumulam para o próximo.
+    """
+
+    def __init__(self, metricas: Metricas, tamanho_maximo: int = TAMANHO_LOTE, espera: float = ESPERA_LOTE):
+        self.metricas = metricas
+        self.tamanho_maximo = tamanho_maximo
+        self.espera = espera
+        self._pendentes: Deque[Tuple[List[Dict[str, Any]], asyncio.Future]] = deque()
+        self._quantidade = 0
+        self._acordar = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gerar-linhas')
+        self._tarefa = asyncio.get_running_loop().create_task(self._executar())
+
+    async def gerar(self, registros: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Linhas dos registros, geradas no próximo lote."""
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendentes.append((registros, futuro))
+        self._quantidade += len(registros)
+        self._acordar.set()
+        return await futuro
+
+    def _retirar_lote(self) -> List[Tuple[List[Dict[str, Any]], asyncio.Future]]:
+        # Pelo menos uma requisição, e depois outras enquanto couberem no lote
+        lote, titulos = [], 0
+        while self._pendentes and (not lote or titulos + len(self._pendentes[0][0]) <= self.tamanho_maximo):
+            registros, futuro = self._pendentes.popleft()
+            self._quantidade -= len(registros)
+            if not futuro.done():  # Requisições de conexões já fechadas são descartadas
+                lote.append((registros, futuro))
+                titulos += len(registros)
+        if not self._pendentes:
+            self._acordar.clear()
+        return lote
+
+    async def _executar(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._acordar.wait()
+            if self._quantidade < self.tamanho_maximo:
+                await asyncio.sleep(self.espera)
+            lote = self._retirar_lote()
+            if not lote:
+                continue
+            registros = [registro for parte, _ in lote for registro in parte]
+            self.metricas.registrar_lote(len(lote), len(registros))
+            try:
+                linhas = await loop.run_in_executor(self._executor, gerar_linhas, registros)
+            except Exception as e:
+                logger.error(f"Erro ao gerar lote de {len(registros)} título(s): {e}")
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+            inicio = 0
+            for parte, futuro in lote:
+                if not futuro.done():
+                    futuro.set_result(linhas[inicio:inicio + len(parte)])
+                inicio += len(parte)
+
+    async def fechar(self) -> None:
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+        self._executor.shutdown(wait=False)
+
+class _Requisicao:
+    __slots__ = ('metodo', 'caminho', 'cabecalhos', 'corpo', 'manter_conexao', 'inicio')
+
+    def __init__(self, metodo, caminho, cabecalhos, corpo, manter_conexao, inicio):
+        self.metodo = metodo
+        self.caminho = caminho
+        self.cabecalhos = cabecalhos
+        self.corpo = corpo
+        self.manter_conexao = manter_conexao
+        self.inicio = inicio
+
+def _resposta(status: int, corpo: bytes, tipo: str, manter_conexao: bool, extras: str = "") -> bytes:
+    return (f"HTTP/1.1 {status} {_MOTIVOS.get(status, '')}\r\n"
+            f"Content-Type: {tipo}\r\n"
+            f"Content-Length: {len(corpo)}\r\n"
+            f"Connection: {'keep-alive' if manter_conexao else 'close'}\r\n"
+            f"{extras}\r\n").encode('latin-1') + corpo
+
+def _resposta_json(status: int, dados: Any, manter_conexao: bool, extras: str = "") -> bytes:
+    corpo = json.dumps(dados, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return _resposta(status, corpo, "application/json; charset=utf-8", manter_conexao, extras)
+
+def _pronta(resposta: bytes) -> asyncio.Future:
+    """Resposta já pronta, para a fila de respostas da conexão."""
+    futuro = asyncio.get_running_loop().create_future()
+    futuro.set_result(resposta)
+    return futuro
+
+class ServicoLinhas:
+    """Conexões HTTP/1.1 do serviço (keep-alive e pipeline), com as rotas /linhas e /metrics."""
+
+    def __init__(self, tamanho_lote: int = TAMANHO_LOTE, espera_lote: float = ESPERA_LOTE):
+        self.metricas = Metricas()
+        self.tamanho_lote = tamanho_lote
+        self.espera_lote = espera_lote
+        self.loteador: Optional[LoteadorLinhas] = None
+
+    async def iniciar(self, host: str, porta: int) -> asyncio.AbstractServer:
+        """Abre o servidor (o loteador é criado no laço de eventos em execução)."""
+        self.loteador = LoteadorLinhas(self.metricas, self.tamanho_lote, self.espera_lote)
+        return await asyncio.start_server(self.tratar_conexao, host, porta, limit=TAMANHO_MAXIMO_CABECALHO)
+
+    async def fechar(self) -> None:
+        if self.loteador is not None:
+            await self.loteador.fechar()
+
+    async def _ler_requisicao(self, reader: asyncio.StreamReader,
+                              respostas: asyncio.Queue) -> Optional[_Requisicao]:
+        """
+        Próxima requisição da conexão, ou None se o cliente fechou ou ficou ocioso.
+
+        O "100 Continue" vai pela fila de respostas, depois das respostas às
+        requisições anteriores do pipeline.
+        """
+        try:
+            cabecalho = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), TEMPO_OCIOSO)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise ErroHttp(431, "cabeçalho muito grande")
+        inicio = time.perf_counter()
+
+        linhas = cabecalho.decode('latin-1').split('\r\n')
+        try:
+            metodo, caminho, versao = linhas[0].split(' ')
+        except ValueError:
+            raise ErroHttp(400, "linha de requisição inválida")
+        cabecalhos = {}
+        for linha in linhas[1:]:
+            if linha:
+                nome, _, valor = linha.partition(':')
+                cabecalhos[nome.strip().lower()] = valor.strip()
+
+        conexao = cabecalhos.get('connection', '').lower()
+        manter_conexao = conexao != 'close' if versao == 'HTTP/1.1' else conexao == 'keep-alive'
+        if 'transfer-encoding' in cabecalhos:
+            raise ErroHttp(501, "Transfer-Encoding não suportado; envie Content-Length")
+        try:
+            tamanho = int(cabecalhos.get('content-length', '0'))
+        except ValueError:
+            raise ErroHttp(400, "Content-Length inválido")
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            raise ErroHttp(413, f"corpo maior que {TAMANHO_MAXIMO_CORPO} bytes")
+        if tamanho and cabecalhos.get('expect', '').lower() == '100-continue':
+            await respostas.put((_pronta(b"HTTP/1.1 100 Continue\r\n\r\n"), True))
+        try:
+            corpo = await reader.readexactly(tamanho) if tamanho else b''
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        return _Requisicao(metodo, caminho.split('?', 1)[0], cabecalhos, corpo, manter_conexao, inicio)
+
+    async def _responder(self, requisicao: _Requisicao) -> bytes:
+        manter = requisicao.manter_conexao
+        rota = requisicao.caminho if requisicao.caminho in ('/linhas', '/metrics') else 'outra'
+        try:
+            if requisicao.caminho == '/linhas':
+                if requisicao.metodo != 'POST':
+                    raise ErroHttp(405, "use POST")
+                if 'content-length' not in requisicao.cabecalhos:
+                    raise ErroHttp(411, "Content-Length obrigatório")
+                try:
+                    dados = json.loads(requisicao.corpo)
+                except ValueError as e:
+                    raise ErroHttp(400, f"JSON inválido: {e}")
+                if not isinstance(dados, list):
+                    raise ErroHttp(400, "esperada uma lista de títulos")
+                registros = [converter_titulo(dado, indice) for indice, dado in enumerate(dados)]
+                linhas = await self.loteador.gerar(registros) if registros else []
+                self.metricas.titulos += len(linhas)
+                self.metricas.linhas_com_erro += sum(linha is None for linha in linhas)
+                status, resposta = 200, _resposta_json(200, linhas, manter)
+            elif requisicao.caminho == '/metrics':
+                if requisicao.metodo != 'GET':
+                    raise ErroHttp(405, "use GET")
+                status, resposta = 200, _resposta(200, self.metricas.texto().encode('utf-8'),
+                                                  "text/plain; version=0.0.4; charset=utf-8", manter)
+            else:
+                raise ErroHttp(404, f"rota desconhecida: {requisicao.caminho}")
+        except ErroHttp as e:
+            extras = f"Allow: {'POST' if rota == '/linhas' else 'GET'}\r\n" if e.status == 405 else ""
+            status, resposta = e.status, _resposta_json(e.status, {'erro': str(e)}, manter, extras)
+        except Exception as e:
+            logger.error(f"Erro ao responder {requisicao.metodo} {requisicao.caminho}: {e}")
+            status, resposta = 500, _resposta_json(500, {'erro': "erro interno"}, manter)
+        self.metricas.registrar_requisicao(rota, status, time.perf_counter() - requisicao.inicio)
+        return resposta
+
+    async def _escrever_respostas(self, writer: asyncio.StreamWriter, respostas: asyncio.Queue) -> None:
+        # Respostas na ordem das requisições, mesmo que as seguintes fiquem prontas antes
+        try:
+            while True:
+                item = await respostas.get()
+                if item is None:
+                    return
+                tarefa, manter_conexao = item
+                writer.write(await tarefa)
+                await writer.drain()
+                if not manter_conexao:
+                    return
+        finally:
+            # Libera a leitura, se estiver esperando espaço na fila
+            while not respostas.empty():
+                respostas.get_nowait()
+
+    async def tratar_conexao(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Lê as requisições da conexão e as responde, em pipeline, até o cliente fechar."""
+        self.metricas.conexoes_abertas += 1
+        self.metricas.conexoes_total += 1
+        respostas: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_MAXIMO)
+        escritor = asyncio.create_task(self._escrever_respostas(writer, respostas))
+        # Respostas ainda em preparo (as concluídas saem do conjunto)
+        pendentes = set()
+        try:
+            while not escritor.done():
+                try:
+                    requisicao = await self._ler_requisicao(reader, respostas)
+                except ErroHttp as e:
+                    await respostas.put((_pronta(_resposta_json(e.status, {'erro': str(e)}, False)), False))
+                    break
+                if requisicao is None:
+                    break
+                tarefa = asyncio.create_task(self._responder(requisicao))
+                pendentes.add(tarefa)
+                tarefa.add_done_callback(pendentes.discard)
+                await respostas.put((tarefa, requisicao.manter_conexao))
+                if not requisicao.manter_conexao:
+                    break
+            if not escritor.done():
+                await respostas.put(None)
+            await escritor
+        except ConnectionError:
+            pass
+        finally:
+            escritor.cancel()
+            for tarefa in list(pendentes):
+                tarefa.cancel()
+            self.metricas.conexoes_abertas -= 1
+            writer.close()
+
+async def servir(host: str, porta: int, tamanho_lote: int = TAMANHO_LOTE, espera_lote: float = ESPERA_LOTE) -> None:
+    """Executa o serviço até ser interrompido."""
+    servico = ServicoLinhas(tamanho_lote, espera_lote)
+    servidor = await servico.iniciar(host, porta)
+    enderecos = ", ".join(f"http://{socket.getsockname()[0]}:{socket.getsockname()[1]}"
+                          for socket in servidor.sockets)
+    logger.info(f"Serviço de linhas digitáveis em {enderecos}")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await servico.fechar()
+
+def main(argv=None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=os.getenv('SERVICO_HOST', '127.0.0.1'))
+    parser.add_argument('--porta', type=int, default=int(os.getenv('SERVICO_PORTA', '8080')))
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="Máximo de títulos por lote de geração")
+    parser.add_argument('--espera-ms', type=float, default=ESPERA_LOTE * 1000,
+                        help="Espera por mais requisições antes de gerar um lote")
+    args = parser.parse_args(argv)
+    try:
+        carregar_configs()
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+    try:
+        asyncio.run(servir(args.host, args.porta, args.lote, args.espera_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
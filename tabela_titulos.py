@@ -0,0 +1,227 @@
+from array import array
+from typing import Iterator, List, Optional
+
+import numpy as np
+from PyQt5.QtCore import QAbstractListModel, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+
+from models import TituloBatch, TituloView
+
+def _data_br(data):
+    return data.strftime("%d/%m/%Y")
+
+def _valor_br(centavos):
+    return f"{centavos // 100},{centavos % 100:02d}"
+
+# Colunas da tabela: (título, coluna do TituloBatch, formatação para exibição)
+COLUNAS = [
+    ("Empresa", 'empresa', str),
+    ("Código", 'codigo', str),
+    ("Sacado", 'sacado', str),
+    ("Bordero", 'bordero', str),
+    ("Data Bordero", 'data_bordero', _data_br),
+    ("Núm. Documento", 'numero_documento', str),
+    ("Seu Número", 'seu_numero', str),
+    ("Cód. Documento", 'codigo_dcto', str),
+    ("Tipo Documento", 'tipodcto', str),
+    ("Vencimento", 'vencimento', _data_br),
+    ("Valor", 'valor_centavos', _valor_br),
+    ("Linha Digitável", 'linha_digitavel', str),
+]
+COLUNA_LINHA = len(COLUNAS) - 1
+_COLUNAS_NUMERICAS = {1, 2, 3, 10}
+
+class TitulosTableModel(QAbstractTableModel):
+    """
+    Modelo da tabela de títulos.
+
+    Os títulos ficam num `TituloBatch` (por coluna); o texto de cada célula é
+    formatado em `data()`, chamado pela view só para as linhas visíveis. A
+    linha digitável é gerada na primeira vez que sua célula é exibida.
+
+    O papel `Qt.UserRole` devolve o valor bruto (datas, números; o valor em
+    centavos). A ordenação é feita aqui, sobre as colunas do lote com NumPy
+    (`sort`), o que é muito mais rápido que comparar pares de células pelo proxy.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.batch = TituloBatch()
+        self._ordem: Optional[array] = None  # Posição no lote de cada linha; None = ordem do lote
+        self._textos_filtro: List[str] = []  # Por posição no lote, calculados no primeiro uso do filtro
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.batch)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUNAS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUNAS[section][0]
+        return super().headerData(section, orientation, role)
+
+    def _indice(self, row: int) -> int:
+        return row if self._ordem is None else self._ordem[row]
+
+    def _valor(self, column: int, indice: int):
+        if column == COLUNA_LINHA:
+            return self.batch.linha(indice) or self.batch.gerar_linha(indice)
+        return self.batch.valor(COLUNAS[column][1], indice)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            bruto = self._valor(index.column(), self._indice(index.row()))
+            return "" if bruto is None else COLUNAS[index.column()][2](bruto)
+        if role == Qt.UserRole:
+            return self._valor(index.column(), self._indice(index.row()))
+        if role == Qt.TextAlignmentRole and index.column() in _COLUNAS_NUMERICAS:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def titulo(self, row: int) -> TituloView:
+        return self.batch[self._indice(row)]
+
+    def titulos(self) -> Iterator[TituloView]:
+        """Títulos na ordem exibida."""
+        return (self.titulo(row) for row in range(len(self.batch)))
+
+    def indices(self) -> List[int]:
+        """Posições no lote dos títulos, na ordem exibida."""
+        return list(range(len(self.batch))) if self._ordem is None else self._ordem.tolist()
+
+    def texto_filtro(self, row: int) -> str:
+        """Texto das colunas (exceto a linha digitável) em minúsculas, para o filtro."""
+        if len(self._textos_filtro) < len(self.batch):
+            self._montar_textos_filtro()
+        return self._textos_filtro[self._indice(row)]
+
+    def _montar_textos_filtro(self) -> None:
+        # Formata coluna a coluna os títulos que ainda não têm texto, repetindo
+        # a formatação só uma vez por valor nas colunas com poucos valores distintos
+        inicio = len(self._textos_filtro)
+        colunas = []
+        for _, nome, formatar in COLUNAS[:COLUNA_LINHA]:
+            formatados = {None: ""}
+            colunas.append([formatados[valor] if valor in formatados
+                            else formatados.setdefault(valor, formatar(valor))
+                            for valor in self.batch.valores(nome)[inicio:]])
+        self._textos_filtro.extend(" ".join(partes).casefold() for partes in zip(*colunas))
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Ordena os títulos pela coluna, mantendo a seleção nas mesmas linhas."""
+        if not len(self.batch) or not 0 <= column < len(COLUNAS):
+            return
+        atual = np.arange(len(self.batch)) if self._ordem is None else np.array(self._ordem, dtype=np.int64)
+        chave = self.batch.chave_ordenacao(COLUNAS[column][1])[atual]
+        if order == Qt.DescendingOrder:
+            # Ordem estável também na descendente: empates mantêm a ordem atual
+            ordem = len(chave) - 1 - np.argsort(chave[::-1], kind='stable')[::-1]
+        else:
+            ordem = np.argsort(chave, kind='stable')
+
+        self.layoutAboutToBeChanged.emit()
+        nova_posicao = np.empty_like(ordem)
+        nova_posicao[ordem] = np.arange(len(ordem))
+        self._ordem = array('q', atual[ordem].tobytes())
+        antigos = self.persistentIndexList()
+        self.changePersistentIndexList(
+            antigos, [self.index(int(nova_posicao[index.row()]), index.column()) for index in antigos])
+        self.layoutChanged.emit()
+
+    def adicionar(self, lote: TituloBatch) -> None:
+        """Acrescenta os títulos de um lote ao fim da tabela."""
+        if not len(lote):
+            return
+        inicio = len(self.batch)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(lote) - 1)
+        self.batch.estender(lote)
+        if self._ordem is not None:
+            self._ordem.extend(range(inicio, len(self.batch)))
+        self.endInsertRows()
+
+    def limpar(self) -> None:
+        """Remove todos os títulos."""
+        self.beginResetModel()
+        self.batch = TituloBatch()
+        self._ordem = None
+        self._textos_filtro = []
+        self.endResetModel()
+
+    def linhas_atualizadas(self) -> None:
+        """Avisa a view de que linhas digitáveis foram geradas fora do modelo."""
+        if len(self.batch):
+            self.dataChanged.emit(self.index(0, COLUNA_LINHA),
+                                  self.index(len(self.batch) - 1, COLUNA_LINHA))
+
+class TitulosFilterProxyModel(QSortFilterProxyModel):
+    """
+    Filtro por texto e ordenação da tabela de títulos.
+
+    O filtro procura o texto em todas as colunas, exceto a linha digitável,
+    para não gerar as linhas de todos os títulos a cada letra digitada. A
+    ordenação pedida pela view é repassada ao modelo (`TitulosTableModel.sort`);
+    o proxy mantém a ordem do modelo.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._termo = ""
+        # O filtro é refeito só em `definir_filtro`: as alterações de dados (linhas
+        # digitáveis geradas) não mudam o resultado e não reavaliam as linhas
+        self.setDynamicSortFilter(False)
+
+    def definir_filtro(self, texto: str) -> None:
+        self._termo = texto.strip().casefold()
+        self.invalidate()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._termo:
+            return True
+        return self._termo in self.sourceModel().texto_filtro(source_row)
+
+    def linhas_origem(self, rows: List[int]) -> List[int]:
+        """Linhas do modelo correspondentes a linhas do proxy."""
+        if not self._termo:
+            # Sem filtro, o proxy mantém a ordem e as linhas do modelo
+            return list(rows)
+        return [self.mapToSource(self.index(row, 0)).row() for row in rows]
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+class LinhasGeradasModel(QAbstractListModel):
+    """
+    Lista das linhas digitáveis geradas, exibida num QListView.
+
+    As linhas chegam em blocos (`adicionar`) enquanto a geração roda em
+    segundo plano; cada bloco é uma única inserção no modelo.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.linhas: List[str] = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.linhas)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            return self.linhas[index.row()]
+        return None
+
+    def adicionar(self, linhas: List[str]) -> None:
+        """Acrescenta um bloco de linhas ao fim da lista."""
+        if not linhas:
+            return
+        inicio = len(self.linhas)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(linhas) - 1)
+        self.linhas.extend(linhas)
+        self.endInsertRows()
+
+    def limpar(self) -> None:
+        """Remove todas as linhas."""
+        self.beginResetModel()
+        self.linhas = []
+        self.endResetModel()
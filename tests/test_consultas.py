@@ -0,0 +1,118 @@
+"""
+Testes do SQL emitido por `ConsultaTitulos` (sem acesso ao banco).
+
+Uso:
+    python -m unittest discover tests
+"""
+import itertools
+import re
+import unittest
+from datetime import date
+
+from backends import Dialeto, DialetoSqlite
+from consultas import RAMOS, ConsultaTitulos
+
+def _where(query):
+    """Trecho WHERE de cada ramo da consulta."""
+    return [parte.split("\nWHERE ", 1)[1] for parte in query.split(" UNION ALL ")]
+
+class IntervalosTest(unittest.TestCase):
+
+    def test_vencimento_semiaberto_com_dia_seguinte(self):
+        consulta = ConsultaTitulos(data_vencimento_inicial='2025-01-01', data_vencimento_final='2025-01-31',
+                                   empresa='FIDC')
+        query, params = consulta.montar()
+        where, = _where(query)
+        self.assertIn("fidc.[data] >= ?\nAND fidc.[data] < ?", where)
+        self.assertEqual(params, (date(2025, 1, 1), date(2025, 2, 1)))
+
+    def test_bordero_semiaberto_com_dia_seguinte(self):
+        consulta = ConsultaTitulos(data_bordero_inicial=date(2024, 12, 1), data_bordero_final=date(2024, 12, 31),
+                                   empresa='SEC')
+        query, params = consulta.montar()
+        where, = _where(query)
+        self.assertIn("f.dtbordero >= ?\nAND f.dtbordero < ?", where)
+        self.assertEqual(params, (date(2024, 12, 1), date(2025, 1, 1)))
+
+    def test_sem_between_nem_limite_fechado(self):
+        consulta = ConsultaTitulos(data_bordero_inicial='2025-03-01', data_bordero_final='2025-03-31',
+                                   data_vencimento_inicial='2025-04-01', data_vencimento_final='2025-04-30')
+        for where in _where(consulta.montar()[0]):
+            self.assertNotIn("BETWEEN", where.upper())
+            self.assertNotIn("<=", where)
+
+    def test_intervalo_incompleto_nao_filtra(self):
+        consulta = ConsultaTitulos(data_vencimento_inicial='2025-01-01', data_bordero_final='2025-01-31')
+        query, params = consulta.montar()
+        for where in _where(query):
+            self.assertNotIn("dtbordero", where)
+            self.assertNotIn(">= ?", where)
+        self.assertEqual(params, ())
+
+class ColunasFiltradasTest(unittest.TestCase):
+
+    def test_sem_cast_ou_convert_no_where(self):
+        for dialeto in (Dialeto(), DialetoSqlite()):
+            consulta = ConsultaTitulos(codigo_pessoa=7, tipo_pessoa='Cedente', bordero=12,
+                                       data_bordero_inicial='2025-01-01', data_bordero_final='2025-01-31',
+                                       data_vencimento_inicial='2025-02-01', data_vencimento_final='2025-02-28',
+                                       dialeto=dialeto)
+            for where in _where(consulta.montar()[0]):
+                self.assertIsNone(re.search(r"\b(CAST|CONVERT|DATE)\s*\(", where, re.IGNORECASE), where)
+
+    def test_coluna_de_vencimento_por_ramo(self):
+        consulta = ConsultaTitulos(data_vencimento_inicial='2025-01-01', data_vencimento_final='2025-01-31')
+        where_fidc, = _where(consulta.montar_ramo(RAMOS['FIDC'])[0])
+        where_sec, = _where(consulta.montar_ramo(RAMOS['SEC'])[0])
+        self.assertIn("fidc.[data] >= ?", where_fidc)
+        self.assertIn("fidc.[data] < ?", where_fidc)
+        self.assertNotIn("vcto_", where_fidc)
+        self.assertIn("sec.vcto_ >= ?", where_sec)
+        self.assertIn("sec.vcto_ < ?", where_sec)
+        self.assertNotIn("[data]", where_sec)
+
+    def test_ramos_por_empresa(self):
+        self.assertEqual([r.empresa for r in ConsultaTitulos().ramos], ['FIDC', 'SEC'])
+        self.assertEqual([r.empresa for r in ConsultaTitulos(empresa='SEC').ramos], ['SEC'])
+        self.assertNotIn("UNION ALL", ConsultaTitulos(empresa='FIDC').montar()[0])
+        self.assertEqual(ConsultaTitulos().montar()[0].count("UNION ALL"), 1)
+
+class ParametrosTest(unittest.TestCase):
+
+    def test_pessoa_por_tipo(self):
+        cedente, params_cedente = ConsultaTitulos(codigo_pessoa=5, tipo_pessoa='Cedente', empresa='FIDC').montar()
+        sacado, params_sacado = ConsultaTitulos(codigo_pessoa=5, tipo_pessoa='Sacado', empresa='FIDC').montar()
+        self.assertIn("f.clifor = ?", cedente)
+        self.assertNotIn("f.sacado = ?", cedente)
+        self.assertIn("f.sacado = ?", sacado)
+        self.assertNotIn("f.clifor = ?", sacado)
+        self.assertEqual(params_cedente, (5,))
+        self.assertEqual(params_sacado, (5,))
+
+    def test_ordem_em_cada_combinacao_de_filtros(self):
+        bordero_inicial, bordero_final = date(2025, 1, 1), date(2025, 1, 31)
+        vencimento_inicial, vencimento_final = date(2025, 2, 1), date(2025, 2, 28)
+        for pessoa, bordero, datas_bordero, datas_vencimento, empresa in itertools.product(
+                (False, True), (False, True), (False, True), (False, True), (None, 'FIDC', 'SEC')):
+            consulta = ConsultaTitulos(
+                codigo_pessoa=42 if pessoa else None, tipo_pessoa='Sacado',
+                bordero=99 if bordero else None,
+                data_bordero_inicial=bordero_inicial if datas_bordero else None,
+                data_bordero_final=bordero_final if datas_bordero else None,
+                data_vencimento_inicial=vencimento_inicial if datas_vencimento else None,
+                data_vencimento_final=vencimento_final if datas_vencimento else None,
+                empresa=empresa)
+            # Pessoa, bordero, data do bordero e vencimento, repetidos em cada ramo
+            esperados = ((42,) if pessoa else ()) + ((99,) if bordero else ()) \
+                + ((bordero_inicial, date(2025, 2, 1)) if datas_bordero else ()) \
+                + ((vencimento_inicial, date(2025, 3, 1)) if datas_vencimento else ())
+            query, params = consulta.montar()
+            with self.subTest(pessoa=pessoa, bordero=bordero, datas_bordero=datas_bordero,
+                              datas_vencimento=datas_vencimento, empresa=empresa):
+                self.assertEqual(params, esperados * len(consulta.ramos))
+                self.assertEqual(query.count("?"), len(params))
+                for ramo in consulta.ramos:
+                    self.assertEqual(consulta.montar_ramo(ramo)[1], esperados)
+
+if __name__ == "__main__":
+    unittest.main()
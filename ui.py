@@ -1,41 +1,111 @@
 import sys
 import os
+import threading
 from datetime import datetime, date, timedelta
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QLabel, QLineEdit, QComboBox, QListWidget, QListWidgetItem, QGroupBox, 
-    QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, 
+    QPushButton, QTableView, QListView, QAbstractItemView, QHeaderView, 
     QDateEdit, QMessageBox, QFileDialog, QCheckBox, QProgressBar,
     QRadioButton, QButtonGroup
 )
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread, QDate
 from PyQt5.QtGui import QFont, QIcon
 
-import pandas as pd
 from dotenv import load_dotenv
 
-from db import db_connection
-from models import Pessoa, Titulo
+from db import Cancelamento, db_connection
+from exportacao import ExportacaoCancelada, exportar, formatos_disponiveis
+from indice_pessoas import IndicePessoas
+from models import Pessoa, TituloBatch
+from tabela_titulos import LinhasGeradasModel, TitulosFilterProxyModel, TitulosTableModel
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
-class BuscaThread(QThread):
-    """Thread para realizar buscas assíncronas no banco de dados."""
-    finished = pyqtSignal(list)
+class BuscaPessoasThread(QThread):
+    """
+    Thread única, de vida longa, que faz as buscas de pessoas da digitação.
     
-    def __init__(self, search_term, tipo):
+    Cada pedido (`buscar`) recebe uma geração nova e substitui o pedido ainda
+    não iniciado; a consulta em andamento, se houver, é cancelada no banco.
+    Só o resultado do pedido mais recente é emitido em `resultado`, com a
+    geração do pedido, que a interface confere com `geracao` ao recebê-lo.
+    """
+    resultado = pyqtSignal(int, list)
+    
+    def __init__(self):
         super().__init__()
-        self.search_term = search_term
-        self.tipo = tipo
-        
+        self._condicao = threading.Condition()
+        self._geracao = 0
+        self._pedido = None           # (geração, termo, tipo) ainda não iniciado
+        self._cancelamento = None     # Cancelamento da consulta em andamento
+        self._parar = False
+    
+    @property
+    def geracao(self):
+        """Geração do pedido mais recente."""
+        return self._geracao
+    
+    def buscar(self, search_term, tipo):
+        """Pede uma busca, descartando as anteriores."""
+        with self._condicao:
+            self._geracao += 1
+            self._pedido = (self._geracao, search_term, tipo)
+            self._cancelar_em_andamento()
+            self._condicao.notify()
+    
+    def cancelar(self):
+        """Descarta os pedidos pendentes e a busca em andamento."""
+        with self._condicao:
+            self._geracao += 1
+            self._pedido = None
+            self._cancelar_em_andamento()
+    
+    def parar(self):
+        """Encerra a thread (ao fechar a aplicação)."""
+        with self._condicao:
+            self._parar = True
+            self._pedido = None
+            self._cancelar_em_andamento()
+            self._condicao.notify()
+        self.wait()
+    
+    def _cancelar_em_andamento(self):
+        if self._cancelamento is not None:
+            self._cancelamento.cancelar()
+    
     def run(self):
-        resultados = db_connection.search_pessoas(self.search_term, self.tipo)
-        self.finished.emit(resultados)
+        while True:
+            with self._condicao:
+                while self._pedido is None and not self._parar:
+                    self._condicao.wait()
+                if self._parar:
+                    return
+                geracao, search_term, tipo = self._pedido
+                self._pedido = None
+                self._cancelamento = cancelamento = Cancelamento()
+            
+            resultados = db_connection.search_pessoas(search_term, tipo, cancelamento)
+            
+            with self._condicao:
+                self._cancelamento = None
+                # Emite apenas se nenhum pedido mais novo chegou durante a busca
+                if geracao == self._geracao and not cancelamento.cancelado:
+                    self.resultado.emit(geracao, resultados)
 
 class TitulosThread(QThread):
-    """Thread para buscar títulos assíncronos no banco de dados."""
-    finished = pyqtSignal(list)
+    """
+    Thread para buscar títulos assíncronos no banco de dados.
+    
+    Os títulos são emitidos em lotes (`lote`) à medida que chegam; sem filtro
+    de empresa, FIDC e SEC são consultados em paralelo. Ao final, `concluido`
+    informa o total de títulos e `erro`, se houver, a mensagem da falha.
+    `cancelar` para a leitura no próximo lote, sem emitir nenhum dos dois.
+    """
+    lote = pyqtSignal(list)
+    concluido = pyqtSignal(int)
+    erro = pyqtSignal(str)
     
     def __init__(self, codigo_pessoa, tipo_pessoa, bordero=None,
                  data_bordero_inicial=None, data_bordero_final=None,
@@ -50,19 +120,111 @@ class TitulosThread(QThread):
         self.data_vencimento_inicial = data_vencimento_inicial
         self.data_vencimento_final = data_vencimento_final
         self.empresa = empresa
+        self._cancelar = threading.Event()
+    
+    def cancelar(self):
+        """Pede a interrupção da busca."""
+        self._cancelar.set()
         
     def run(self):
-        titulos = db_connection.get_titulos(
-            codigo_pessoa=self.codigo_pessoa,
-            tipo_pessoa=self.tipo_pessoa,
-            bordero=self.bordero,
-            data_bordero_inicial=self.data_bordero_inicial,
-            data_bordero_final=self.data_bordero_final,
-            data_vencimento_inicial=self.data_vencimento_inicial,
-            data_vencimento_final=self.data_vencimento_final,
-            empresa=self.empresa
-        )
-        self.finished.emit(titulos)
+        total = 0
+        try:
+            lotes = db_connection.iter_titulos(
+                batch_size=500,
+                paralelo=True,
+                codigo_pessoa=self.codigo_pessoa,
+                tipo_pessoa=self.tipo_pessoa,
+                bordero=self.bordero,
+                data_bordero_inicial=self.data_bordero_inicial,
+                data_bordero_final=self.data_bordero_final,
+                data_vencimento_inicial=self.data_vencimento_inicial,
+                data_vencimento_final=self.data_vencimento_final,
+                empresa=self.empresa
+            )
+            try:
+                for titulos in lotes:
+                    if self._cancelar.is_set():
+                        return
+                    total += len(titulos)
+                    self.lote.emit(titulos)
+            finally:
+                # Encerra as consultas ainda em andamento (as conexões voltam ao pool)
+                lotes.close()
+        except Exception as e:
+            if not self._cancelar.is_set():
+                self.erro.emit(str(e))
+            return
+        self.concluido.emit(total)
+
+class GeracaoLinhasThread(QThread):
+    """
+    Thread que gera as linhas digitáveis de títulos do modelo, em blocos.
+    
+    Cada bloco é gerado em lote (`TituloBatch.gerar_linhas`) e emitido em
+    `linhas`, seguido de `progresso` (gerados, total). `cancelar` interrompe
+    a geração no fim do bloco em andamento; `concluida` informa se ela foi
+    cancelada.
+    """
+    linhas = pyqtSignal(list)
+    progresso = pyqtSignal(int, int)
+    concluida = pyqtSignal(bool)
+    
+    TAMANHO_BLOCO = 2000
+    
+    def __init__(self, batch, indices):
+        super().__init__()
+        self.batch = batch
+        self.indices = list(indices)
+        self._cancelar = threading.Event()
+    
+    def cancelar(self):
+        """Pede a interrupção da geração."""
+        self._cancelar.set()
+    
+    def run(self):
+        total = len(self.indices)
+        for inicio in range(0, total, self.TAMANHO_BLOCO):
+            if self._cancelar.is_set():
+                break
+            bloco = self.indices[inicio:inicio + self.TAMANHO_BLOCO]
+            self.linhas.emit(self.batch.gerar_linhas(bloco))
+            self.progresso.emit(inicio + len(bloco), total)
+        self.concluida.emit(self._cancelar.is_set())
+
+class ExportacaoThread(QThread):
+    """
+    Thread que exporta títulos do modelo para XLSX ou CSV (ver `exportacao.exportar`).
+    
+    Emite `progresso` (exportados, total) a cada bloco escrito e, ao final,
+    `concluida` com o caminho do arquivo ou `erro` com a mensagem da falha.
+    Se cancelada (`cancelar`), não emite nenhum dos dois.
+    """
+    progresso = pyqtSignal(int, int)
+    concluida = pyqtSignal(str)
+    erro = pyqtSignal(str)
+    
+    def __init__(self, batch, indices, file_path, formato):
+        super().__init__()
+        self.batch = batch
+        self.indices = indices
+        self.file_path = file_path
+        self.formato = formato
+        self._cancelar = threading.Event()
+    
+    def cancelar(self):
+        """Pede a interrupção da exportação."""
+        self._cancelar.set()
+    
+    def run(self):
+        try:
+            exportar(self.batch, self.indices, self.file_path, self.formato,
+                     progresso=self.progresso.emit, cancelado=self._cancelar.is_set)
+        except ExportacaoCancelada:
+            return
+        except Exception as e:
+            self.erro.emit(str(e))
+            return
+        self.concluida.emit(self.file_path)
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -72,8 +234,22 @@ class MainWindow(QMainWindow):
         
         # Inicializar variáveis
         self.pessoa_selecionada = None
-        self.titulos = []
         self.titulos_selecionados = []
+        self.geracao_thread = None
+        self.exportacao_thread = None
+        
+        # Índice local de pessoas (opcional): a busca responde sem ir ao banco
+        self.indice_pessoas = None
+        if os.getenv('INDICE_PESSOAS', '').strip().lower() in ('1', 'true', 'sim'):
+            self.indice_pessoas = IndicePessoas(
+                db_connection,
+                intervalo=float(os.getenv('INDICE_PESSOAS_INTERVALO', '60'))
+            )
+            self.indice_pessoas.iniciar()
+        
+        # Busca de pessoas em segundo plano (uma única thread para todos os pedidos)
+        self.busca_thread = BuscaPessoasThread()
+        self.busca_thread.start()
         
         # Configurar a interface
         self.init_ui()
@@ -213,16 +389,29 @@ class MainWindow(QMainWindow):
         titulos_group = QGroupBox("Títulos")
         titulos_layout = QVBoxLayout()
         
-        self.titulos_table = QTableWidget()
-        self.titulos_table.setColumnCount(11)
-        self.titulos_table.setHorizontalHeaderLabels([
-            "Empresa", "Código", "Sacado", "Bordero", "Data Bordero", 
-            "Núm. Documento", "Seu Número", "Cód. Documento", 
-            "Tipo Documento", "Vencimento", "Valor"
-        ])
-        self.titulos_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.titulos_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.titulos_table.setSelectionMode(QTableWidget.MultiSelection)
+        # Filtro por texto sobre os títulos carregados
+        filtro_layout = QHBoxLayout()
+        filtro_layout.addWidget(QLabel("Filtrar:"))
+        self.filtro_titulos_input = QLineEdit()
+        self.filtro_titulos_input.setPlaceholderText("Texto em qualquer coluna...")
+        filtro_layout.addWidget(self.filtro_titulos_input)
+        titulos_layout.addLayout(filtro_layout)
+        
+        # Modelo com os títulos, ordenado e filtrado pelo proxy exibido na tabela
+        self.titulos_model = TitulosTableModel(self)
+        self.titulos_proxy = TitulosFilterProxyModel(self)
+        self.titulos_proxy.setSourceModel(self.titulos_model)
+        
+        self.titulos_table = QTableView()
+        self.titulos_table.setModel(self.titulos_proxy)
+        self.titulos_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.titulos_table.horizontalHeader().setStretchLastSection(True)
+        self.titulos_table.verticalHeader().setDefaultSectionSize(22)
+        self.titulos_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.titulos_table.setSelectionMode(QAbstractItemView.MultiSelection)
+        # Sem ordenação inicial: os títulos aparecem na ordem em que chegam
+        self.titulos_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.titulos_table.setSortingEnabled(True)
         titulos_layout.addWidget(self.titulos_table)
         
         # Layout para botões de ação
@@ -238,15 +427,48 @@ class MainWindow(QMainWindow):
         
         titulos_layout.addLayout(buttons_layout)
         
-        # Linhas digitáveis geradas
+        # Progresso da geração de linhas digitáveis, visível só durante a geração
+        progresso_layout = QHBoxLayout()
+        self.geracao_progress = QProgressBar()
+        self.geracao_progress.setFormat("%v de %m (%p%)")
+        self.geracao_progress.setVisible(False)
+        progresso_layout.addWidget(self.geracao_progress)
+        
+        self.cancelar_geracao_btn = QPushButton("Cancelar")
+        self.cancelar_geracao_btn.setVisible(False)
+        progresso_layout.addWidget(self.cancelar_geracao_btn)
+        # Progresso da exportação, visível só durante a exportação
+        self.exportacao_progress = QProgressBar()
+        self.exportacao_progress.setFormat("Exportando: %v de %m (%p%)")
+        self.exportacao_progress.setVisible(False)
+        progresso_layout.addWidget(self.exportacao_progress)
+        
+        self.cancelar_exportacao_btn = QPushButton("Cancelar Exportação")
+        self.cancelar_exportacao_btn.setVisible(False)
+        progresso_layout.addWidget(self.cancelar_exportacao_btn)
+        
+        # Mostrar e esconder o progresso não muda o tamanho da tabela: com muitas
+        # linhas selecionadas, redesenhá-la é caro
+        for widget in (self.geracao_progress, self.cancelar_geracao_btn,
+                       self.exportacao_progress, self.cancelar_exportacao_btn):
+            politica = widget.sizePolicy()
+            politica.setRetainSizeWhenHidden(True)
+            widget.setSizePolicy(politica)
+        titulos_layout.addLayout(progresso_layout)
+        
+        # Linhas digitáveis geradas, uma por item
         titulos_layout.addWidget(QLabel("Linhas Digitáveis Geradas:"))
-        self.linhas_text = QLineEdit()
-        self.linhas_text.setReadOnly(True)
-        self.linhas_text.setPlaceholderText("Selecione títulos e clique em 'Gerar Linha Digitável'")
-        titulos_layout.addWidget(self.linhas_text)
+        self.linhas_model = LinhasGeradasModel(self)
+        self.linhas_list = QListView()
+        self.linhas_list.setModel(self.linhas_model)
+        self.linhas_list.setUniformItemSizes(True)
+        self.linhas_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.linhas_list.setMaximumHeight(150)
+        titulos_layout.addWidget(self.linhas_list)
         
         # Botão para copiar
         self.copiar_btn = QPushButton("Copiar")
+        self.copiar_btn.setToolTip("Copia as linhas selecionadas na lista (ou todas, sem seleção)")
         self.copiar_btn.setEnabled(False)
         titulos_layout.addWidget(self.copiar_btn)
         
@@ -296,6 +518,7 @@ class MainWindow(QMainWindow):
         
         # Busca dinâmica ao digitar
         self.search_input.textChanged.connect(self.start_search_timer)
+        self.busca_thread.resultado.connect(self.exibir_busca_pessoas)
         
         # Seleção de pessoa na lista
         self.results_list.itemClicked.connect(self.select_pessoa)
@@ -304,34 +527,52 @@ class MainWindow(QMainWindow):
         self.buscar_titulos_btn.clicked.connect(self.buscar_titulos)
         
         # Seleção de títulos na tabela
-        self.titulos_table.itemSelectionChanged.connect(self.update_buttons_state)
+        self.titulos_table.selectionModel().selectionChanged.connect(self.update_buttons_state)
+        
+        # Filtro da tabela de títulos
+        self.filtro_titulos_input.textChanged.connect(self.titulos_proxy.definir_filtro)
         
         # Gerar linha digitável
         self.gerar_linha_btn.clicked.connect(self.gerar_linhas_digitaveis)
+        self.cancelar_geracao_btn.clicked.connect(self.cancelar_geracao)
         
         # Exportar para Excel
         self.exportar_btn.clicked.connect(self.exportar_para_excel)
+        self.cancelar_exportacao_btn.clicked.connect(self.cancelar_exportacao)
         
         # Copiar linha digitável
         self.copiar_btn.clicked.connect(self.copiar_linha)
     
     def start_search_timer(self):
         """Inicia o timer para busca dinâmica."""
+        # Com o índice local carregado, a busca é imediata
+        if self.indice_pessoas is not None and self.indice_pessoas.pronto:
+            self.perform_search()
+            return
         self.search_timer.start(300)  # 300 ms de atraso para evitar sobrecarga
     
     def perform_search(self):
         """Realiza a busca de pessoas no banco de dados."""
         search_term = self.search_input.text().strip()
         if len(search_term) < 2:
+            self.busca_thread.cancelar()
             self.results_list.clear()
             return
         
         tipo = self.tipo_combo.currentText()
         
-        # Usar thread para não bloquear a interface
-        self.search_thread = BuscaThread(search_term, tipo)
-        self.search_thread.finished.connect(self.update_search_results)
-        self.search_thread.start()
+        if self.indice_pessoas is not None and self.indice_pessoas.pronto:
+            self.busca_thread.cancelar()
+            self.update_search_results(self.indice_pessoas.buscar(search_term, tipo))
+            return
+        
+        # A busca roda na thread de busca, para não bloquear a interface
+        self.busca_thread.buscar(search_term, tipo)
+    
+    def exibir_busca_pessoas(self, geracao, results):
+        """Exibe o resultado da thread de busca, se ainda for o do pedido mais recente."""
+        if geracao == self.busca_thread.geracao:
+            self.update_search_results(results)
     
     def update_search_results(self, results):
         """Atualiza a lista de resultados com os dados encontrados."""
@@ -357,11 +598,20 @@ class MainWindow(QMainWindow):
         # Ativar seção de filtros
         self.person_details_group.setEnabled(True)
         
-        # Limpar títulos anteriores
-        self.titulos_table.setRowCount(0)
-        self.titulos = []
+        # Limpar títulos anteriores (a busca da pessoa anterior, se em andamento, é cancelada)
+        self.cancelar_busca_titulos()
+        self.cancelar_geracao()
+        self.titulos_model.limpar()
         self.update_buttons_state()
     
+    def cancelar_busca_titulos(self):
+        """Cancela a busca de títulos em andamento; os lotes que ainda chegarem são ignorados."""
+        anterior = getattr(self, 'titulos_thread', None)
+        if anterior is not None:
+            anterior.cancelar()
+            self._descartar_thread(anterior)
+            self.titulos_thread = None
+    
     def buscar_titulos(self):
         """Busca títulos no banco de dados com os filtros especificados."""
         if not self.pessoa_selecionada:
@@ -385,6 +635,9 @@ class MainWindow(QMainWindow):
         data_vencimento_inicial = self.data_vencimento_inicial.date().toString("yyyy-MM-dd")
         data_vencimento_final = self.data_vencimento_final.date().toString("yyyy-MM-dd")
         
+        # Uma busca anterior ainda em andamento para no próximo lote
+        self.cancelar_busca_titulos()
+        
         # Usar thread para não bloquear a interface
         self.titulos_thread = TitulosThread(
             codigo_pessoa=self.pessoa_selecionada.codigo,
@@ -396,84 +649,131 @@ class MainWindow(QMainWindow):
             data_vencimento_final=data_vencimento_final,
             empresa=empresa
         )
-        self.titulos_thread.finished.connect(self.exibir_titulos)
+        self.titulos_thread.lote.connect(self.exibir_titulos)
+        self.titulos_thread.erro.connect(self.erro_busca_titulos)
+        self.titulos_thread.concluido.connect(self.busca_titulos_concluida)
+        
+        # Limpar títulos anteriores; os novos são exibidos à medida que chegam
+        self.cancelar_geracao()
+        self.titulos_model.limpar()
+        self.exportar_btn.setEnabled(False)
+        self.update_buttons_state()
         self.titulos_thread.start()
     
+    def _descartar_thread(self, thread):
+        """Destrói uma thread substituída quando ela terminar (`QThread.finished`)."""
+        thread.setParent(self)
+        thread.finished.connect(thread.deleteLater)
+        # Se já terminou, `finished` não será mais emitido
+        if thread.isFinished():
+            thread.deleteLater()
+    
     def exibir_titulos(self, titulos_data):
-        """Exibe os títulos encontrados na tabela."""
-        self.titulos_table.setRowCount(0)
-        self.titulos = []
-        
-        if not titulos_data:
-            QMessageBox.information(self, "Informação", "Nenhum título encontrado com os filtros especificados.")
+        """Acrescenta à tabela um lote de títulos encontrados."""
+        # Ignora lotes de uma busca anterior, ainda em andamento
+        if self.sender() is not self.titulos_thread:
             return
         
-        # Converter dados para objetos Titulo
-        for titulo_data in titulos_data:
-            titulo = Titulo.from_dict(titulo_data)
-            self.titulos.append(titulo)
-        
-        # Preencher a tabela
-        self.titulos_table.setRowCount(len(self.titulos))
+        # Guardar os títulos por coluna; as células são formatadas pelo modelo, sob demanda
+        self.titulos_model.adicionar(TituloBatch.from_registros(titulos_data))
         
-        for row, titulo in enumerate(self.titulos):
-            data_bordero_str = titulo.data_bordero.strftime("%d/%m/%Y")
-            vencimento_str = titulo.vencimento.strftime("%d/%m/%Y")
-            valor_str = f"{titulo.valor:.2f}".replace('.', ',')
-            
-            self.titulos_table.setItem(row, 0, QTableWidgetItem(titulo.empresa))
-            self.titulos_table.setItem(row, 1, QTableWidgetItem(str(titulo.codigo)))
-            self.titulos_table.setItem(row, 2, QTableWidgetItem(str(titulo.sacado)))
-            self.titulos_table.setItem(row, 3, QTableWidgetItem(str(titulo.bordero)))
-            self.titulos_table.setItem(row, 4, QTableWidgetItem(data_bordero_str))
-            self.titulos_table.setItem(row, 5, QTableWidgetItem(titulo.numero_documento))
-            self.titulos_table.setItem(row, 6, QTableWidgetItem(titulo.seu_numero))
-            self.titulos_table.setItem(row, 7, QTableWidgetItem(titulo.codigo_dcto))
-            self.titulos_table.setItem(row, 8, QTableWidgetItem(titulo.tipodcto))
-            self.titulos_table.setItem(row, 9, QTableWidgetItem(vencimento_str))
-            self.titulos_table.setItem(row, 10, QTableWidgetItem(valor_str))
-        
-        self.exportar_btn.setEnabled(True)
+        # Uma exportação por vez
+        self.exportar_btn.setEnabled(self.exportacao_thread is None)
         self.update_buttons_state()
     
+    def erro_busca_titulos(self, mensagem):
+        """Informa uma falha na busca de títulos."""
+        if self.sender() is not self.titulos_thread:
+            return
+        QMessageBox.critical(self, "Erro", f"Erro ao buscar títulos: {mensagem}")
+    
+    def busca_titulos_concluida(self, total):
+        """Finaliza a busca de títulos, avisando se nada foi encontrado."""
+        if self.sender() is not self.titulos_thread:
+            return
+        if not total:
+            QMessageBox.information(self, "Informação", "Nenhum título encontrado com os filtros especificados.")
+    
+    def titulos_selecionados_na_tabela(self):
+        """Títulos das linhas selecionadas, na ordem exibida."""
+        # Pelas faixas da seleção: selectedRows() consulta o modelo linha a linha
+        linhas = sorted({row for faixa in self.titulos_table.selectionModel().selection()
+                         for row in range(faixa.top(), faixa.bottom() + 1)})
+        return [self.titulos_model.titulo(row) for row in self.titulos_proxy.linhas_origem(linhas)]
+    
     def update_buttons_state(self):
         """Atualiza o estado dos botões com base na seleção de títulos."""
-        selected_rows = len(self.titulos_table.selectedItems()) // self.titulos_table.columnCount()
-        self.gerar_linha_btn.setEnabled(selected_rows > 0)
-        self.copiar_btn.setEnabled(self.linhas_text.text() != "")
+        gerando = self.geracao_thread is not None and self.geracao_thread.isRunning()
+        self.gerar_linha_btn.setEnabled(not gerando and self.titulos_table.selectionModel().hasSelection())
+        self.copiar_btn.setEnabled(self.linhas_model.rowCount() > 0)
     
     def gerar_linhas_digitaveis(self):
-        """Gera as linhas digitáveis para os títulos selecionados."""
-        selected_rows = set()
+        """Gera, em segundo plano, as linhas digitáveis dos títulos selecionados."""
+        titulos = self.titulos_selecionados_na_tabela()
         
-        for item in self.titulos_table.selectedItems():
-            selected_rows.add(item.row())
-        
-        if not selected_rows:
+        if not titulos:
             QMessageBox.warning(self, "Aviso", "Selecione pelo menos um título.")
             return
         
-        linhas = []
-        self.titulos_selecionados = []
-        
-        for row in selected_rows:
-            titulo = self.titulos[row]
-            linha = titulo.gerar_linha_digitavel()
-            linhas.append(linha)
-            self.titulos_selecionados.append(titulo)
-        
-        # Exibir linhas geradas
-        self.linhas_text.setText(" | ".join(linhas))
+        # A thread anterior pode ainda estar terminando depois de emitir `concluida`
+        if self.geracao_thread is not None:
+            self._descartar_thread(self.geracao_thread)
+        
+        self.titulos_selecionados = titulos
+        self.linhas_model.limpar()
+        self.geracao_progress.setRange(0, len(titulos))
+        self.geracao_progress.setValue(0)
+        self.geracao_progress.setVisible(True)
+        self.cancelar_geracao_btn.setEnabled(True)
+        self.cancelar_geracao_btn.setVisible(True)
+        
+        self.geracao_thread = GeracaoLinhasThread(self.titulos_model.batch, (titulo.indice for titulo in titulos))
+        self.geracao_thread.linhas.connect(self.exibir_linhas_geradas)
+        self.geracao_thread.progresso.connect(self.atualizar_progresso_geracao)
+        self.geracao_thread.concluida.connect(self.geracao_concluida)
+        self.geracao_thread.start()
+        self.update_buttons_state()
+    
+    def exibir_linhas_geradas(self, linhas):
+        """Acrescenta à lista um bloco de linhas geradas."""
+        if self.sender() is not self.geracao_thread:
+            return
+        self.linhas_model.adicionar(linhas)
         self.copiar_btn.setEnabled(True)
     
+    def atualizar_progresso_geracao(self, gerados, total):
+        if self.sender() is not self.geracao_thread:
+            return
+        self.geracao_progress.setValue(gerados)
+        self.titulos_model.linhas_atualizadas()
+    
+    def cancelar_geracao(self):
+        """Interrompe a geração em andamento (as linhas já geradas continuam na lista)."""
+        if self.geracao_thread is not None:
+            self.geracao_thread.cancelar()
+            self.cancelar_geracao_btn.setEnabled(False)
+    
+    def geracao_concluida(self, cancelada):
+        """Esconde o progresso ao fim da geração (concluída ou cancelada)."""
+        if self.sender() is not self.geracao_thread:
+            return
+        self.geracao_progress.setVisible(False)
+        self.cancelar_geracao_btn.setVisible(False)
+        self.titulos_model.linhas_atualizadas()
+        self.update_buttons_state()
+    
     def copiar_linha(self):
-        """Copia a linha digitável para a área de transferência."""
-        QApplication.clipboard().setText(self.linhas_text.text())
+        """Copia as linhas digitáveis selecionadas na lista (ou todas) para a área de transferência."""
+        linhas = self.linhas_model.linhas
+        selecionadas = sorted(index.row() for index in self.linhas_list.selectionModel().selectedRows())
+        if selecionadas:
+            linhas = [linhas[row] for row in selecionadas]
+        QApplication.clipboard().setText("\n".join(linhas))
         QMessageBox.information(self, "Sucesso", "Texto copiado para a área de transferência.")
     
     def exportar_para_excel(self):
         """Exporta os títulos selecionados para um arquivo Excel ou CSV."""
-        if not self.titulos:
+        if not self.titulos_model.rowCount():
             QMessageBox.warning(self, "Aviso", "Não há títulos para exportar.")
             return
         
@@ -490,60 +790,35 @@ class MainWindow(QMainWindow):
         if dialog.clickedButton() == cancelar_btn:
             return
         
-        # Determinar quais títulos exportar
+        # Determinar quais títulos exportar (posições no lote do modelo)
         if dialog.clickedButton() == todos_btn:
-            titulos_exportar = self.titulos
+            indices = self.titulos_model.indices()
         else:  # Selecionados
-            selected_rows = set()
-            for item in self.titulos_table.selectedItems():
-                selected_rows.add(item.row())
+            indices = [titulo.indice for titulo in self.titulos_selecionados_na_tabela()]
             
-            if not selected_rows:
+            if not indices:
                 QMessageBox.warning(self, "Aviso", "Selecione pelo menos um título para exportar.")
                 return
-            
-            titulos_exportar = [self.titulos[row] for row in selected_rows]
         
         # Perguntar formato
         format_dialog = QMessageBox()
         format_dialog.setWindowTitle("Formato de Exportação")
         format_dialog.setText("Escolha o formato do arquivo:")
-        xlsx_btn = format_dialog.addButton("Excel (XLSX)", QMessageBox.YesRole)
-        csv_btn = format_dialog.addButton("CSV", QMessageBox.NoRole)
-        cancel_format_btn = format_dialog.addButton("Cancelar", QMessageBox.RejectRole)
+        formatos = {
+            format_dialog.addButton("Excel (XLSX)", QMessageBox.YesRole): ("xlsx", "Excel"),
+            format_dialog.addButton("CSV", QMessageBox.NoRole): ("csv", "CSV"),
+        }
+        # Parquet (colunas tipadas) só com o pyarrow instalado
+        if 'parquet' in formatos_disponiveis():
+            formatos[format_dialog.addButton("Parquet", QMessageBox.NoRole)] = ("parquet", "Parquet")
+        format_dialog.addButton("Cancelar", QMessageBox.RejectRole)
         
         format_dialog.exec_()
         
-        if format_dialog.clickedButton() == cancel_format_btn:
+        # Determinar formato de arquivo (Cancelar ou janela fechada: nenhum)
+        if format_dialog.clickedButton() not in formatos:
             return
-        
-        # Determinar formato de arquivo
-        extension = "xlsx" if format_dialog.clickedButton() == xlsx_btn else "csv"
-        
-        # Gerar linhas digitáveis para os títulos selecionados
-        for titulo in titulos_exportar:
-            if not titulo.linha_digitavel:
-                titulo.gerar_linha_digitavel()
-        
-        # Preparar dados para exportação
-        dados = []
-        for titulo in titulos_exportar:
-            dados.append({
-                'empresa': titulo.empresa,
-                'cedente': titulo.codigo,
-                'sacado': titulo.sacado,
-                'bordero': titulo.bordero,
-                'data_bordero': titulo.data_bordero.strftime('%d/%m/%Y'),
-                'numero_documento': titulo.numero_documento,
-                'seu_numero': titulo.seu_numero,
-                'tipodcto': titulo.tipodcto,
-                'vencimento': titulo.vencimento.strftime('%d/%m/%Y'),
-                'valor': titulo.valor,
-                'linha_digitavel': titulo.linha_digitavel
-            })
-        
-        # Criar DataFrame
-        df = pd.DataFrame(dados)
+        extension, descricao = formatos[format_dialog.clickedButton()]
         
         # Definir local para salvar o arquivo
         default_file = f"titulos_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
@@ -551,24 +826,64 @@ class MainWindow(QMainWindow):
             self, 
             "Salvar Arquivo", 
             default_file, 
-            f"{'Excel' if extension == 'xlsx' else 'CSV'} Files (*.{extension})"
+            f"{descricao} Files (*.{extension})"
         )
         
         if not file_path:
             return
         
-        try:
-            # Exportar dados
-            if extension == 'xlsx':
-                df.to_excel(file_path, index=False, engine='openpyxl')
-            else:
-                df.to_csv(file_path, index=False, sep=';', encoding='utf-8')
-            
-            QMessageBox.information(self, "Sucesso", f"Arquivo exportado com sucesso para:\n{file_path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao exportar arquivo:\n{str(e)}")
+        # Exportar em segundo plano, bloco a bloco (as linhas que faltam são geradas no caminho)
+        self.exportacao_progress.setRange(0, len(indices))
+        self.exportacao_progress.setValue(0)
+        self.exportacao_progress.setVisible(True)
+        self.cancelar_exportacao_btn.setEnabled(True)
+        self.cancelar_exportacao_btn.setVisible(True)
+        self.exportar_btn.setEnabled(False)
+        
+        self.exportacao_thread = ExportacaoThread(self.titulos_model.batch, indices, file_path, extension)
+        self.exportacao_thread.progresso.connect(self.atualizar_progresso_exportacao)
+        self.exportacao_thread.concluida.connect(self.exportacao_concluida)
+        self.exportacao_thread.erro.connect(self.erro_exportacao)
+        self.exportacao_thread.finished.connect(self.fim_exportacao)
+        self.exportacao_thread.start()
+    
+    def atualizar_progresso_exportacao(self, exportados, total):
+        self.exportacao_progress.setValue(exportados)
+    
+    def cancelar_exportacao(self):
+        """Interrompe a exportação em andamento (o arquivo de destino não é criado)."""
+        if self.exportacao_thread is not None:
+            self.exportacao_thread.cancelar()
+            self.cancelar_exportacao_btn.setEnabled(False)
+    
+    def exportacao_concluida(self, file_path):
+        QMessageBox.information(self, "Sucesso", f"Arquivo exportado com sucesso para:\n{file_path}")
+    
+    def erro_exportacao(self, mensagem):
+        QMessageBox.critical(self, "Erro", f"Erro ao exportar arquivo:\n{mensagem}")
+    
+    def fim_exportacao(self):
+        """Esconde o progresso ao fim da exportação (concluída, cancelada ou com erro)."""
+        self.exportacao_progress.setVisible(False)
+        self.cancelar_exportacao_btn.setVisible(False)
+        self.exportar_btn.setEnabled(self.titulos_model.rowCount() > 0)
+        # Destruída só depois da entrega do sinal em andamento
+        self._descartar_thread(self.exportacao_thread)
+        self.exportacao_thread = None
+        # Linhas digitáveis geradas pela exportação
+        self.titulos_model.linhas_atualizadas()
             
     def closeEvent(self, event):
         """Fecha a conexão com o banco de dados ao fechar a aplicação."""
+        if self.indice_pessoas is not None:
+            self.indice_pessoas.parar()
+        self.busca_thread.parar()
+        # Inclui as threads substituídas que ainda não terminaram (filhas da janela)
+        threads = [getattr(self, 'titulos_thread', None), self.geracao_thread, self.exportacao_thread,
+                   *self.findChildren((TitulosThread, GeracaoLinhasThread))]
+        for thread in threads:
+            if thread is not None:
+                thread.cancelar()
+                thread.wait()
         db_connection.disconnect()
         event.accept() 
\ No newline at end of file